@@ -1,137 +1,105 @@
 import streamlit as st
-import yt_dlp
-import whisper
 import os
-import tempfile
-import shutil
+import html
 import subprocess
-import google.generativeai as genai
 from datetime import datetime
-import concurrent.futures
-from pydub import AudioSegment
-import threading
 import time
-
-# .env dosyasını manuel olarak oku
-def load_env_file():
-    """Manuel olarak .env dosyasını oku"""
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
+from pipeline import fetch_video_info
+from audio_cache import open_audio_cache
+from transcript_cache import open_transcript_cache
+from summary_cache import open_summary_cache
+from segment_index import format_timestamp, open_segment_index
+from gemini_client import get_shared_gemini_client
+from metrics import set_readiness_check, start_metrics_server
+from prewarm import start_prewarm
+from jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobEngine, open_job_store
+from governor import QueueFullError, governor_from_env
+from chunk_checkpoint import open_checkpoint_store
+from model_pool import TRANSCRIBE_ENGINES, WORKER_MODES, evict_shared_pool, get_shared_pool, load_whisper_model
+from quantization import QUANTIZATIONS, quantized_model_name
+from video_metadata import estimate_cost, get_metadata_service, is_collection_url
+
+# Parçalama stratejisi seçenekleri (arayüz etiketi -> strateji)
+CHUNK_STRATEGY_LABELS = {
+    "Sabit uzunluk": "fixed",
+    "Sessizliğe göre": "silence",
+}
 
 # Gemini API yapılandırması
 @st.cache_resource
 def configure_gemini():
-    """Gemini API'yi yapılandır - Cache'lenir"""
-    # Önce .env dosyasını yükle
-    load_env_file()
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return None
-    
-    try:
-        genai.configure(api_key=api_key)
-        return genai.GenerativeModel('gemini-1.5-flash')
-    except Exception:
-        return None
+    """Gemini API'yi yapılandır - ısınmanın kurduğu process geneli istemci kullanılır"""
+    return get_shared_gemini_client()
+
+def get_model_pool(model_name, mode="thread", engine="chunk"):
+    """Whisper model havuzu - worker modelleri oturumlar arası sıcak kalır, kabul kontrolü boştakileri kapatabilir"""
+    return get_shared_pool(model_name, mode=mode, engine=engine)
+
+def get_video_info(url):
+    """Video başlığı ve meta bilgileri al - kalıcı meta veri önbelleğinden (süreli)"""
+    return fetch_video_info(url)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_playlist_preview(url, model_name, language):
+    """Playlist/kanal videolarının meta verisi ve tahmini işlem maliyeti"""
+    results = get_metadata_service().preview([url])
+    return results, estimate_cost(results, model_name, language)
 
-# Whisper modelini cache'le
 @st.cache_resource
-def load_whisper_model(model_name):
-    """Whisper modelini yükle ve cache'le"""
-    return whisper.load_model(model_name)
+def get_transcript_cache():
+    """Kalıcı transkript önbelleği - Cache'lenir"""
+    return open_transcript_cache()
 
-def create_summary_prompt(transcript, video_title=""):
-    """Profesyonel özet için prompt oluştur"""
-    current_date = datetime.now().strftime("%d.%m.%Y")
-    
-    prompt = f"""
-Aşağıdaki YouTube video transkriptini profesyonel bir şekilde özetleyiniz.
-
-VIDEO BİLGİLERİ:
-- Başlık: {video_title if video_title else "Belirtilmemiş"}
-- Özet Tarihi: {current_date}
-
-TRANSKRİPT:
-{transcript}
-
-ÖZET REHBERİ:
-Lütfen aşağıdaki formatta detaylı bir özet hazırlayın:
-
-## 📋 GENEL ÖZET
-Video içeriğinin ana konusunu ve amacını 2-3 cümlede özetleyin.
-
-## 🎯 ANA KONULAR
-- Videoda ele alınan temel konuları madde halinde listeleyin
-- Her konu için kısa açıklama ekleyin
-
-## 🔍 ANAHTAR NOKTALAR
-Videodaki en önemli bilgi, iddia veya argümanları vurgulayın:
-- Önemli veriler, istatistikler
-- Dikkat çekici iddialar
-- Uzman görüşleri
-- Sonuçlar ve öneriler
-
-## 🗞️ GÜNDEM İLE İLİŞKİSİ
-Eğer video içeriği güncel olaylar, siyaset, ekonomi, teknoloji, sosyal konular gibi gündemle ilgili konulara değiniyorsa:
-- Hangi güncel konularla bağlantılı olduğunu belirtin
-- Türkiye ve dünya gündemine etkisini değerlendirin
-
-## 💡 ÖNE ÇIKAN ALINTILAR
-Videodaki en etkileyici veya önemli alıntıları (varsa) ekleyin.
-
-## 📊 HEDEF KİTLE VE UYGULANMA
-- Bu bilgi kimler için faydalı?
-- Pratik uygulamaları neler?
-
-ÖNEMLI NOTLAR:
-- Objektif ve tarafsız kalın
-- Türkçe dilbilgisi kurallarına uyun
-- Profesyonel ve anlaşılır bir dil kullanın
-- Transkriptte geçmeyen bilgi eklemeyin
-"""
-    return prompt
-
-def analyze_transcript_with_gemini(model, transcript, video_title=""):
-    """Gemini ile transkript analizi ve özetleme"""
-    try:
-        prompt = create_summary_prompt(transcript, video_title)
-        
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.3,
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 4000,
-            }
-        )
-        
-        return response.text if response.text else "Özet oluşturulamadı."
-            
-    except Exception as e:
-        return f"Gemini API hatası: {str(e)}"
+@st.cache_resource
+def get_summary_cache():
+    """Kalıcı Gemini özet önbelleği - Cache'lenir"""
+    return open_summary_cache()
 
-@st.cache_data
-def get_video_info(url):
-    """Video başlığı ve meta bilgileri al - Cache'lenir"""
-    try:
-        ydl_opts = {'quiet': True, 'no_warnings': True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                'title': info.get('title', ''),
-                'duration': info.get('duration', 0),
-                'uploader': info.get('uploader', ''),
-            }
-    except Exception:
-        return {}
+@st.cache_resource
+def get_audio_cache():
+    """Oturumlar arası paylaşılan ses önbelleği - Cache'lenir"""
+    return open_audio_cache()
+
+@st.cache_resource
+def get_segment_index():
+    """Zaman damgalı bölüm arama dizini - Cache'lenir (kapalıysa None)"""
+    return open_segment_index()
+
+@st.cache_resource
+def get_governor():
+    """Tüm oturumlar için ortak kabul kontrolü - bellek ve eşzamanlı iş sınırı"""
+    return governor_from_env(evict_fn=evict_shared_pool)
+
+@st.cache_resource
+def get_job_engine():
+    """Arka plan iş motoru - oturumlar ve yeniden çalışmalar arası tek örnek"""
+    return JobEngine(
+        open_job_store(),
+        pool_factory=get_model_pool,
+        model_loader=load_whisper_model,
+        audio_cache=get_audio_cache(),
+        transcript_cache=get_transcript_cache(),
+        gemini=configure_gemini(),
+        workers=int(os.getenv("YEB_JOB_WORKERS", "1")),
+        segment_index=get_segment_index(),
+        summary_cache=get_summary_cache(),
+        governor=get_governor(),
+        checkpoints=open_checkpoint_store(),
+    )
+
+# Whisper/Gemini ısınması - serve.py ile başlatıldıysa zaten sürüyordur
+@st.cache_resource
+def get_prewarmer():
+    """Arka plan ısınmasını başlat ve hazır olma kontrolünü kaydet"""
+    prewarmer = start_prewarm()
+    set_readiness_check(prewarmer.is_ready)
+    return prewarmer
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """YEB_METRICS_PORT tanımlıysa Prometheus /metrics uç noktasını başlat"""
+    port = os.getenv("YEB_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
 
 @st.cache_resource
 def check_ffmpeg():
@@ -143,214 +111,6 @@ def check_ffmpeg():
     except Exception as e:
         return False, f"FFmpeg eksik: {e}"
 
-def download_audio(url, temp_dir):
-    """Video sesini indir - Optimize edildi"""
-    output_path = os.path.join(temp_dir, "audio.%(ext)s")
-    ydl_opts = {
-        'format': 'bestaudio[filesize<50M]/bestaudio/best[filesize<50M]',  # Dosya boyutu sınırı
-        'outtmpl': output_path,
-        'noplaylist': True,
-        'quiet': True,
-        'no_warnings': True,
-        'extractaudio': True,
-        'audioformat': 'mp3',
-        'audioquality': '5',  # Daha düşük kalite, daha hızlı
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '128',  # Düşük kalite
-        }],
-        # Hız optimizasyonları
-        'extractor_retries': 1,
-        'fragment_retries': 1,
-        'retries': 1,
-        'http_headers': {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-    }
-    
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            if 'requested_downloads' in info:
-                return info['requested_downloads'][0]['filepath']
-            else:
-                return os.path.join(temp_dir, "audio.mp3")
-    except Exception as e:
-        # Fallback: en düşük kalite
-        ydl_opts['format'] = 'worst'
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            if 'requested_downloads' in info:
-                return info['requested_downloads'][0]['filepath']
-            else:
-                return os.path.join(temp_dir, "audio.mp3")
-
-def split_audio_into_chunks(audio_path, chunk_length_ms=60000):
-    """Ses dosyasını parçalara böl - varsayılan 1 dakika"""
-    try:
-        audio = AudioSegment.from_file(audio_path)
-        chunks = []
-        
-        # Ses dosyası kısa ise bölmeye gerek yok
-        if len(audio) <= chunk_length_ms:
-            return [audio_path]
-        
-        temp_dir = os.path.dirname(audio_path)
-        chunk_paths = []
-        
-        for i, chunk_start in enumerate(range(0, len(audio), chunk_length_ms)):
-            chunk_end = min(chunk_start + chunk_length_ms, len(audio))
-            chunk = audio[chunk_start:chunk_end]
-            
-            chunk_path = os.path.join(temp_dir, f"chunk_{i:03d}.mp3")
-            chunk.export(chunk_path, format="mp3")
-            chunk_paths.append((chunk_path, chunk_start / 1000))  # saniye cinsinden başlangıç zamanı
-            
-        return chunk_paths
-    except Exception as e:
-        st.warning(f"Ses dosyası bölünemiyor, tek parça işlenecek: {e}")
-        return [audio_path]
-
-def transcribe_chunk(chunk_info, model_name, language):
-    """Tek bir ses parçasını metne çevir - Thread-safe"""
-    chunk_path, start_time = chunk_info
-    try:
-        # Her thread kendi modelini yükler (thread-safe)
-        import whisper
-        model = whisper.load_model(model_name)
-        
-        result = model.transcribe(
-            chunk_path,
-            language=language,
-            fp16=False,
-            verbose=False,
-            beam_size=1,
-            best_of=1,
-        )
-        # Model'i memory'den temizle
-        del model
-        return (start_time, result['text'])
-    except Exception as e:
-        return (start_time, f"[Hata: {str(e)}]")
-
-def transcribe_audio_parallel(audio_path, model_name, language, chunk_length_minutes=1):
-    """Ses dosyasını paralel olarak metne çevir - İyileştirilmiş versiyon"""
-    chunk_length_ms = chunk_length_minutes * 60 * 1000
-    
-    # Progress container oluştur
-    progress_container = st.empty()
-    status_container = st.empty()
-    
-    # Ses dosyasını parçalara böl
-    with progress_container:
-        progress_bar = st.progress(0, text="🔪 Ses dosyası parçalanıyor...")
-    
-    chunk_paths = split_audio_into_chunks(audio_path, chunk_length_ms)
-    
-    if isinstance(chunk_paths[0], str):  # Tek dosya
-        with progress_container:
-            progress_bar = st.progress(50, text="📝 Transkripsiyon yapılıyor...")
-        
-        import whisper
-        model = whisper.load_model(model_name)
-        result = model.transcribe(
-            audio_path,
-            language=language,
-            fp16=False,
-            verbose=False,
-            beam_size=1,
-            best_of=1,
-        )
-        
-        with progress_container:
-            progress_bar = st.progress(100, text="✅ Tamamlandı!")
-        
-        progress_container.empty()
-        return result['text']
-    
-    # Paralel işleme için optimum thread sayısı
-    max_workers = min(3, len(chunk_paths), os.cpu_count() or 1)
-    
-    with status_container:
-        st.info(f"🚀 {len(chunk_paths)} parça, {max_workers} thread ile işleniyor...")
-    
-    with progress_container:
-        progress_bar = st.progress(25, text=f"🚀 Paralel işleme başlatılıyor...")
-    
-    transcriptions = []
-    completed_chunks = []
-    
-    # Process tracking için
-    import queue
-    result_queue = queue.Queue()
-    
-    def worker_with_queue(chunk_info):
-        """Worker function that puts results in queue"""
-        result = transcribe_chunk(chunk_info, model_name, language)
-        result_queue.put(result)
-        return result
-    
-    # ThreadPoolExecutor ile paralel işleme
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # İşleri başlat
-        futures = []
-        for chunk_info in chunk_paths:
-            future = executor.submit(worker_with_queue, chunk_info)
-            futures.append(future)
-        
-        # Sonuçları topla
-        completed = 0
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                start_time, text = future.result()
-                transcriptions.append((start_time, text))
-                completed += 1
-                
-                # Progress güncelle
-                progress = 25 + (completed / len(chunk_paths)) * 65
-                with progress_container:
-                    progress_bar = st.progress(
-                        int(progress), 
-                        text=f"📝 {completed}/{len(chunk_paths)} parça tamamlandı..."
-                    )
-                
-            except Exception as e:
-                completed += 1
-                transcriptions.append((0, f"[İşleme hatası: {str(e)}]"))
-                with progress_container:
-                    progress_bar = st.progress(
-                        int(25 + (completed / len(chunk_paths)) * 65), 
-                        text=f"⚠️ {completed}/{len(chunk_paths)} parça işlendi (bazı hatalar var)..."
-                    )
-    
-    # Parçaları zamana göre sırala ve birleştir
-    with progress_container:
-        progress_bar = st.progress(95, text="🔗 Parçalar birleştiriliyor...")
-    
-    transcriptions.sort(key=lambda x: x[0])  # Zamana göre sırala
-    
-    # Metinleri birleştir
-    full_transcript = " ".join([text.strip() for _, text in transcriptions if text.strip()])
-    
-    # Geçici chunk dosyalarını temizle
-    for chunk_path, _ in chunk_paths:
-        try:
-            if os.path.exists(chunk_path):
-                os.remove(chunk_path)
-        except:
-            pass
-    
-    with progress_container:
-        progress_bar = st.progress(100, text="✅ Transkripsiyon tamamlandı!")
-    
-    # Containers'ı temizle
-    time.sleep(1)
-    progress_container.empty()
-    status_container.empty()
-    
-    return full_transcript
-
 # Streamlit sayfa ayarları
 st.set_page_config(
     page_title="YEB AI YouTube Özetleyici",
@@ -366,6 +126,8 @@ if 'ai_summary' not in st.session_state:
     st.session_state.ai_summary = ""
 if 'video_info' not in st.session_state:
     st.session_state.video_info = {}
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = ""
 
 # Siyah tema CSS
 st.markdown("""
@@ -507,7 +269,60 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🎬 YEB AI YouTube Özetleyici</h1>', unsafe_allow_html=True)
 
 # Gemini model kontrolü
+prewarmer = get_prewarmer()
 gemini_model = configure_gemini()
+start_metrics_endpoint()
+
+if not prewarmer.is_ready():
+    with st.sidebar.expander("🔥 Isınma sürüyor"):
+        for name, status in prewarmer.snapshot().items():
+            st.write(f"{name}: {status['state']}")
+
+# Önbellek istatistikleri
+with st.sidebar.expander("📦 Transkript Önbelleği"):
+    cache_stats = get_transcript_cache().stats()
+    st.write(f"İsabet: {cache_stats['hits']} | Iska: {cache_stats['misses']} | Oran: %{cache_stats['hit_rate'] * 100:.0f}")
+    st.write(f"Kayıt: {cache_stats['entries']} | Boyut: {cache_stats['bytes'] / 1024 / 1024:.1f} MB | Tahliye: {cache_stats['evictions']}")
+
+with st.sidebar.expander("🧾 Özet Önbelleği"):
+    summary_stats = get_summary_cache().stats()
+    st.write(f"İsabet: {summary_stats['hits']} | Iska: {summary_stats['misses']} | Oran: %{summary_stats['hit_rate'] * 100:.0f}")
+    st.write(f"Kayıt: {summary_stats['entries']} | Boyut: {summary_stats['bytes'] / 1024 / 1024:.1f} MB | Tahliye: {summary_stats['evictions']}")
+
+if gemini_model:
+    with st.sidebar.expander("🤖 Gemini Çağrıları"):
+        gemini_stats = gemini_model.stats()
+        if gemini_stats['calls']:
+            st.write(f"Çağrı: {gemini_stats['calls']} | Ort: {gemini_stats['avg_latency_s']:.1f} sn | p95: {gemini_stats['p95_latency_s']:.1f} sn")
+            st.write(f"Token: {gemini_stats['prompt_tokens']} giriş / {gemini_stats['output_tokens']} çıkış | Tekrar: {gemini_stats['retries']}")
+        else:
+            st.write("Henüz çağrı yok")
+
+with st.sidebar.expander("🚦 Sunucu Yükü"):
+    load = get_governor().snapshot()
+    st.write(f"Çalışan: {load['running']}/{load['slots']} | Sırada: {load['queued']}/{load['max_queue']} | Bellekteki havuz: {load['resident_pools']}")
+    memory_limit = f"{load['memory_mb']:.0f} MB" if load['memory_mb'] is not None else "sınırsız"
+    st.write(f"Ayrılan bellek: {load['reserved_mb']:.0f} MB / {memory_limit} | Ort. iş: {load['avg_job_s']:.0f} sn")
+
+with st.sidebar.expander("🎵 Ses Önbelleği"):
+    audio_stats = get_audio_cache().stats()
+    st.write(f"Kayıt: {audio_stats['entries']} | Boyut: {audio_stats['bytes'] / 1024 / 1024:.1f} MB | Süren indirme: {audio_stats['inflight']}")
+
+segment_index = get_segment_index()
+if segment_index is not None:
+    with st.sidebar.expander("🔎 Transkriptlerde Ara"):
+        index_stats = segment_index.stats()
+        st.caption(f"{index_stats['videos']} video | {index_stats['segments']} bölüm")
+        search_query = st.text_input("İfade", key="segment_search", placeholder="aranan cümle")
+        if search_query.strip():
+            hits = segment_index.search(search_query)
+            if not hits:
+                st.write("Sonuç bulunamadı")
+            for hit in hits:
+                st.markdown(
+                    f"[{format_timestamp(hit['start'])}]({hit['url']}) **{html.escape(hit['title'] or hit['video_id'])}**  \n"
+                    f"{html.escape(hit['text'])}"
+                )
 
 # FFmpeg kontrolü
 ffmpeg_ok, ffmpeg_msg = check_ffmpeg()
@@ -551,10 +366,18 @@ col3, col4 = st.columns(2)
 with col3:
     chunk_length = st.selectbox(
         "🔪 Parça Uzunluğu (dakika)",
-        [0.5, 1, 2, 3, 5],
-        index=1,
-        help="Kısa parçalar = Daha hızlı paralel işleme"
+        [None, 0.5, 1, 2, 3, 5],
+        index=0,
+        format_func=lambda value: "🤖 Otomatik" if value is None else str(value),
+        help="Otomatik: Çekirdek, bellek, model ve video süresine göre seçilir | Elle seçim bunu geçersiz kılar"
+    )
+    chunk_strategy_label = st.selectbox(
+        "✂️ Bölme Stratejisi",
+        list(CHUNK_STRATEGY_LABELS),
+        index=0,
+        help="Sessizliğe göre: Sınırlar duraklamalara konur, müzik arası/sessizlik atlanır"
     )
+    chunk_strategy = CHUNK_STRATEGY_LABELS[chunk_strategy_label]
 
 with col4:
     use_parallel = st.checkbox(
@@ -562,6 +385,40 @@ with col4:
         value=True,
         help="Ses dosyasını parçalara bölüp paralel işler (Çok daha hızlı!)"
     )
+    live_transcript = st.checkbox(
+        "📡 Canlı Transkript",
+        value=True,
+        help="Sıradaki parçalar bittikçe metni anında gösterir"
+    )
+    use_streaming = st.checkbox(
+        "🌊 İndirirken İşle",
+        value=True,
+        help="Ses inerken parçalar hemen metne çevrilir (sadece sabit uzunluklu bölmede)"
+    )
+    use_captions = st.checkbox(
+        "📜 Altyazı Varsa Kullan",
+        value=True,
+        help="Seçilen dilde YouTube altyazısı varsa ses indirilmez ve Whisper atlanır (çok daha hızlı)"
+    )
+    worker_mode = st.selectbox(
+        "🧵 Worker Tipi",
+        list(WORKER_MODES),
+        index=0,
+        help="thread: Az bellek, ilk model cache'i paylaşılır | process: Ayrı süreçler, GIL'den bağımsız"
+    )
+    engine = st.selectbox(
+        "🧮 Çözme Motoru",
+        list(TRANSCRIBE_ENGINES),
+        index=0,
+        help="chunk: Her parça ayrı çözülür | batched: 30 sn pencereler toplu çözülür (CPU'da daha yüksek verim)"
+    )
+    quantization = st.selectbox(
+        "🎚️ Model Hassasiyeti",
+        list(QUANTIZATIONS),
+        index=0,
+        help="fp32: Orijinal model | int8: Linear katmanlar nicemlenir, CPU'da daha hızlı ve az bellek (large için önerilir)"
+    )
+    model_name = quantized_model_name(model_name, quantization)
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -586,7 +443,25 @@ st.markdown('</div>', unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Video bilgilerini göster
-if video_url:
+if video_url and is_collection_url(video_url):
+    with st.spinner("📋 Playlist videoları çözülüyor..."):
+        playlist_results, playlist_cost = get_playlist_preview(video_url, model_name, language_code)
+    st.markdown(f"""
+    <div class="info-card">
+        <strong>📋 {playlist_cost['videos']} video</strong> ({playlist_cost['failed']} çözülemedi)<br>
+        <span class="status-text">⏱️ Toplam: {format_timestamp(playlist_cost['total_duration_s'])} | 💬 Altyazılı: {playlist_cost['captioned']}</span><br>
+        <span class="status-text">🧮 Tahmini işlem: ~{format_timestamp(playlist_cost['estimated_processing_s'])}</span>
+    </div>
+    """, unsafe_allow_html=True)
+    st.dataframe(
+        [
+            {"Başlık": r['meta']['title'], "Süre": format_timestamp(r['meta']['duration']), "URL": r['url']}
+            for r in playlist_results if r['meta']
+        ],
+        use_container_width=True,
+    )
+    st.info("ℹ️ Arayüz tek video işler; playlist'in tamamı için: python cli.py <playlist URL>")
+elif video_url:
     with st.spinner("📹 Video bilgileri alınıyor..."):
         video_info = get_video_info(video_url)
         st.session_state.video_info = video_info
@@ -599,56 +474,67 @@ if video_url:
             </div>
             """, unsafe_allow_html=True)
 
-# Ana işlem butonu
+# Ana işlem butonu - iş arka planda çalışır, sayfa yenilense de devam eder
 if st.button("🚀 Analizi Başlat", type="primary"):
     if not video_url:
         st.error("❌ Lütfen bir YouTube URL'si girin!")
     else:
-        temp_dir = tempfile.mkdtemp()
-        
         try:
-            # 1. Ses indirme
-            with st.spinner("🎵 Video sesi indiriliyor..."):
-                audio_path = download_audio(video_url, temp_dir)
-                if not os.path.exists(audio_path):
-                    st.error("❌ Ses dosyası oluşturulamadı!")
-                    st.stop()
-            
-            st.markdown('<div class="success-card">✅ Ses dosyası hazır!</div>', unsafe_allow_html=True)
-
-            # 2. Transkripsiyon (gerekirse)
-            if "Transkript" in process_type or "AI Özet" in process_type:
-                if use_parallel:
-                    st.info(f"🚀 Paralel işleme aktif - {chunk_length} dakikalık parçalar")
-                    transcript = transcribe_audio_parallel(audio_path, model_name, language_code, chunk_length)
-                else:
-                    with st.spinner("🧠 Konuşma metne dönüştürülüyor..."):
-                        model = load_whisper_model(model_name)
-                        result = model.transcribe(
-                            audio_path,
-                            language=language_code,
-                            fp16=False,
-                            verbose=False,
-                            beam_size=1,
-                            best_of=1,
-                        )
-                        transcript = result['text']
-                
-                st.session_state.transcript = transcript
-
-            # 3. AI özetleme (gerekirse)
-            if "AI Özet" in process_type and gemini_model:
-                with st.spinner("🔮 AI özet hazırlanıyor..."):
-                    video_title = st.session_state.video_info.get('title', '')
-                    summary = analyze_transcript_with_gemini(gemini_model, st.session_state.transcript, video_title)
-                    st.session_state.ai_summary = summary
-                
-                st.markdown('<div class="success-card">✅ AI özet hazır!</div>', unsafe_allow_html=True)
-
-        except Exception as e:
-            st.error(f"❌ Hata: {str(e)}")
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            job_id = get_job_engine().submit({
+                'url': video_url,
+                'model_name': model_name,
+                'language': language_code,
+                'parallel': use_parallel,
+                'chunk_length': chunk_length,
+                'chunk_strategy': chunk_strategy,
+                'worker_mode': worker_mode,
+                'engine': engine,
+                'captions': use_captions,
+                'streaming': use_streaming,
+                'summarize': "AI Özet" in process_type and gemini_model is not None,
+            })
+        except QueueFullError as e:
+            st.error(f"🚦 {e}")
+        else:
+            st.session_state.job_id = job_id
+            st.session_state.transcript = ""
+            st.session_state.ai_summary = ""
+            st.query_params["job"] = job_id
+
+# Sayfa yenilendiyse iş kimliğini URL'den geri al
+if not st.session_state.job_id and st.query_params.get("job"):
+    st.session_state.job_id = st.query_params.get("job")
+
+# Arka plandaki işin durumunu izle
+if st.session_state.job_id:
+    job = get_job_engine().get(st.session_state.job_id)
+    if job is None:
+        st.warning("⚠️ İş bulunamadı, süresi dolmuş olabilir.")
+        st.session_state.job_id = ""
+    elif job['status'] in (JOB_QUEUED, JOB_RUNNING):
+        st.progress(int(job['progress'] * 100), text=job['message'] or "⏳ Sırada bekliyor...")
+        for message in job['messages'] or []:
+            st.caption(message)
+        
+        # Kısmi sonuçları canlı göster
+        if live_transcript and job['transcript']:
+            st.markdown(
+                f'<div class="result-container">{html.escape(job["transcript"])}</div>',
+                unsafe_allow_html=True
+            )
+        if job['summary']:
+            st.markdown(job['summary'])
+        
+        time.sleep(1)
+        st.rerun()
+    else:
+        for message in job['messages'] or []:
+            st.caption(message)
+        if job['status'] == JOB_FAILED:
+            st.error(job['message'])
+        else:
+            st.session_state.transcript = job['transcript'] or ""
+            st.session_state.ai_summary = job['summary'] or ""
 
 # Sonuçları göster
 if st.session_state.transcript or st.session_state.ai_summary:
@@ -730,6 +616,8 @@ if st.session_state.transcript or st.session_state.ai_summary:
         st.session_state.transcript = ""
         st.session_state.ai_summary = ""
         st.session_state.video_info = {}
+        st.session_state.job_id = ""
+        st.query_params.clear()
         st.rerun()
 
 # Alt bilgi
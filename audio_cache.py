@@ -0,0 +1,167 @@
+import os
+import re
+import uuid
+import shutil
+import threading
+import concurrent.futures
+from cache_store import get_cache_dir
+
+
+# Kayıt dizininde indirilen dosyanın adını tutan dosya - dizindeki diğer dosyalar (ör. PCM) yok sayılır
+ENTRY_MARKER = ".entry"
+
+
+class AudioCache:
+    """Oturumlar arası paylaşılan ses önbelleği - LRU tahliyeli, tek uçuşlu indirme"""
+
+    def __init__(self, root, max_bytes=2 * 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}  # anahtar -> devam eden indirmenin Future'ı
+        self._leases = {}    # anahtar -> kullanımdaki kopya sayısı
+        os.makedirs(root, exist_ok=True)
+
+        # Yarım kalmış indirmeleri temizle
+        for name in os.listdir(root):
+            if name.startswith(".staging-"):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    @staticmethod
+    def _key(video_id, audio_format):
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", f"{video_id}-{audio_format}")
+
+    def _entry_file(self, key):
+        """Önbellekteki ses dosyasının yolu - yoksa None"""
+        entry_dir = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(entry_dir, ENTRY_MARKER), encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        path = os.path.join(entry_dir, name)
+        return path if name and os.path.isfile(path) else None
+
+    def _entry_size(self, key):
+        """Kayıttaki ses dosyasının boyutu - dosya yoksa 0"""
+        path = self._entry_file(key)
+        try:
+            return os.path.getsize(path) if path else 0
+        except OSError:
+            # listdir ile getsize arasında silinmiş olabilir
+            return 0
+
+    def contains(self, video_id, audio_format):
+        """Ses önbellekte mi veya şu an indiriliyor mu"""
+        key = self._key(video_id, audio_format)
+        with self._lock:
+            return key in self._inflight or self._entry_file(key) is not None
+
+    def acquire(self, video_id, audio_format, download_fn):
+        """Ses dosyasını önbellekten al veya indir - aynı video için tek indirme yapılır
+
+        download_fn(hedef_dizin) indirilen dosyanın yolunu döndürmelidir.
+        Dönen yol release() çağrılana kadar tahliye edilmez.
+        """
+        key = self._key(video_id, audio_format)
+
+        with self._lock:
+            path = self._entry_file(key)
+            if path is not None:
+                self._leases[key] = self._leases.get(key, 0) + 1
+                os.utime(os.path.dirname(path))  # LRU sırası için erişim zamanı
+                return path
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+
+        if not leader:
+            # Başka bir oturumun indirmesini bekle
+            path = future.result()
+            with self._lock:
+                self._leases[key] = self._leases.get(key, 0) + 1
+            return path
+
+        staging_dir = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging_dir)
+        try:
+            downloaded = download_fn(staging_dir)
+            if not os.path.exists(downloaded):
+                raise FileNotFoundError(f"Ses dosyası oluşturulamadı: {downloaded}")
+
+            # Sadece indirilen dosyayı tut, atomik olarak yerine taşı ve adını kaydet
+            entry_dir = os.path.join(self.root, key)
+            os.makedirs(entry_dir, exist_ok=True)
+            path = os.path.join(entry_dir, os.path.basename(downloaded))
+            os.replace(downloaded, path)
+            marker_tmp = os.path.join(staging_dir, ENTRY_MARKER)
+            with open(marker_tmp, "w", encoding="utf-8") as f:
+                f.write(os.path.basename(path))
+            os.replace(marker_tmp, os.path.join(entry_dir, ENTRY_MARKER))
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._leases[key] = self._leases.get(key, 0) + 1
+            self._evict()
+        future.set_result(path)
+        return path
+
+    def release(self, video_id, audio_format):
+        """acquire() ile alınan dosyayı serbest bırak"""
+        key = self._key(video_id, audio_format)
+        with self._lock:
+            count = self._leases.get(key, 0) - 1
+            if count > 0:
+                self._leases[key] = count
+            else:
+                self._leases.pop(key, None)
+
+    def _evict(self):
+        """Boyut sınırı aşılırsa kullanımda olmayan en eski kayıtları sil"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            entry_dir = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            size = self._entry_size(name)
+            try:
+                mtime = os.path.getmtime(entry_dir)
+            except OSError:
+                continue
+            entries.append((mtime, name, size))
+            total += size
+
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._leases.get(name):
+                continue
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            total -= size
+
+    def stats(self):
+        """Önbellek doluluğu"""
+        with self._lock:
+            entries = [n for n in os.listdir(self.root)
+                       if not n.startswith(".") and self._entry_file(n) is not None]
+            total = sum(self._entry_size(name) for name in entries)
+            return {"entries": len(entries), "bytes": total, "inflight": len(self._inflight)}
+
+
+def open_audio_cache():
+    """Ortam değişkenlerindeki sınırla ses önbelleğini aç"""
+    return AudioCache(
+        os.path.join(get_cache_dir(), "audio"),
+        max_bytes=int(float(os.getenv("YEB_AUDIO_CACHE_MB", "2048")) * 1024 * 1024),
+    )
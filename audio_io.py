@@ -0,0 +1,270 @@
+import os
+import tempfile
+import threading
+import subprocess
+import numpy as np
+
+# Whisper'ın beklediği örnekleme hızı
+SAMPLE_RATE = 16000
+
+
+def decode_audio_pcm(audio_path, sample_rate=SAMPLE_RATE):
+    """Ses dosyasını tek seferde mono float32 PCM'e çöz"""
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", audio_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Ses çözülemedi: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio_pcm_mmap(audio_path, sample_rate=SAMPLE_RATE, tmp_dir=None):
+    """Sesi diskte ham float32 PCM'e çöz ve memmap ile aç - bellek kullanımı video süresinden bağımsız
+
+    Parçalar memmap görünümleridir, sayfalar okundukça diskten gelir.
+    Dosya eşlendikten hemen sonra silinir; disk alanı son görünüm bırakılınca geri verilir.
+    tmp_dir verilmezse PCM kaynak sesin yanına yazılır - /tmp tmpfs ise dosya RAM'de tutulurdu.
+    Dosya adı noktayla başlar; ses önbelleği kayıt dizinindeki gizli dosyaları saymaz.
+    """
+    try:
+        fd, pcm_path = tempfile.mkstemp(prefix=".yeb-pcm-", suffix=".f32",
+                                        dir=tmp_dir or os.path.dirname(os.path.abspath(audio_path)))
+    except OSError:
+        # Kaynak dizini yazılamıyorsa sistem geçici dizinine düş
+        fd, pcm_path = tempfile.mkstemp(prefix=".yeb-pcm-", suffix=".f32")
+    os.close(fd)
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-y",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", audio_path,
+        "-f", "f32le",
+        "-ac", "1",
+        "-acodec", "pcm_f32le",
+        "-ar", str(sample_rate),
+        pcm_path,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+        if os.path.getsize(pcm_path) == 0:
+            return np.zeros(0, dtype=np.float32)
+        # copy-on-write: torch.from_numpy yazılabilir dizi bekler, sayfalar yazılmadıkça paylaşılır
+        return np.memmap(pcm_path, dtype=np.float32, mode="c")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Ses çözülemedi: {e.stderr.decode(errors='ignore')}") from e
+    finally:
+        try:
+            os.unlink(pcm_path)
+        except OSError:
+            # Windows'ta eşlenmiş dosya silinemez - geçici dizin temizliğine kalır
+            pass
+
+
+def _read_exact(stream, size):
+    """Akıştan tam size bayt oku - akış biterse eldeki kadarını döndür"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < size:
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return bytes(view[:filled])
+
+
+def iter_decoded_pcm_chunks(source, chunk_length_s, sample_rate=SAMPLE_RATE, stats=None, read_size=1 << 16):
+    """Bayt akışını tek ffmpeg sürecinden geçir, her parça dolar dolmaz (PCM, başlangıç) üret
+
+    source read(n) destekleyen dosya benzeri bir nesnedir (HTTP yanıtı, açık dosya).
+    Tüketici yavaşsa ffmpeg ve dolayısıyla ağ okuması da bekler.
+    """
+    cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    stats = stats if stats is not None else {}
+    stats["bytes"] = 0
+    stderr_file = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr_file)
+    feed_errors = []
+
+    def feed():
+        try:
+            while True:
+                data = source.read(read_size)
+                if not data:
+                    break
+                proc.stdin.write(data)
+                stats["bytes"] += len(data)
+        except BrokenPipeError:
+            # ffmpeg erken çıktı - hata aşağıda dönüş kodundan raporlanır
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, name="pcm-stream-feed", daemon=True)
+    feeder.start()
+
+    chunk_samples = max(1, int(chunk_length_s * sample_rate))
+    index = 0
+    try:
+        while True:
+            data = _read_exact(proc.stdout, chunk_samples * 2)
+            if len(data) < 2:
+                break
+            data = data[:len(data) - len(data) % 2]
+            yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0, index * chunk_samples / sample_rate
+            index += 1
+
+        proc.wait()
+        feeder.join()
+        if feed_errors:
+            raise RuntimeError(f"Ses akışı okunamadı: {feed_errors[0]}")
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            raise RuntimeError(f"Ses çözülemedi: {stderr_file.read().decode(errors='ignore')}")
+    finally:
+        # Tüketici erken bırakırsa süreci durdur
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        stderr_file.close()
+
+
+def split_pcm_into_chunks(audio, chunk_length_s, sample_rate=SAMPLE_RATE):
+    """PCM tamponunu kopyalamadan parçala - (görünüm, başlangıç saniyesi) listesi"""
+    chunk_samples = max(1, int(chunk_length_s * sample_rate))
+    return [
+        (audio[start:start + chunk_samples], start / sample_rate)
+        for start in range(0, len(audio), chunk_samples)
+    ]
+
+
+def pcm_duration(audio, sample_rate=SAMPLE_RATE):
+    """PCM tamponunun süresi (saniye)"""
+    return len(audio) / sample_rate
+
+
+# Parçalama stratejileri: sabit uzunluk veya sessizliğe göre
+CHUNK_STRATEGIES = ("fixed", "silence")
+
+
+def frame_energy_db(audio, frame_samples):
+    """Çerçeve başına enerji (dBFS)"""
+    n_frames = len(audio) // frame_samples
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_samples].reshape(n_frames, frame_samples)
+    # einsum kare tamponu oluşturmadan enerjiyi hesaplar
+    power = np.einsum("ij,ij->i", frames, frames) / frame_samples
+    return 10 * np.log10(power + 1e-10)
+
+
+def detect_speech_frames(energy_db, threshold_db=None, silence_floor_db=-50.0,
+                         min_speech_frames=8, padding_frames=7, max_gap_frames=10):
+    """Enerji eşiğine göre konuşma çerçevelerini işaretle"""
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+
+    if threshold_db is None:
+        # Gürültü tabanı ile yüksek seviye arasında uyarlanabilir eşik
+        noise_floor = np.percentile(energy_db, 10)
+        loud_level = np.percentile(energy_db, 95)
+        threshold_db = max(silence_floor_db, min(noise_floor + 10.0, loud_level - 15.0))
+
+    speech = energy_db > threshold_db
+
+    # Heceler arası kısa boşlukları doldur, konuşma tek bölge kalsın
+    regions = _mask_to_regions(speech)
+    for (_, prev_end), (next_start, _) in zip(regions, regions[1:]):
+        if next_start - prev_end <= max_gap_frames:
+            speech[prev_end:next_start] = True
+
+    # Çok kısa enerji patlamalarını (tıkırtı vb.) at
+    regions = _mask_to_regions(speech)
+    for start, end in regions:
+        if end - start < min_speech_frames:
+            speech[start:end] = False
+
+    # Kelime başı/sonu kesilmesin diye konuşmayı iki yana genişlet
+    if padding_frames > 0 and speech.any():
+        kernel = np.ones(2 * padding_frames + 1, dtype=np.int32)
+        speech = np.convolve(speech.astype(np.int32), kernel, mode="same") > 0
+
+    return speech
+
+
+def _mask_to_regions(mask):
+    """Boolean maskeyi [başlangıç, bitiş) bölge listesine çevir"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def split_pcm_on_silence(audio, target_length_s, sample_rate=SAMPLE_RATE,
+                         frame_ms=30, max_gap_s=2.0, threshold_db=None):
+    """Konuşma bölgelerine göre parçala - sınırlar duraklamalarda, konuşmasız bölümler atlanır"""
+    frame_samples = int(sample_rate * frame_ms / 1000)
+    energy_db = frame_energy_db(audio, frame_samples)
+    speech = detect_speech_frames(energy_db, threshold_db=threshold_db)
+    regions = _mask_to_regions(speech)
+
+    target = max(1, int(target_length_s * 1000 / frame_ms))
+    max_len = int(target * 1.25)
+    min_cut = int(target * 0.75)
+    max_gap = int(max_gap_s * 1000 / frame_ms)
+
+    frame_ranges = []
+    cur_start = cur_end = None
+    for region_start, region_end in regions:
+        if cur_start is None:
+            cur_start, cur_end = region_start, region_end
+        elif region_start - cur_end > max_gap or region_end - cur_start > target:
+            # Sınırı önceki bölgeden sonraki duraklamaya koy
+            frame_ranges.append((cur_start, cur_end))
+            cur_start, cur_end = region_start, region_end
+        else:
+            cur_end = region_end
+
+        # Duraksız uzun konuşmayı hedef civarındaki en sessiz çerçeveden kes
+        while cur_end - cur_start > max_len:
+            window = energy_db[cur_start + min_cut:cur_start + max_len]
+            cut = cur_start + min_cut + int(np.argmin(window))
+            frame_ranges.append((cur_start, cut))
+            cur_start = cut
+
+    if cur_start is not None:
+        frame_ranges.append((cur_start, cur_end))
+
+    chunks = []
+    for start, end in frame_ranges:
+        start_sample = start * frame_samples
+        end_sample = min(end * frame_samples, len(audio))
+        chunks.append((audio[start_sample:end_sample], start_sample / sample_rate))
+    return chunks
@@ -0,0 +1,83 @@
+import numpy as np
+from audio_io import SAMPLE_RATE, decode_audio_pcm
+
+# Whisper kodlayıcısının sabit giriş penceresi
+WINDOW_S = 30
+WINDOW_SAMPLES = WINDOW_S * SAMPLE_RATE
+# Tek ileri geçişte çözülen pencere sayısı
+DEFAULT_BATCH_SIZE = 8
+# Çok kısa kuyruk pencereleri (sn) atlanır
+MIN_WINDOW_S = 0.2
+# whisper.transcribe ile aynı sessizlik eşikleri
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+def split_windows(audio):
+    """PCM'i 30 sn'lik kopyasız pencerelere böl"""
+    min_samples = int(MIN_WINDOW_S * SAMPLE_RATE)
+    return [
+        audio[start:start + WINDOW_SAMPLES]
+        for start in range(0, len(audio), WINDOW_SAMPLES)
+        if len(audio) - start >= min_samples
+    ]
+
+
+def decode_windows(model, windows, language, batch_size=DEFAULT_BATCH_SIZE):
+    """Pencerelerin mel spektrogramlarını toplu olarak kodlayıcı + açgözlü çözücüden geçir"""
+    import torch
+    import whisper
+
+    # beam_size=1, best_of=1 ile aynı: sıcaklık 0, açgözlü çözme
+    options = whisper.DecodingOptions(
+        task="transcribe",
+        language=language,
+        temperature=0.0,
+        without_timestamps=True,
+        fp16=False,
+    )
+
+    texts = []
+    for offset in range(0, len(windows), batch_size):
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(window))),
+                model.dims.n_mels,
+            )
+            for window in windows[offset:offset + batch_size]
+        ]).to(model.device)
+
+        for result in whisper.decode(model, mels, options):
+            # Sessiz pencereleri transcribe() gibi atla
+            silent = (result.no_speech_prob > NO_SPEECH_THRESHOLD
+                      and result.avg_logprob < LOGPROB_THRESHOLD)
+            texts.append("" if silent else result.text.strip())
+    return texts
+
+
+def transcribe_chunks_batched(model, chunk_infos, language, batch_size=DEFAULT_BATCH_SIZE):
+    """Birden çok parçanın pencerelerini birlikte çöz - parça sırasıyla [(başlangıç, metin, bölümler)]
+
+    Zaman damgasız çözmede bölümler 30 sn'lik pencerelerdir.
+    """
+    windows = []
+    owners = []
+    for index, (audio, start_time) in enumerate(chunk_infos):
+        # Bölme başarısız olduysa parça dosya yoludur
+        if isinstance(audio, str):
+            audio = decode_audio_pcm(audio)
+        for offset, window in enumerate(split_windows(audio)):
+            window_start = start_time + offset * WINDOW_S
+            windows.append(window)
+            owners.append((index, window_start, window_start + len(window) / SAMPLE_RATE))
+
+    parts = [[] for _ in chunk_infos]
+    for (owner, start, end), text in zip(owners, decode_windows(model, windows, language, batch_size)):
+        if text:
+            parts[owner].append((start, end, text))
+
+    # Parça başlangıç ofsetleri korunur
+    return [
+        (start_time, " ".join(text for _, _, text in segments), segments)
+        for (_, start_time), segments in zip(chunk_infos, parts)
+    ]
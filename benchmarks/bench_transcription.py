@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import threading
+import platform
+import itertools
+import subprocess
+import numpy as np
+
+# Depo kökünü import yoluna ekle
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from audio_io import SAMPLE_RATE, decode_audio_pcm_mmap  # noqa: E402
+from metrics import peak_rss_bytes  # noqa: E402
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+DEFAULT_DURATIONS = [60, 300, 900]
+DEFAULT_MODELS = ["tiny", "base"]
+DEFAULT_CHUNK_LENGTHS = [0.5, 1, 2, 3, 5]
+DEFAULT_WORKERS = [1, 2, 3]
+# Fikstür bu uzunlukta bloklar halinde yazılır - saatlik fikstürler belleğe sığmak zorunda değil
+FIXTURE_BLOCK_S = 60
+
+
+def synth_speech_like(duration_s, sample_rate=SAMPLE_RATE, seed=0):
+    """Konuşmaya benzer sentetik ses - hece ritminde formantlı sesler, duraklamalar ve gürültü"""
+    rng = np.random.default_rng(seed)
+    n = int(duration_s * sample_rate)
+    audio = rng.normal(0, 0.003, n).astype(np.float32)
+
+    pos = int(0.5 * sample_rate)
+    while pos < n:
+        # 1-4 sn konuşma grubu, ardından 0.2-1.2 sn duraklama
+        phrase = int(rng.uniform(1, 4) * sample_rate)
+        end = min(n, pos + phrase)
+        t = np.arange(end - pos) / sample_rate
+        f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+        # Hece hızı (~4-5 Hz) genlik modülasyonu
+        envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3.5, 5.5) * t), 0, None) ** 0.5
+        audio[pos:end] += (0.15 * voiced * envelope).astype(np.float32)
+        pos = end + int(rng.uniform(0.2, 1.2) * sample_rate)
+
+    return np.clip(audio, -1, 1)
+
+
+def ensure_fixture(duration_s):
+    """Süreye göre WAV fikstürünü üret (varsa yeniden kullan)"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"speech_like_{duration_s}s.wav")
+    if not os.path.exists(path):
+        with wave.open(path + ".tmp", "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            for index, start in enumerate(range(0, duration_s, FIXTURE_BLOCK_S)):
+                block = synth_speech_like(min(FIXTURE_BLOCK_S, duration_s - start), seed=index)
+                f.writeframes((block * 32767).astype(np.int16).tobytes())
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def peak_rss_mb():
+    """Sürecin tepe bellek kullanımı (MB) - ölçülemiyorsa (Windows) None"""
+    peak = peak_rss_bytes()
+    return None if peak is None else peak / 1024 / 1024
+
+
+def anon_rss_mb():
+    """Anonim (heap) bellek kullanımı (MB) - memmap'in geri alınabilir sayfa önbelleği hariç
+
+    Linux dışında None döner.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class AnonPeakSampler:
+    """Anonim bellek tepesini arka planda örnekle - ru_maxrss memmap sayfalarını da sayar"""
+
+    def __init__(self, interval_s=0.05):
+        self.interval_s = interval_s
+        self.peak_mb = anon_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            current = anon_rss_mb()
+            if current is not None:
+                self.peak_mb = max(self.peak_mb or 0, current)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_case(case):
+    """Tek bir matris hücresini bu süreçte çalıştır"""
+    from pipeline import split_audio_into_chunks
+
+    fixture = ensure_fixture(case["duration_s"])
+    stages = {}
+
+    started = time.perf_counter()
+    decode_audio_pcm_mmap(fixture)
+    stages["decode_s"] = time.perf_counter() - started
+
+    if case["path"] == "chunking":
+        started = time.perf_counter()
+        chunks = split_audio_into_chunks(fixture, case["chunk_length"] * 60 * 1000, case["chunk_strategy"])
+        stages["chunking_s"] = time.perf_counter() - started
+        return {"stages": stages, "chunks": len(chunks), "wall_s": sum(stages.values())}
+
+    import whisper
+    from model_pool import WhisperModelPool, transcribe_with_model
+    from pipeline import transcribe_audio
+
+    started = time.perf_counter()
+    if case["path"] == "serial":
+        model = whisper.load_model(case["model"])
+        stages["model_load_s"] = time.perf_counter() - started
+        started = time.perf_counter()
+        text = transcribe_with_model(model, fixture, "en")["text"]
+        stages["transcribe_s"] = time.perf_counter() - started
+    else:
+        pool = WhisperModelPool(case["model"], workers=case["workers"], mode=case["worker_mode"],
+                                engine=case.get("engine", "chunk"))
+        # Modelleri önceden ısıt ki yükleme süresi ayrı ölçülsün
+        warm = [pool.submit((np.zeros(SAMPLE_RATE, dtype=np.float32), 0), "en") for _ in range(case["workers"])]
+        for future in warm:
+            future.result()
+        stages["model_load_s"] = time.perf_counter() - started
+        started = time.perf_counter()
+        # Uyarlanır eşzamanlılık kapalı - hücredeki worker sayısı ölçülür
+        text = transcribe_audio(fixture, pool, "en", case["chunk_length"], case["chunk_strategy"], adaptive=False)
+        stages["transcribe_s"] = time.perf_counter() - started
+        pool.shutdown()
+
+    return {
+        "stages": stages,
+        "wall_s": sum(stages.values()),
+        "rtf": stages["transcribe_s"] / case["duration_s"],
+        "chars": len(text),
+    }
+
+
+def build_matrix(args):
+    """Model × parça uzunluğu × worker × motor matrisini oluştur"""
+    cases = []
+    for duration in args.durations:
+        for chunk_length in args.chunk_lengths:
+            for strategy in args.chunk_strategies:
+                cases.append({"path": "chunking", "duration_s": duration,
+                              "chunk_length": chunk_length, "chunk_strategy": strategy})
+        if args.chunking_only:
+            continue
+        for model in args.models:
+            cases.append({"path": "serial", "duration_s": duration, "model": model})
+            for chunk_length, workers, strategy, engine in itertools.product(
+                args.chunk_lengths, args.workers, args.chunk_strategies, args.engines
+            ):
+                cases.append({
+                    "path": "parallel", "duration_s": duration, "model": model,
+                    "chunk_length": chunk_length, "workers": workers,
+                    "chunk_strategy": strategy, "worker_mode": args.worker_mode,
+                    "engine": engine,
+                })
+    return cases
+
+
+def run_quantization_comparison(args, output, env):
+    """fp32 ve int8 modelleri aynı seslerde çalıştır, sonuçları JSONL'e yaz"""
+    from quantization import compare_quantization
+
+    # Sentetik fikstürlerde metin anlamsızdır; WER kayması için gerçek konuşma kaydı verin
+    audio_paths = args.audio or [ensure_fixture(duration) for duration in args.durations]
+    with open(output, "a") as f:
+        for model in args.models:
+            for result in compare_quantization(model, audio_paths, args.language):
+                record = {"case": {"path": "quantization", "model": model}, "env": env, "time": time.time(), **result}
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                if "speedup" in result:
+                    print(f"{model} {os.path.basename(result['audio'])}: "
+                          f"hızlanma={result['speedup']:.2f}x WER kayması={result['wer_drift']:.3f}")
+    print(f"Sonuçlar: {output}")
+    return 0
+
+
+def environment_info():
+    """Sonuçları zaman içinde karşılaştırmak için ortam bilgisi"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transkripsiyon hattı için çevrimdışı benchmark")
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS)
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS)
+    parser.add_argument("--chunk-lengths", type=float, nargs="+", default=DEFAULT_CHUNK_LENGTHS)
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--chunk-strategies", nargs="+", default=["fixed"])
+    parser.add_argument("--worker-mode", default="thread")
+    parser.add_argument("--engines", nargs="+", default=["chunk"], help="chunk ve/veya batched")
+    parser.add_argument("--chunking-only", action="store_true", help="Whisper olmadan sadece çözme/parçalama")
+    parser.add_argument("--compare-quantization", action="store_true",
+                        help="Her model için fp32 ve int8'i karşılaştır: hızlanma ve WER kayması")
+    parser.add_argument("--audio", nargs="+",
+                        help="Karşılaştırmada kullanılacak yerel ses dosyaları (verilmezse sentetik fikstürler)")
+    parser.add_argument("--language", default="tr", help="Karşılaştırmada transkripsiyon dili")
+    parser.add_argument("--max-anon-mb", type=float,
+                        help="Anonim bellek tavanı - aşan hücre hata sayılır")
+    parser.add_argument("--output", help="JSONL çıktı dosyası")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Alt süreç modu: tek hücreyi çalıştır, sonucu stdout'a yaz
+    if args.run_one:
+        case = json.loads(args.run_one)
+        with AnonPeakSampler() as sampler:
+            result = run_case(case)
+        result["peak_rss_mb"] = peak_rss_mb()
+        result["peak_anon_mb"] = sampler.peak_mb
+        print(json.dumps(result))
+        return 0
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d_%H%M%S") + ".jsonl")
+    env = environment_info()
+
+    if args.compare_quantization:
+        return run_quantization_comparison(args, output, env)
+    cases = build_matrix(args)
+    failed = False
+
+    with open(output, "a") as f:
+        for index, case in enumerate(cases, 1):
+            # Fikstür üst süreçte üretilir ki sentez belleği ölçüme karışmasın
+            ensure_fixture(case["duration_s"])
+            # Her hücre ayrı süreçte: tepe bellek ve model ısınması birbirini etkilemez
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-one", json.dumps(case)],
+                capture_output=True, text=True,
+            )
+            record = {"case": case, "env": env, "time": time.time()}
+            if proc.returncode == 0:
+                record.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+            else:
+                record["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "bilinmeyen hata"
+            if args.max_anon_mb and (record.get("peak_anon_mb") or 0) > args.max_anon_mb:
+                record["error"] = f"anonim bellek tavanı aşıldı: {record['peak_anon_mb']:.0f} MB > {args.max_anon_mb:.0f} MB"
+            failed = failed or "error" in record
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            summary = f"rtf={record['rtf']:.3f}" if "rtf" in record else f"wall={record.get('wall_s', 0):.2f}s"
+            print(f"[{index}/{len(cases)}] {case} -> {record.get('error') or summary}")
+
+    print(f"Sonuçlar: {output}")
+    # Hatalı hücre (çökme veya bellek tavanı) CI'da fark edilsin
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+def get_cache_dir():
+    """Kalıcı önbellek dizini - YEB_CACHE_DIR ile değiştirilebilir"""
+    cache_dir = os.getenv("YEB_CACHE_DIR", ".yeb_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def make_cache_key(*parts):
+    """Anahtar parçalarından kararlı bir hash üret"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCache:
+    """SQLite tabanlı kalıcı önbellek - yaş ve boyut sınırlı, isabet sayaçlı"""
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, max_age_s=30 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Bağlantı aç, işlemi commit et ve kapat"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key):
+        """Değeri döndür - yoksa veya süresi dolmuşsa None"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age_s and now - row[1] > self.max_age_s):
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump(conn, "misses")
+                return None
+
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._bump(conn, "hits")
+            return json.loads(row[0])
+
+    def set(self, key, value):
+        """Değeri kaydet ve gerekirse tahliye et"""
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries(key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Süresi dolanları sil, sonra boyut sınırına kadar en eski erişilenleri at"""
+        if self.max_age_s:
+            cur = conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.max_age_s,))
+            evicted = cur.rowcount
+        else:
+            evicted = 0
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if self.max_bytes and total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        if evicted:
+            self._bump(conn, "evictions", evicted)
+
+    def stats(self):
+        """İsabet/ıska sayaçları ve doluluk bilgisi"""
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
@@ -0,0 +1,191 @@
+import re
+import html
+import xml.etree.ElementTree as ET
+import metrics
+
+# Tercih sırasına göre altyazı formatları
+CAPTION_FORMATS = ("vtt", "srv3", "srv1")
+# Otomatik altyazının yeterli sayılması için dakikadaki en az kelime
+MIN_WORDS_PER_MINUTE = 40
+
+_VTT_TIMING = re.compile(r"^\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}\.\d{3})")
+_VTT_TAG = re.compile(r"<[^>]+>")
+# [Müzik], [Alkış] gibi ses açıklamaları
+_ANNOTATION = re.compile(r"\[[^\]]*\]|♪+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_caption_text(lines):
+    """Altyazı satırlarını transkriptle aynı düz metne çevir"""
+    text = " ".join(html.unescape(line) for line in lines)
+    text = _ANNOTATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _vtt_seconds(stamp):
+    """[S:]DD:SS.mmm zaman damgasını saniyeye çevir"""
+    seconds = 0.0
+    for part in stamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_vtt_cues(content):
+    """WebVTT altyazıyı [(başlangıç_sn, bitiş_sn, satırlar)] cue listesine çevir"""
+    cues = []
+    lines = None
+    for raw in content.splitlines():
+        line = raw.strip()
+        timing = _VTT_TIMING.match(line)
+        if timing:
+            lines = []
+            cues.append((_vtt_seconds(timing.group(1)), _vtt_seconds(timing.group(2)), lines))
+            continue
+        if not raw:
+            # Cue'yu sadece tamamen boş satır bitirir - otomatik altyazı cue'ları boşluklu satırla başlar
+            lines = None
+            continue
+        if not line or lines is None:
+            # WEBVTT başlığı, Kind:/Language: ve NOTE blokları
+            continue
+
+        text = _VTT_TAG.sub("", line).strip()
+        if text:
+            lines.append(text)
+    return cues
+
+
+def parse_srv_cues(content):
+    """YouTube srv1 (<text start dur>, sn) ve srv3 (<p t d>, ms) XML altyazısını cue listesine çevir"""
+    root = ET.fromstring(content)
+    cues = []
+    for element in root.iter():
+        if element.tag == "text":
+            start = float(element.get("start", 0))
+            end = start + float(element.get("dur", 0))
+        elif element.tag == "p":
+            start = int(element.get("t", 0)) / 1000
+            end = start + int(element.get("d", 0)) / 1000
+        else:
+            continue
+        text = "".join(element.itertext()).strip()
+        cues.append((start, end, [text] if text else []))
+    return cues
+
+
+def dedupe_rolling_lines(cues):
+    """Önceki satırı tekrarlayan satırları at - satır ilk göründüğü cue'da kalır
+
+    YouTube otomatik altyazısı önceki satırı bir sonraki cue'da tekrarlar.
+    """
+    previous = None
+    deduped = []
+    for start, end, lines in cues:
+        kept = []
+        for text in lines:
+            if text != previous:
+                kept.append(text)
+            previous = text
+        deduped.append((start, end, kept))
+    return deduped
+
+
+def _caption_cues(content, ext, rolling):
+    cues = parse_vtt_cues(content) if ext == "vtt" else parse_srv_cues(content)
+    return dedupe_rolling_lines(cues) if rolling else cues
+
+
+def parse_vtt(content, rolling=False):
+    """WebVTT altyazıyı satır listesine çevir
+
+    rolling=True (otomatik altyazı) iken kayan tekrarlar ayıklanır; manuel altyazıda art arda
+    gelen aynı satırlar ("Evet." "Evet.") gerçek konuşmadır ve korunur.
+    """
+    return [text for _, _, lines in _caption_cues(content, "vtt", rolling) for text in lines]
+
+
+def parse_srv(content, rolling=False):
+    """YouTube srv1 (<text>) ve srv3 (<p><s>) XML altyazısını satır listesine çevir"""
+    return [text for _, _, lines in _caption_cues(content, "srv", rolling) for text in lines]
+
+
+def parse_caption(content, ext, rolling=False):
+    """Formata göre ayrıştır ve normalize et - otomatik altyazıda rolling=True"""
+    lines = parse_vtt(content, rolling) if ext == "vtt" else parse_srv(content, rolling)
+    return normalize_caption_text(lines)
+
+
+def parse_caption_segments(content, ext, rolling=False):
+    """Altyazıyı arama dizini için zaman damgalı bölümlere çevir - [(başlangıç_sn, bitiş_sn, metin)]"""
+    segments = []
+    for start, end, lines in _caption_cues(content, ext, rolling):
+        text = normalize_caption_text(lines)
+        if text:
+            segments.append((start, end, text))
+    return segments
+
+
+def _language_matches(key, language):
+    return key == language or key.split("-")[0] == language
+
+
+def select_caption_track(info, language, allow_auto=True):
+    """Seçilen dile uygun altyazı izini seç - (kaynak, format sözlüğü) veya None
+
+    Manuel altyazı önceliklidir. Otomatik çeviri izleri (tlang) kullanılmaz,
+    sadece videonun kendi dilindeki otomatik tanıma kabul edilir.
+    """
+    sources = [("manual", info.get("subtitles") or {})]
+    if allow_auto:
+        sources.append(("auto", info.get("automatic_captions") or {}))
+
+    for source, tracks in sources:
+        for key, formats in tracks.items():
+            if not _language_matches(key, language):
+                continue
+            candidates = [f for f in formats if f.get("url") and "tlang=" not in f["url"]]
+            for ext in CAPTION_FORMATS:
+                for fmt in candidates:
+                    if fmt.get("ext") == ext:
+                        return source, fmt
+    return None
+
+
+def is_good_enough(text, source, duration_s):
+    """Manuel altyazı her zaman, otomatik altyazı yeterince yoğunsa kabul edilir"""
+    if not text:
+        return False
+    if source == "manual" or not duration_s:
+        return True
+    return len(text.split()) / (duration_s / 60) >= MIN_WORDS_PER_MINUTE
+
+
+def fetch_caption_transcript(url, language, allow_auto=True, segments=None):
+    """Videonun altyazısından transkript üret - (metin, kaynak) veya uygun iz yoksa (None, sebep)
+
+    segments listesi verilirse altyazı kabul edildiğinde cue zamanlı bölümler eklenir.
+    """
+    import yt_dlp
+
+    with metrics.span("captions") as span:
+        ydl_opts = {'quiet': True, 'no_warnings': True, 'skip_download': True}
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            track = select_caption_track(info, language, allow_auto)
+            if track is None:
+                span["result"] = "missing"
+                return None, "missing"
+
+            source, fmt = track
+            content = ydl.urlopen(fmt["url"]).read().decode("utf-8", errors="replace")
+
+        # Kayan satır tekrarları sadece otomatik altyazıda olur
+        rolling = source == "auto"
+        text = parse_caption(content, fmt["ext"], rolling)
+        if not is_good_enough(text, source, info.get("duration")):
+            span["result"] = "sparse"
+            return None, "sparse"
+        span["result"] = source
+        if segments is not None:
+            segments.extend(parse_caption_segments(content, fmt["ext"], rolling))
+        return text, f"captions_{source}"
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from audio_io import SAMPLE_RATE
+from cache_store import get_cache_dir, make_cache_key
+
+
+def _chunk_id(chunk_info):
+    """Parçanın kimliği - (başlangıç, süre); farklı parça planları birbirine karışmaz"""
+    audio, start_time = chunk_info
+    duration = 0.0 if isinstance(audio, str) else len(audio) / SAMPLE_RATE
+    return round(start_time, 3), round(duration, 3)
+
+
+class ChunkCheckpointStore:
+    """Tamamlanan parça sonuçlarının kalıcı deposu - yarıda kalan transkripsiyon kaldığı yerden sürer"""
+
+    def __init__(self, path, max_age_s=7 * 24 * 3600):
+        self.path = path
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_results (
+                    key TEXT NOT NULL,
+                    start REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    text TEXT NOT NULL,
+                    segments TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (key, start, duration)
+                )
+            """)
+            if max_age_s:
+                conn.execute("DELETE FROM chunk_results WHERE created_at < ?", (time.time() - max_age_s,))
+
+    @contextmanager
+    def _connect(self):
+        """Bağlantı aç, işlemi commit et ve kapat"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, key):
+        """Anahtarın kayıtlı parçaları - {(başlangıç, süre): (metin, bölümler)}"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT start, duration, text, segments FROM chunk_results WHERE key = ?", (key,)
+            ).fetchall()
+        return {
+            (start, duration): (text, [tuple(segment) for segment in json.loads(segments)])
+            for start, duration, text, segments in rows
+        }
+
+    def save(self, key, chunk_id, text, segments):
+        """Parça sonucunu kaydet"""
+        start, duration = chunk_id
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunk_results(key, start, duration, text, segments, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, start, duration, text, json.dumps(segments, ensure_ascii=False), time.time()),
+            )
+
+    def clear(self, key):
+        """Anahtarın tüm parçalarını sil"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM chunk_results WHERE key = ?", (key,))
+
+    def open(self, video_id, params):
+        """Video + transkripsiyon parametreleri için kontrol noktası"""
+        return ChunkCheckpoint(self, make_cache_key("chunks", video_id, params))
+
+
+class ChunkCheckpoint:
+    """Tek transkripsiyonun parça kontrol noktası - iter_ordered_transcriptions tarafından kullanılır"""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        self._saved = store.load(key)
+
+    def __len__(self):
+        return len(self._saved)
+
+    def get(self, chunk_info):
+        """Parça daha önce tamamlandıysa (başlangıç, metin, bölümler) - yoksa None"""
+        saved = self._saved.get(_chunk_id(chunk_info))
+        return None if saved is None else (chunk_info[1], saved[0], saved[1])
+
+    def save(self, chunk_info, result):
+        """Başarılı parça sonucunu kalıcı olarak kaydet"""
+        _, text, segments = result
+        chunk_id = _chunk_id(chunk_info)
+        self.store.save(self.key, chunk_id, text, segments)
+        self._saved[chunk_id] = (text, segments)
+
+    def clear(self):
+        """Transkript tamamlandı - parçalar artık gerekmez"""
+        self.store.clear(self.key)
+        self._saved = {}
+
+
+def open_checkpoint_store():
+    """Varsayılan konumdaki parça kontrol noktası deposunu aç"""
+    return ChunkCheckpointStore(
+        os.path.join(get_cache_dir(), "chunks.sqlite3"),
+        max_age_s=int(float(os.getenv("YEB_CHECKPOINT_DAYS", "7")) * 24 * 3600),
+    )
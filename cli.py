@@ -0,0 +1,367 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import metrics
+from pipeline import (
+    AUDIO_FORMAT, download_audio, fetch_video_info, transcribe_audio, transcribe_stream, try_caption_transcript,
+)
+from audio_cache import open_audio_cache
+from transcript_cache import is_cacheable_transcript, open_transcript_cache, transcript_params
+from segment_index import format_timestamp, open_segment_index
+from chunk_checkpoint import open_checkpoint_store
+from summary_cache import is_cacheable_summary, open_summary_cache, summary_params
+from youtube_utils import extract_video_id
+from video_metadata import estimate_cost, get_metadata_service, has_captions
+from gemini_client import create_gemini_client
+from summarizer import analyze_transcript_with_gemini
+from audio_io import CHUNK_STRATEGIES
+from model_pool import TRANSCRIBE_ENGINES, WORKER_MODES, create_model_pool
+from quantization import QUANTIZATIONS, quantized_model_name
+
+logger = logging.getLogger("yeb.cli")
+
+# Aşamalar arası kuyruk sonu işareti
+_STOP = object()
+
+
+def read_url_list(path):
+    """Dosyadan URL listesi oku - boş satır ve # yorumları atlanır"""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+def expand_urls(urls):
+    """Playlist ve kanal URL'lerini tekil video URL'lerine aç"""
+    return get_metadata_service().expand_many(urls)
+
+
+class BatchPipeline:
+    """İndirme → transkripsiyon → özet aşamalarını örtüşen thread'lerde çalıştır
+
+    Aşamalar sınırlı kuyruklarla bağlıdır: N+1 inerken N metne çevrilir,
+    N-1 özetlenir; kuyruklar dolunca önceki aşama bekler, bellek sabit kalır.
+    """
+
+    def __init__(self, output_dir, model_name="base", language="tr", chunk_length=None,
+                 chunk_strategy="fixed", worker_mode="thread", summarize=True, queue_size=1,
+                 engine="chunk", captions=True, stream=False):
+        self.output_dir = output_dir
+        self.model_name = model_name
+        self.language = language
+        self.chunk_length = chunk_length
+        self.chunk_strategy = chunk_strategy
+        self.summarize = summarize
+        self.captions = captions
+        # Akışlı indirme sadece sabit uzunluklu parçalarla çalışır
+        self.stream = stream and chunk_strategy == "fixed"
+        self.queue_size = queue_size
+
+        self.audio_cache = open_audio_cache()
+        self.transcript_cache = open_transcript_cache()
+        self.segment_index = open_segment_index()
+        self.checkpoints = open_checkpoint_store()
+        self.pool = create_model_pool(model_name, mode=worker_mode, engine=engine)
+        self.gemini = create_gemini_client() if summarize else None
+        if summarize and self.gemini is None:
+            logger.warning("GEMINI_API_KEY bulunamadı, sadece transkript üretilecek")
+        self.summary_cache = open_summary_cache() if self.gemini is not None else None
+
+        self.cache_params = transcript_params(model_name, language, True, chunk_length, chunk_strategy, engine)
+        self._manifest_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _download_stage(self, urls, out_queue):
+        """Aşama 1: önbellek kontrolü ve ses indirme"""
+        try:
+            for index, url in enumerate(urls):
+                video_id = extract_video_id(url)
+                job = {
+                    'index': index,
+                    'url': url,
+                    'video_id': video_id,
+                    'trace': metrics.Trace(video_id or f"video_{index + 1:04d}", url=url, model=self.model_name),
+                    'timings': {},
+                }
+                started = time.monotonic()
+                try:
+                    with metrics.use_trace(job['trace']):
+                        job['title'] = fetch_video_info(url).get('title', '')
+                        cached = self.transcript_cache.get_transcript(video_id, self.cache_params) if video_id else None
+                        if cached is not None:
+                            job['cached'] = True
+                            metrics.label("transcript_source", "cache")
+                        elif self.captions:
+                            # Altyazı hızlı yolu - uygun iz varsa indirme ve Whisper atlanır
+                            segments = []
+                            cached = try_caption_transcript(url, self.language, segments=segments)
+                            if cached is not None:
+                                self._index_segments(job, segments)
+
+                        if cached is not None:
+                            job['transcript'] = cached
+                        elif self.stream:
+                            # Ses transkripsiyon aşamasında indirilirken işlenir
+                            job['stream'] = True
+                        elif video_id:
+                            job['audio_path'] = self.audio_cache.acquire(
+                                video_id, AUDIO_FORMAT, lambda target_dir: download_audio(url, target_dir)
+                            )
+                            job['audio_lease'] = (video_id, AUDIO_FORMAT)
+                        else:
+                            job['temp_dir'] = tempfile.mkdtemp()
+                            job['audio_path'] = download_audio(url, job['temp_dir'])
+                except Exception as e:
+                    job['error'] = f"İndirme hatası: {e}"
+                job['timings']['download_s'] = time.monotonic() - started
+                logger.info("[%d] indirildi: %s", index + 1, job.get('title') or url)
+                out_queue.put(job)
+        finally:
+            out_queue.put(_STOP)
+
+    def _index_segments(self, job, segments):
+        """Zaman damgalı bölümleri (Whisper veya altyazı) arama dizinine yaz"""
+        if not (job['video_id'] and segments and self.segment_index is not None):
+            return
+        try:
+            with metrics.span("segment_index", segments=len(segments)):
+                self.segment_index.add_video(job['video_id'], segments, job.get('title'), self.language)
+        except Exception as e:
+            logger.warning("Bölümler arama dizinine yazılamadı (%s): %s", job['video_id'], e)
+
+    def _transcribe_stage(self, in_queue, out_queue):
+        """Aşama 2: Whisper transkripsiyonu"""
+        try:
+            while True:
+                job = in_queue.get()
+                if job is _STOP:
+                    break
+                started = time.monotonic()
+                try:
+                    if 'error' not in job and 'transcript' not in job:
+                        segments = []
+                        # Önceki çalıştırmada yarıda kalan video kaldığı yerden sürer
+                        checkpoint = self.checkpoints.open(job['video_id'], self.cache_params) if job['video_id'] else None
+                        with metrics.use_trace(job['trace']):
+                            if job.get('stream'):
+                                job['transcript'] = transcribe_stream(
+                                    job['url'], self.pool, self.language, self.chunk_length,
+                                    segments=segments, checkpoint=checkpoint,
+                                )
+                            else:
+                                job['transcript'] = transcribe_audio(
+                                    job['audio_path'], self.pool, self.language,
+                                    self.chunk_length, self.chunk_strategy, segments=segments,
+                                    checkpoint=checkpoint,
+                                )
+                            metrics.label("transcript_source", "whisper")
+                            self._index_segments(job, segments)
+                        if job['video_id'] and is_cacheable_transcript(job['transcript']):
+                            self.transcript_cache.put_transcript(job['video_id'], self.cache_params, job['transcript'])
+                            if checkpoint is not None:
+                                checkpoint.clear()
+                except Exception as e:
+                    job['error'] = f"Transkripsiyon hatası: {e}"
+                finally:
+                    self._release_audio(job)
+                job['timings']['transcribe_s'] = time.monotonic() - started
+                logger.info("[%d] metne çevrildi", job['index'] + 1)
+                out_queue.put(job)
+        finally:
+            out_queue.put(_STOP)
+
+    def _summary_stage(self, in_queue, results):
+        """Aşama 3: Gemini özeti ve çıktıların yazılması"""
+        while True:
+            job = in_queue.get()
+            if job is _STOP:
+                break
+            started = time.monotonic()
+            if 'error' not in job and self.gemini is not None:
+                with metrics.use_trace(job['trace']):
+                    job['summary'] = self._summarize(job['transcript'], job.get('title', ''))
+            job['timings']['summary_s'] = time.monotonic() - started
+            self._write_outputs(job)
+            metrics.finish_job(job.pop('trace'), "failed" if 'error' in job else "done")
+            results.append(job)
+            logger.info("[%d] tamamlandı%s", job['index'] + 1, f" (hata: {job['error']})" if 'error' in job else "")
+
+    def _summarize(self, transcript, title):
+        """Özeti önbellekten al veya Gemini ile üret"""
+        summary_key = summary_params(self.gemini.model_name)
+        summary = self.summary_cache.get_summary(transcript, title, summary_key)
+        if summary is not None:
+            metrics.label("summary_source", "cache")
+            return summary
+
+        with metrics.span("summary"):
+            summary = analyze_transcript_with_gemini(self.gemini, transcript, title)
+        metrics.label("summary_source", "gemini")
+        if is_cacheable_summary(summary):
+            self.summary_cache.put_summary(transcript, title, summary_key, summary)
+        return summary
+
+    def _release_audio(self, job):
+        """İşi biten sesi önbelleğe bırak veya geçici dizini sil"""
+        if job.pop('audio_lease', None):
+            self.audio_cache.release(job['video_id'], AUDIO_FORMAT)
+        if 'temp_dir' in job:
+            shutil.rmtree(job.pop('temp_dir'), ignore_errors=True)
+        job.pop('audio_path', None)
+
+    def _write_outputs(self, job):
+        """Transkript/özet dosyalarını ve manifest satırını yaz"""
+        name = job['video_id'] or f"video_{job['index'] + 1:04d}"
+        record = {
+            'url': job['url'],
+            'video_id': job['video_id'],
+            'title': job.get('title', ''),
+            'cached': job.get('cached', False),
+            'source': job['trace'].labels.get('transcript_source'),
+            'summary_source': job['trace'].labels.get('summary_source'),
+            'error': job.get('error'),
+            'timings': job['timings'],
+        }
+        if job.get('transcript') is not None:
+            record['transcript_file'] = os.path.join(self.output_dir, f"{name}.txt")
+            with open(record['transcript_file'], 'w', encoding='utf-8') as f:
+                f.write(job['transcript'])
+        if job.get('summary') is not None:
+            record['summary_file'] = os.path.join(self.output_dir, f"{name}.md")
+            with open(record['summary_file'], 'w', encoding='utf-8') as f:
+                f.write(job['summary'])
+
+        with self._manifest_lock:
+            with open(os.path.join(self.output_dir, "results.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def run(self, urls):
+        """Tüm URL'leri işle - tamamlanan işlerin listesini döndür"""
+        transcribe_queue = queue.Queue(maxsize=self.queue_size)
+        summary_queue = queue.Queue(maxsize=self.queue_size)
+        results = []
+
+        threads = [
+            threading.Thread(target=self._download_stage, args=(urls, transcribe_queue), name="download"),
+            threading.Thread(target=self._transcribe_stage, args=(transcribe_queue, summary_queue), name="transcribe"),
+            threading.Thread(target=self._summary_stage, args=(summary_queue, results), name="summary"),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.pool.shutdown()
+        return results
+
+
+def print_search_results(query, limit=20):
+    """Bölüm dizininde ara ve sonuçları zaman damgalı bağlantılarla yazdır"""
+    index = open_segment_index()
+    if index is None:
+        print("Bölüm dizini kapalı (YEB_SEGMENT_INDEX=0) veya açılamadı")
+        return 1
+    hits = index.search(query, limit=limit)
+    for hit in hits:
+        print(f"{hit['video_id']} {format_timestamp(hit['start']):>8}  {hit['url']}")
+        print(f"    {hit['title']}: {hit['text']}" if hit['title'] else f"    {hit['text']}")
+    if not hits:
+        print("Sonuç bulunamadı")
+    return 0
+
+
+def print_preview(urls, model_name, language, captions=True):
+    """Videoların meta verisini çöz; süre ve tahmini işlem maliyetini yazdır (video işlemez)"""
+    started = time.perf_counter()
+    results = get_metadata_service().preview(urls)
+    for result in results:
+        meta = result['meta']
+        if meta is None:
+            print(f"{'?':>8}  {result['url']}  (hata: {result['error']})")
+            continue
+        caption_mark = "cc" if captions and has_captions(meta, language) else "  "
+        print(f"{format_timestamp(meta['duration']):>8} {caption_mark} {meta['id']}  {meta['title']}")
+
+    cost = estimate_cost(results, model_name, language, allow_captions=captions)
+    print(
+        f"\n{cost['videos']} video ({cost['failed']} hatalı) | Toplam süre: {format_timestamp(cost['total_duration_s'])}"
+        f" | Altyazılı: {cost['captioned']} | Whisper: {format_timestamp(cost['whisper_duration_s'])}"
+    )
+    print(
+        f"Tahmini işlem ({model_name}): ~{format_timestamp(cost['estimated_processing_s'])}"
+        f" | Meta veri: {time.perf_counter() - started:.1f} sn"
+    )
+    return 1 if cost['failed'] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="YouTube videolarını arayüz olmadan toplu olarak metne çevir ve özetle"
+    )
+    parser.add_argument("urls", nargs="*", help="Video, playlist veya kanal URL'leri")
+    parser.add_argument("-i", "--input", help="Her satırda bir URL bulunan dosya")
+    parser.add_argument("-o", "--output-dir", default="batch_output", help="Çıktı dizini")
+    parser.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"])
+    parser.add_argument("--language", default="tr")
+    parser.add_argument("--chunk-length", type=float, help="Parça uzunluğu (dakika) - verilmezse otomatik")
+    parser.add_argument("--chunk-strategy", default="fixed", choices=CHUNK_STRATEGIES)
+    parser.add_argument("--worker-mode", default="thread", choices=WORKER_MODES)
+    parser.add_argument("--engine", default="chunk", choices=TRANSCRIBE_ENGINES, help="Whisper çözme motoru")
+    parser.add_argument("--quantization", default="fp32", choices=QUANTIZATIONS,
+                        help="int8: Linear katmanları nicemlenmiş CPU modeli")
+    parser.add_argument("--no-summary", action="store_true", help="Gemini özetini atla")
+    parser.add_argument("--no-captions", action="store_true", help="YouTube altyazılarını kullanma, her zaman Whisper")
+    parser.add_argument("--stream", action="store_true", help="Sesi indirirken metne çevir (sabit parçalama)")
+    parser.add_argument("--queue-size", type=int, default=1, help="Aşamalar arası kuyruk boyutu")
+    parser.add_argument("--search", metavar="IFADE", help="İşlenmiş videolarda ifade ara (video işlemez)")
+    parser.add_argument("--search-limit", type=int, default=20, help="--search ile gösterilecek en fazla sonuç")
+    parser.add_argument("--preview", action="store_true",
+                        help="Videoları listele, toplam süre ve işlem maliyetini tahmin et (video işlemez)")
+    args = parser.parse_args(argv)
+
+    if args.search:
+        return print_search_results(args.search, args.search_limit)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    urls = list(args.urls)
+    if args.input:
+        urls.extend(read_url_list(args.input))
+    if not urls:
+        parser.error("En az bir URL veya --input dosyası gerekli")
+
+    if args.preview:
+        return print_preview(urls, quantized_model_name(args.model, args.quantization), args.language,
+                             captions=not args.no_captions)
+
+    urls = expand_urls(urls)
+    logger.info("%d video işlenecek", len(urls))
+
+    pipeline = BatchPipeline(
+        args.output_dir,
+        model_name=quantized_model_name(args.model, args.quantization),
+        language=args.language,
+        chunk_length=args.chunk_length,
+        chunk_strategy=args.chunk_strategy,
+        worker_mode=args.worker_mode,
+        summarize=not args.no_summary,
+        queue_size=args.queue_size,
+        engine=args.engine,
+        captions=not args.no_captions,
+        stream=args.stream,
+    )
+    results = pipeline.run(urls)
+
+    failed = sum(1 for job in results if 'error' in job)
+    logger.info("Bitti: %d başarılı, %d hatalı", len(results) - failed, failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+import metrics
+
+# Geçici kabul edilen HTTP kodları ve hata sınıfları (google.api_core)
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket hız sınırlayıcı"""
+
+    def __init__(self, rate_per_s, capacity):
+        self.rate_per_s = rate_per_s
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Yeterli token birikene kadar bekle"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate_per_s
+            time.sleep(wait)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter():
+    """Process genelinde (tüm oturumlar) paylaşılan Gemini hız sınırlayıcı"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            rpm = float(os.getenv("YEB_GEMINI_RPM", "15"))
+            _shared_limiter = TokenBucket(rate_per_s=rpm / 60, capacity=max(1, min(rpm, 5)))
+        return _shared_limiter
+
+
+def is_transient_error(error):
+    """Tekrar denenebilir hata mı"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in TRANSIENT_STATUS_CODES
+
+
+def _usage(response):
+    """Yanıttaki token sayıları"""
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None),
+        "total_tokens": getattr(usage, "total_token_count", None),
+    }
+
+
+class GeminiClient:
+    """GenerativeModel sarmalayıcı - hız sınırı, jitter'lı tekrar, zaman aşımı, akış ve çağrı metrikleri"""
+
+    def __init__(self, model, rate_limiter=None, max_retries=3, timeout_s=120,
+                 backoff_base_s=1.0, backoff_max_s=30.0, history_size=200):
+        self.model = model
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.timeout_s = timeout_s
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.calls = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self):
+        """Sarılan modelin adı (ör. models/gemini-1.5-flash)"""
+        return getattr(self.model, "model_name", None)
+
+    def _request_kwargs(self, generation_config, stream=False):
+        kwargs = {"generation_config": generation_config}
+        if stream:
+            kwargs["stream"] = True
+        if self.timeout_s:
+            kwargs["request_options"] = {"timeout": self.timeout_s}
+        return kwargs
+
+    def _backoff(self, attempt):
+        """Tam jitter'lı üstel bekleme"""
+        delay = min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+    def _record(self, started, attempts, response, streamed):
+        call = {
+            "latency_s": time.monotonic() - started,
+            "attempts": attempts,
+            "streamed": streamed,
+            "time": time.time(),
+        }
+        call.update(_usage(response))
+        with self._lock:
+            self.calls.append(call)
+        metrics.record(
+            "gemini_call", call["latency_s"], 0.0,
+            prompt_tokens=call["prompt_tokens"], output_tokens=call["output_tokens"],
+        )
+        return call
+
+    def _call(self, prompt, generation_config, stream):
+        """Hız sınırı ve tekrar denemeyle isteği başlat - (yanıt, deneme sayısı)"""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return self.model.generate_content(
+                    prompt, **self._request_kwargs(generation_config, stream)
+                ), attempt + 1
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                self._backoff(attempt)
+                attempt += 1
+
+    def generate_content(self, prompt, generation_config=None):
+        """GenerativeModel.generate_content ile aynı arayüz"""
+        started = time.monotonic()
+        response, attempts = self._call(prompt, generation_config, stream=False)
+        self._record(started, attempts, response, streamed=False)
+        return response
+
+    def stream(self, prompt, generation_config=None):
+        """Yanıt metnini geldikçe parça parça üret"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            response, attempts = self._call(prompt, generation_config, stream=True)
+            attempt += attempts
+            emitted = False
+            try:
+                for chunk in response:
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        emitted = True
+                        yield text
+                break
+            except Exception as e:
+                # Metin üretildikten sonra tekrar denemek çıktıyı çoğaltır
+                if emitted or attempt > self.max_retries or not is_transient_error(e):
+                    raise
+                self._backoff(attempt - 1)
+        self._record(started, attempt, response, streamed=True)
+
+    def stats(self):
+        """Son çağrıların gecikme ve token özetleri"""
+        with self._lock:
+            calls = list(self.calls)
+        if not calls:
+            return {"calls": 0}
+
+        latencies = sorted(c["latency_s"] for c in calls)
+        return {
+            "calls": len(calls),
+            "avg_latency_s": sum(latencies) / len(latencies),
+            "p95_latency_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "prompt_tokens": sum(c["prompt_tokens"] or 0 for c in calls),
+            "output_tokens": sum(c["output_tokens"] or 0 for c in calls),
+            "retries": sum(c["attempts"] - 1 for c in calls),
+            "last_call": calls[-1],
+        }
+
+
+# .env dosyasını manuel olarak oku
+def load_env_file():
+    """Manuel olarak .env dosyasını oku"""
+    try:
+        with open('.env', 'r') as f:
+            for line in f:
+                if line.strip() and not line.startswith('#'):
+                    key, value = line.strip().split('=', 1)
+                    os.environ[key] = value
+    except FileNotFoundError:
+        pass
+
+
+def create_gemini_client():
+    """Gemini API'yi yapılandır - anahtar yoksa None"""
+    # Önce .env dosyasını yükle
+    load_env_file()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+
+    try:
+        # İçe aktarma pahalı - sadece anahtar varsa yüklenir
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        # Hız sınırı tüm oturumlarda ortak
+        return GeminiClient(
+            genai.GenerativeModel('gemini-1.5-flash'),
+            rate_limiter=get_shared_rate_limiter(),
+            max_retries=int(os.getenv("YEB_GEMINI_MAX_RETRIES", "3")),
+            timeout_s=float(os.getenv("YEB_GEMINI_TIMEOUT_S", "120")),
+        )
+    except Exception:
+        return None
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_gemini_client():
+    """Process genelinde tek Gemini istemcisi - ısınma ve uygulama aynı yapılandırılmış istemciyi kullanır
+
+    Anahtar yoksa None döner ve sonraki çağrıda yeniden denenir.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = create_gemini_client()
+        return _shared_client
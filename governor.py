@@ -0,0 +1,203 @@
+import os
+import math
+import time
+import threading
+import collections
+import metrics
+from scheduler import MEMORY_HEADROOM, available_memory_mb, model_memory_mb, plan_transcription
+
+# İlk işler bitene kadar kullanılan ortalama iş süresi tahmini (sn)
+DEFAULT_JOB_SECONDS = 120
+# Ortalama iş süresi için üstel hareketli ortalama ağırlığı
+DURATION_SMOOTHING = 0.3
+
+
+# Paralel olmayan yolun havuz anahtarındaki worker tipi - tek paylaşılan model
+SINGLE_MODEL = "single"
+
+
+class QueueFullError(Exception):
+    """Kuyruk sınırı dolu - iş kabul edilmedi"""
+
+
+def pool_key(model_name, mode="thread", engine="chunk"):
+    """Bellekte kalan model kopyalarının anahtarı - havuzlar (model, worker tipi, motor) başına ayrıdır"""
+    return (model_name, mode, engine)
+
+
+def pool_memory_mb(key):
+    """Havuzun bellekte tuttuğu modeller - worker sayısı × model başına bellek (tek model yolunda bir kopya)"""
+    model_name, mode, _ = key
+    copies = 1 if mode == SINGLE_MODEL else plan_transcription(model_name).workers
+    return model_memory_mb(model_name) * copies
+
+
+class _Ticket:
+    def __init__(self, job_id, pool_key, memory_mb):
+        self.job_id = job_id
+        self.pool_key = pool_key
+        self.memory_mb = memory_mb
+        self.started = None
+
+
+class ResourceGovernor:
+    """Oturumlar arası ortak kabul kontrolü - bellek ve eşzamanlı iş yuvası sınırlı, FIFO kuyruk
+
+    Havuzlar (ve içlerindeki model kopyaları) iş bittikten sonra da bellekte kalır; bu yüzden
+    bellek havuz anahtarı başına ayrılır ve havuz yaşadıkça ayrılmış sayılır. Aynı havuzu kullanan
+    işler ek bellek istemez. Yeni havuz sığmıyorsa boştaki havuzlar (en uzun süredir kullanılmayan
+    önce) evict_fn(havuz anahtarı, unload_model=...) ile kapatılır; aynı temel modeli kullanan başka
+    havuz bellekte kalıyorsa unload_model=False verilir ve paylaşılan model bırakılmaz.
+    max_queue sadece hemen başlayamayacak işleri sınırlar - boş yuvaya girecek işler sayılmaz.
+    Tek başına kapasiteyi aşan iş, başka iş çalışmıyorsa yine de kabul edilir (kilitlenmeme için).
+    memory_mb verilmezse boş belleğe göre belirlenir; boş bellek okunamıyorsa (ör. macOS)
+    bellek sınırı uygulanmaz, sadece iş yuvaları sınırlar.
+    """
+
+    def __init__(self, memory_mb=None, slots=2, max_queue=10, cost_fn=None, evict_fn=None):
+        if memory_mb is None:
+            free_mb = available_memory_mb()
+            memory_mb = free_mb * MEMORY_HEADROOM if free_mb is not None else None
+        self.memory_mb = memory_mb
+        self.slots = max(1, int(slots))
+        self.max_queue = max_queue
+        # cost_fn(havuz anahtarı) -> MB; varsayılan havuzdaki model kopyalarının belleği
+        self._cost_fn = cost_fn or pool_memory_mb
+        # evict_fn(havuz anahtarı, unload_model) havuzu kapatıp belleğini bırakır; verilmezse havuzlar hiç bırakılmaz
+        self._evict_fn = evict_fn
+        self._cond = threading.Condition()
+        self._waiting = collections.OrderedDict()  # iş kimliği -> _Ticket
+        self._running = {}
+        self._tickets = {}
+        self._resident = collections.OrderedDict()  # havuz anahtarı -> MB (en uzun süredir boşta olan önce)
+        self._avg_job_s = DEFAULT_JOB_SECONDS
+
+    def enqueue(self, job_id, model_name, force=False, key=None):
+        """İşi kuyruğa al - kuyruk doluysa QueueFullError (force=True ise sınır uygulanmaz)
+
+        key: işin kullanacağı havuzun anahtarı (pool_key); verilmezse modelin varsayılan thread havuzu.
+        """
+        with self._cond:
+            if job_id in self._tickets:
+                return self._tickets[job_id]
+            backlog = self._backlog()
+            if not force and self.max_queue and backlog >= self.max_queue:
+                metrics.REGISTRY.count("yeb_admission_rejected_total")
+                raise QueueFullError(
+                    f"Sunucu şu an yoğun: {backlog} iş sırada bekliyor. Lütfen birkaç dakika sonra tekrar deneyin."
+                )
+            key = key or pool_key(model_name)
+            ticket = _Ticket(job_id, key, self._cost_fn(key))
+            self._waiting[job_id] = ticket
+            self._tickets[job_id] = ticket
+            return ticket
+
+    def _backlog(self):
+        """Boş yuvaya giremeyip sırada kalacak iş sayısı - kabul edilmek üzere olan işler hariç"""
+        free_slots = max(0, self.slots - len(self._running))
+        return max(0, len(self._waiting) - free_slots)
+
+    def _reserved_mb(self):
+        return sum(self._resident.values())
+
+    def _idle_pools(self):
+        """Çalışan işin kullanmadığı bellekteki havuzlar - en uzun süredir boşta olan önce"""
+        busy = {ticket.pool_key for ticket in self._running.values()}
+        return [key for key in self._resident if key not in busy]
+
+    def _fits(self, ticket):
+        if len(self._running) >= self.slots:
+            return False
+        if ticket.pool_key in self._resident or self.memory_mb is None:
+            # Havuz zaten bellekte - yeni model kopyası yüklenmez
+            return True
+        free_mb = self.memory_mb - self._reserved_mb()
+        if free_mb >= ticket.memory_mb:
+            return True
+        if self._evict_fn is None:
+            return not self._running
+        evictable = self._idle_pools()
+        if free_mb + sum(self._resident[key] for key in evictable) < ticket.memory_mb and self._running:
+            return False
+        # Boştaki havuzları yeni havuza yer açılana kadar kapat
+        for key in evictable:
+            if free_mb >= ticket.memory_mb:
+                break
+            free_mb += self._resident.pop(key)
+            # Aynı temel model başka bir havuzda ya da gelen işte kullanılıyorsa bellekte kalır
+            shared = any(other[0] == key[0] for other in (*self._resident, ticket.pool_key))
+            self._evict_fn(key, unload_model=not shared)
+            metrics.REGISTRY.count("yeb_pool_evictions_total")
+        return True
+
+    def _can_admit(self, ticket):
+        # Sıkı FIFO: sadece kuyruğun başındaki iş kabul edilir
+        return next(iter(self._waiting)) == ticket.job_id and self._fits(ticket)
+
+    def _eta_s(self, position):
+        """Sıradaki iş için tahmini bekleme - önündeki işler yuvalara bölünür"""
+        return math.ceil(position / self.slots) * self._avg_job_s
+
+    def queue_position(self, job_id):
+        """Bekleyen işin (sırası, tahmini bekleme sn) - kuyrukta değilse None"""
+        with self._cond:
+            for position, waiting_id in enumerate(self._waiting, 1):
+                if waiting_id == job_id:
+                    return position, self._eta_s(position)
+            return None
+
+    def wait(self, job_id, poll_s=1.0):
+        """Kaynak açılana kadar bekle"""
+        ticket = self._tickets[job_id]
+        with metrics.span("admission_wait") as span:
+            with self._cond:
+                while not self._can_admit(ticket):
+                    self._cond.wait(poll_s)
+                del self._waiting[job_id]
+                self._running[job_id] = ticket
+                self._resident.pop(ticket.pool_key, None)
+                self._resident[ticket.pool_key] = ticket.memory_mb
+                ticket.started = time.monotonic()
+            span["queued"] = len(self._waiting)
+        return ticket
+
+    def release(self, job_id):
+        """İş bitti - yuvayı bırak ve bekleyenleri uyandır (havuzun belleği tahliyeye kadar ayrılı kalır)"""
+        with self._cond:
+            ticket = self._tickets.pop(job_id, None)
+            if ticket is None:
+                return
+            self._waiting.pop(job_id, None)
+            if self._running.pop(job_id, None) is not None and ticket.started is not None:
+                # Havuz en son kullanılan olarak tahliye sırasının sonuna geçer
+                if ticket.pool_key in self._resident:
+                    self._resident.move_to_end(ticket.pool_key)
+                duration = time.monotonic() - ticket.started
+                self._avg_job_s += DURATION_SMOOTHING * (duration - self._avg_job_s)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """Çalışan/bekleyen iş sayısı ve ayrılmış bellek"""
+        with self._cond:
+            return {
+                "running": len(self._running),
+                "queued": len(self._waiting),
+                "slots": self.slots,
+                "max_queue": self.max_queue,
+                "reserved_mb": self._reserved_mb(),
+                "resident_pools": len(self._resident),
+                "memory_mb": self.memory_mb,
+                "avg_job_s": self._avg_job_s,
+            }
+
+
+def governor_from_env(cost_fn=None, evict_fn=None):
+    """YEB_GOVERNOR_* ortam değişkenlerinden kabul kontrolcüsü oluştur"""
+    memory_mb = os.getenv("YEB_GOVERNOR_MEMORY_MB")
+    return ResourceGovernor(
+        memory_mb=float(memory_mb) if memory_mb else None,
+        slots=int(os.getenv("YEB_GOVERNOR_SLOTS", "2")),
+        max_queue=int(os.getenv("YEB_MAX_QUEUED_JOBS", "10")),
+        cost_fn=cost_fn,
+        evict_fn=evict_fn,
+    )
@@ -0,0 +1,431 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+import metrics
+from cache_store import get_cache_dir, make_cache_key
+from pipeline import (
+    AUDIO_FORMAT, download_audio, fetch_video_info, iter_transcribe_audio, iter_transcribe_stream,
+    resolve_audio_stream, try_caption_transcript,
+)
+from transcript_cache import is_cacheable_transcript, transcript_params
+from youtube_utils import extract_video_id
+from summarizer import stream_transcript_summary
+from summary_cache import is_cacheable_summary, summary_params
+from model_pool import absolute_segments, transcribe_with_model
+from governor import SINGLE_MODEL, QueueFullError, pool_key
+
+# İş durumları
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Akış sırasında veritabanı güncellemeleri arasındaki en kısa süre
+_PARTIAL_UPDATE_INTERVAL_S = 0.5
+
+_JSON_FIELDS = ("params", "messages")
+
+
+class JobStore:
+    """İş durumu ve çıktılarının SQLite'ta kalıcı tutulması"""
+
+    def __init__(self, path, retention_s=7 * 24 * 3600):
+        self.path = path
+        self.retention_s = retention_s
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    params_key TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    messages TEXT NOT NULL DEFAULT '[]',
+                    title TEXT,
+                    transcript TEXT,
+                    summary TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_params ON jobs(params_key, status)")
+            if retention_s:
+                conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                    (JOB_DONE, JOB_FAILED, time.time() - retention_s),
+                )
+
+    @contextmanager
+    def _connect(self):
+        """Bağlantı aç, işlemi commit et ve kapat"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def _insert(self, conn, params):
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs(id, params_key, params, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, make_cache_key(params), json.dumps(params, ensure_ascii=False), JOB_QUEUED, now, now),
+        )
+        return job_id
+
+    def create(self, params):
+        """Yeni iş kaydı oluştur - iş kimliğini döndür"""
+        with self._lock, self._connect() as conn:
+            return self._insert(conn, params)
+
+    def create_unless_active(self, params):
+        """Aynı parametrelerle bekleyen/çalışan iş yoksa oluştur - (iş kimliği, yeni mi)
+
+        Kontrol ve ekleme tek yazma işleminde (BEGIN IMMEDIATE) yapılır; aynı videoyu aynı anda
+        gönderen oturumlar (başka süreçler dahil) tek iş paylaşır.
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE params_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (make_cache_key(params), JOB_QUEUED, JOB_RUNNING),
+            ).fetchone()
+            if row:
+                return row[0], False
+            return self._insert(conn, params), True
+
+    def get(self, job_id):
+        """İş kaydını döndür - yoksa None"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        """İş alanlarını güncelle"""
+        for field in _JSON_FIELDS:
+            if field in fields:
+                fields[field] = json.dumps(fields[field], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def find_active(self, params):
+        """Aynı parametrelerle bekleyen/çalışan işi bul"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE params_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (make_cache_key(params), JOB_QUEUED, JOB_RUNNING),
+            ).fetchone()
+        return row[0] if row else None
+
+    def unfinished(self):
+        """Yarım kalmış işler (ör. süreç yeniden başladıysa)"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+def job_pool_key(params):
+    """İşin bellekte tutacağı havuzun anahtarı - paralel olmayan yol tek paylaşılan modeli kullanır"""
+    if not params.get("parallel"):
+        return pool_key(params["model_name"], SINGLE_MODEL)
+    return pool_key(params["model_name"], params["worker_mode"], params.get("engine", "chunk"))
+
+
+class JobEngine:
+    """Analiz işlerini arka planda çalıştırır - Streamlit yeniden çalışmalarından bağımsız"""
+
+    def __init__(self, store, pool_factory, model_loader, audio_cache, transcript_cache,
+                 gemini=None, workers=1, segment_index=None, summary_cache=None, governor=None,
+                 checkpoints=None):
+        self.store = store
+        self.pool_factory = pool_factory
+        self.model_loader = model_loader
+        self.audio_cache = audio_cache
+        self.transcript_cache = transcript_cache
+        self.gemini = gemini
+        self.segment_index = segment_index
+        self.summary_cache = summary_cache
+        # Verilirse işler bellek/yuva açılana kadar sırada bekler
+        self.governor = governor
+        # Verilirse biten parçalar kaydedilir, yeniden denemede sadece eksikler işlenir
+        self.checkpoints = checkpoints
+        self._queue = queue.Queue()
+
+        # Kabul kontrolünde her yuva için bir worker gerekir
+        if governor is not None:
+            workers = max(workers, governor.slots)
+        for index in range(max(1, workers)):
+            threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True).start()
+
+        # Önceki süreçte yarım kalan işleri yeniden kuyruğa al
+        for job_id in store.unfinished():
+            store.update(job_id, status=JOB_QUEUED, message="🔁 Yeniden başlatılıyor...")
+            if governor is not None:
+                params = store.get(job_id)["params"]
+                governor.enqueue(job_id, params["model_name"], force=True, key=job_pool_key(params))
+            self._queue.put(job_id)
+
+    def submit(self, params):
+        """İşi kuyruğa ekle - aynı parametrelerle süren iş varsa onun kimliği döner
+
+        Kabul kuyruğu doluysa iş başarısız olarak işaretlenir ve QueueFullError fırlatılır.
+        """
+        job_id, created = self.store.create_unless_active(params)
+        if not created:
+            return job_id
+        if self.governor is not None:
+            try:
+                self.governor.enqueue(job_id, params["model_name"], key=job_pool_key(params))
+            except QueueFullError as e:
+                self.store.update(job_id, status=JOB_FAILED, error=str(e), message=f"🚦 {e}")
+                raise
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        """İş durumu ve çıktıları - kabul bekleyen işin mesajında sırası ve tahmini bekleme görünür"""
+        job = self.store.get(job_id)
+        if job is not None and job["status"] == JOB_QUEUED and self.governor is not None:
+            queued = self.governor.queue_position(job_id)
+            if queued:
+                position, eta_s = queued
+                job["message"] = f"⏳ Sırada {position}. | Tahmini bekleme ~{max(1, round(eta_s / 60))} dk"
+        return job
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in (JOB_QUEUED, JOB_RUNNING):
+                continue
+            params = job["params"]
+            trace = metrics.Trace(job_id, url=params["url"], model=params["model_name"])
+            try:
+                if self.governor is not None:
+                    with metrics.use_trace(trace):
+                        self.governor.wait(job_id)
+                self.store.update(job_id, status=JOB_RUNNING)
+                with metrics.use_trace(trace), metrics.maybe_profile(job_id, params.get("profile")):
+                    self._execute(job_id, params)
+                self.store.update(job_id, status=JOB_DONE, stage="done", progress=1.0,
+                                  message="✅ Analiz tamamlandı!")
+                metrics.finish_job(trace, JOB_DONE)
+            except Exception as e:
+                self.store.update(job_id, status=JOB_FAILED, error=str(e), message=f"❌ Hata: {str(e)}")
+                metrics.finish_job(trace, JOB_FAILED)
+            finally:
+                if self.governor is not None:
+                    self.governor.release(job_id)
+
+    def _execute(self, job_id, params):
+        """İndirme → transkripsiyon → özet aşamalarını çalıştır"""
+        messages = []
+
+        def report(stage, progress, message):
+            self.store.update(job_id, stage=stage, progress=progress, message=message)
+
+        def notify(level, message):
+            messages.append(message)
+            self.store.update(job_id, messages=messages)
+
+        url = params["url"]
+        video_id = extract_video_id(url)
+        title = fetch_video_info(url).get("title", "")
+        self.store.update(job_id, title=title)
+
+        # 0. Transkript önbelleği - isabet varsa indirme ve Whisper atlanır
+        cache_params = transcript_params(
+            params["model_name"], params["language"], params["parallel"],
+            params["chunk_length"], params["chunk_strategy"], params.get("engine", "chunk"),
+        )
+        transcript = self.transcript_cache.get_transcript(video_id, cache_params) if video_id else None
+        segments = []
+
+        if transcript is not None:
+            notify("info", "⚡ Transkript önbellekten alındı!")
+            metrics.label("transcript_source", "cache")
+        elif params.get("captions"):
+            # Altyazı hızlı yolu - uygun iz varsa indirme ve Whisper atlanır
+            report("captions", 0.05, "📜 Altyazılar kontrol ediliyor...")
+            transcript = try_caption_transcript(url, params["language"], notify, segments=segments)
+
+        if transcript is None:
+            checkpoint = None
+            if self.checkpoints is not None and video_id and params["parallel"]:
+                checkpoint = self.checkpoints.open(video_id, cache_params)
+            transcript = self._transcribe(job_id, url, video_id, params, report, notify, segments, checkpoint)
+            metrics.label("transcript_source", "whisper")
+            if video_id and is_cacheable_transcript(transcript):
+                self.transcript_cache.put_transcript(video_id, cache_params, transcript)
+                # Tam transkript önbellekte - parça kayıtları artık gerekmez
+                if checkpoint is not None:
+                    checkpoint.clear()
+        # Whisper ve altyazı yolunun bölümleri aynı dizine yazılır
+        if video_id and segments:
+            self._index_segments(video_id, title, params["language"], segments, notify)
+
+        self.store.update(job_id, transcript=transcript)
+
+        # 3. AI özetleme (gerekirse)
+        if params.get("summarize") and self.gemini is not None:
+            self._summarize(job_id, transcript, title, report, notify)
+
+    def _summarize(self, job_id, transcript, title, report, notify):
+        """Özeti önbellekten al veya Gemini ile akışlı üret"""
+        summary_key = summary_params(self.gemini.model_name)
+        if self.summary_cache is not None:
+            summary = self.summary_cache.get_summary(transcript, title, summary_key)
+            if summary is not None:
+                notify("info", "⚡ Özet önbellekten alındı!")
+                metrics.label("summary_source", "cache")
+                self.store.update(job_id, summary=summary)
+                return
+
+        report("summary", 0.9, "🔮 AI özet hazırlanıyor...")
+        summary = ""
+        last_update = 0.0
+        with metrics.span("summary"):
+            for text in stream_transcript_summary(self.gemini, transcript, title):
+                summary += text
+                if time.monotonic() - last_update >= _PARTIAL_UPDATE_INTERVAL_S:
+                    self.store.update(job_id, summary=summary)
+                    last_update = time.monotonic()
+        self.store.update(job_id, summary=summary)
+        metrics.label("summary_source", "gemini")
+        if self.summary_cache is not None and is_cacheable_summary(summary):
+            self.summary_cache.put_summary(transcript, title, summary_key, summary)
+
+    def _index_segments(self, video_id, title, language, segments, notify):
+        """Zaman damgalı bölümleri arama dizinine yaz - hata işi durdurmaz"""
+        if self.segment_index is None:
+            return
+        try:
+            with metrics.span("segment_index", segments=len(segments)):
+                self.segment_index.add_video(video_id, segments, title, language)
+        except Exception as e:
+            notify("warning", f"Bölümler arama dizinine yazılamadı: {e}")
+
+    def _publish_transcript(self, job_id, results, texts=None, segments=None):
+        """Sıralı önek hazır oldukça kısmi transkripti yayınla - tam metni döndür"""
+        texts = [] if texts is None else texts
+        for _, text, chunk_segments in results:
+            if segments is not None:
+                segments.extend(chunk_segments)
+            if text.strip():
+                texts.append(text.strip())
+                self.store.update(job_id, transcript=" ".join(texts))
+        return " ".join(texts)
+
+    def _use_streaming(self, video_id, params):
+        """Akışlı indirme sadece sabit parçalı paralel yolda ve ses önbellekte yokken kullanılır"""
+        return (params.get("streaming") and params["parallel"] and params["chunk_strategy"] == "fixed"
+                and not (video_id and self.audio_cache.contains(video_id, AUDIO_FORMAT)))
+
+    def _transcribe_stream(self, job_id, url, params, report, notify, segments=None, checkpoint=None):
+        """İndirme sürerken metne çevir - hiç parça çıkmadan hata olursa None (dosya yoluna düşülür)"""
+        report("transcribe", 0.05, "📡 Ses akarken metne dönüştürülüyor...")
+        pool = self.pool_factory(params["model_name"], params["worker_mode"], params.get("engine", "chunk"))
+
+        def on_progress(completed, total):
+            report("transcribe", 0.05 + 0.8 * min(1.0, completed / total),
+                   f"📝 {completed}/{total} parça tamamlandı...")
+
+        texts = []
+        try:
+            stream_url, headers, duration, chunk_size = resolve_audio_stream(url)
+            results = iter_transcribe_stream(
+                stream_url, pool, params["language"], params["chunk_length"], notify,
+                on_progress, headers, duration, checkpoint, chunk_size,
+            )
+            return self._publish_transcript(job_id, results, texts, segments)
+        except Exception as e:
+            # Kısmi metin yayınlandıysa baştan indirmek çıktıyı çoğaltır
+            if texts:
+                raise
+            notify("warning", f"Akışlı indirme başarısız, dosya indirilecek: {e}")
+            return None
+
+    def _transcribe(self, job_id, url, video_id, params, report, notify, segments=None, checkpoint=None):
+        """Sesi indir (paylaşılan önbellekten) ve metne çevir - segments listesine mutlak zamanlı bölümler eklenir"""
+        segments = [] if segments is None else segments
+        if self._use_streaming(video_id, params):
+            transcript = self._transcribe_stream(job_id, url, params, report, notify, segments, checkpoint)
+            if transcript is not None:
+                return transcript
+
+        temp_dir = tempfile.mkdtemp()
+        audio_lease = None
+        try:
+            # 1. Ses indirme
+            report("download", 0.05, "🎵 Video sesi indiriliyor...")
+            if video_id:
+                # Aynı video için eşzamanlı istekler tek indirmeyi bekler
+                audio_path = self.audio_cache.acquire(
+                    video_id, AUDIO_FORMAT, lambda target_dir: download_audio(url, target_dir)
+                )
+                audio_lease = (video_id, AUDIO_FORMAT)
+            else:
+                audio_path = download_audio(url, temp_dir)
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError("Ses dosyası oluşturulamadı!")
+
+            # 2. Transkripsiyon
+            if not params["parallel"]:
+                report("transcribe", 0.3, "🧠 Konuşma metne dönüştürülüyor...")
+                # Paralel yolla aynı sıcak modeli paylaşır
+                model = self.model_loader(params["model_name"])
+                with metrics.span("transcribe_serial"):
+                    result = transcribe_with_model(model, audio_path, params["language"])
+                segments.extend(absolute_segments(result))
+                return result['text']
+
+            report("transcribe", 0.15, "🔪 Ses dosyası parçalanıyor...")
+            pool = self.pool_factory(params["model_name"], params["worker_mode"], params.get("engine", "chunk"))
+
+            def on_progress(completed, total):
+                report("transcribe", 0.2 + 0.65 * completed / total,
+                       f"📝 {completed}/{total} parça tamamlandı...")
+
+            return self._publish_transcript(job_id, iter_transcribe_audio(
+                audio_path, pool, params["language"], params["chunk_length"],
+                params["chunk_strategy"], notify, on_progress, checkpoint,
+            ), segments=segments)
+        finally:
+            if audio_lease:
+                self.audio_cache.release(*audio_lease)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def open_job_store():
+    """Varsayılan konumdaki iş deposunu aç"""
+    return JobStore(
+        os.path.join(get_cache_dir(), "jobs.sqlite3"),
+        retention_s=int(float(os.getenv("YEB_JOB_RETENTION_DAYS", "7")) * 24 * 3600),
+    )
@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import logging
+import cProfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cache_store import get_cache_dir
+
+try:
+    import resource
+except ImportError:
+    # Windows'ta yok - tepe bellek ölçülmez
+    resource = None
+
+logger = logging.getLogger("yeb.metrics")
+
+_local = threading.local()
+
+_server = None
+_server_lock = threading.Lock()
+# /ready uç noktası için hazır olma kontrolü (ör. model ısınması)
+_readiness_check = None
+
+
+def peak_rss_bytes():
+    """Sürecin tepe bellek kullanımı (byte) - ölçülemiyorsa None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MetricsRegistry:
+    """Process genelinde toplanan metrikler - Prometheus metin formatında dışa aktarılır"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}   # aşama -> [adet, duvar saati, cpu]
+        self._counters = {}  # (isim, etiketler) -> değer
+        self._rtf = [0, 0.0]
+
+    def observe(self, name, wall_s, cpu_s, attrs):
+        with self._lock:
+            stage = self._stages.setdefault(name, [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += wall_s
+            stage[2] += cpu_s
+            if attrs.get("bytes"):
+                self._inc("yeb_download_bytes_total", attrs["bytes"])
+            if attrs.get("audio_s") and name == "transcribe_chunk":
+                self._inc("yeb_audio_seconds_total", attrs["audio_s"])
+            if attrs.get("rtf") is not None:
+                self._rtf[0] += 1
+                self._rtf[1] += attrs["rtf"]
+            for key in ("prompt_tokens", "output_tokens"):
+                if attrs.get(key):
+                    self._inc(f"yeb_gemini_{key}_total", attrs[key])
+            if attrs.get("tokens_saved"):
+                self._inc("yeb_transcript_tokens_saved_total", attrs["tokens_saved"])
+
+    def _inc(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def count(self, name, **labels):
+        with self._lock:
+            self._inc(name, 1, **labels)
+
+    def count_job(self, status):
+        self.count("yeb_jobs_total", status=status)
+
+    def prometheus_text(self):
+        """Prometheus metin formatı"""
+        lines = [
+            "# HELP yeb_stage_duration_seconds Aşama başına duvar saati süresi",
+            "# TYPE yeb_stage_duration_seconds summary",
+        ]
+        with self._lock:
+            for stage, (count, wall, cpu) in sorted(self._stages.items()):
+                lines.append(f'yeb_stage_duration_seconds_sum{{stage="{stage}"}} {wall:.6f}')
+                lines.append(f'yeb_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+            lines.append("# HELP yeb_stage_cpu_seconds_total Aşamayı çalıştıran thread'in CPU süresi")
+            lines.append("# TYPE yeb_stage_cpu_seconds_total counter")
+            for stage, (_, _, cpu) in sorted(self._stages.items()):
+                lines.append(f'yeb_stage_cpu_seconds_total{{stage="{stage}"}} {cpu:.6f}')
+            lines.append("# HELP yeb_chunk_rtf Parça başına real-time factor")
+            lines.append("# TYPE yeb_chunk_rtf summary")
+            lines.append(f"yeb_chunk_rtf_sum {self._rtf[1]:.6f}")
+            lines.append(f"yeb_chunk_rtf_count {self._rtf[0]}")
+            for (name, labels), value in sorted(self._counters.items()):
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        peak_rss = peak_rss_bytes()
+        if peak_rss is not None:
+            lines.append("# TYPE yeb_process_peak_rss_bytes gauge")
+            lines.append(f"yeb_process_peak_rss_bytes {peak_rss}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Trace:
+    """Tek işin aşama ölçümleri"""
+
+    def __init__(self, job_id=None, **labels):
+        self.job_id = job_id
+        self.labels = labels
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def record(self, name, wall_s, cpu_s, **attrs):
+        with self._lock:
+            self._spans.append({"name": name, "wall_s": wall_s, "cpu_s": cpu_s, **attrs})
+
+    def summary(self):
+        """Aşamaları isimlerine göre topla"""
+        with self._lock:
+            spans = list(self._spans)
+
+        stages = {}
+        for item in spans:
+            stage = stages.setdefault(item["name"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            stage["count"] += 1
+            stage["wall_s"] += item["wall_s"]
+            stage["cpu_s"] += item["cpu_s"]
+            for key in ("bytes", "audio_s", "prompt_tokens", "output_tokens", "tokens_in", "tokens_out", "tokens_saved"):
+                if item.get(key):
+                    stage[key] = stage.get(key, 0) + item[key]
+
+        rtfs = [item["rtf"] for item in spans if item.get("rtf") is not None]
+        if rtfs:
+            stages["transcribe_chunk"]["rtf_min"] = min(rtfs)
+            stages["transcribe_chunk"]["rtf_mean"] = sum(rtfs) / len(rtfs)
+            stages["transcribe_chunk"]["rtf_max"] = max(rtfs)
+
+        return {
+            "job_id": self.job_id,
+            **self.labels,
+            "wall_s": time.time() - self.started,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+
+def current_trace():
+    """Bu thread'de etkin iz - yoksa None"""
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def use_trace(trace):
+    """Bu thread'deki ölçümleri verilen işe bağla"""
+    previous = current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+def record(name, wall_s, cpu_s, trace=None, **attrs):
+    """Hazır ölçümü kaydet - iz verilmezse thread'in etkin izi kullanılır"""
+    REGISTRY.observe(name, wall_s, cpu_s, attrs)
+    trace = trace or current_trace()
+    if trace is not None:
+        trace.record(name, wall_s, cpu_s, **attrs)
+
+
+def label(key, value):
+    """Etkin işe etiket ekle (ör. transkriptin hangi yoldan geldiği) ve değeri say"""
+    REGISTRY.count(f"yeb_{key}_total", **{key: value})
+    trace = current_trace()
+    if trace is not None:
+        trace.labels[key] = value
+
+
+@contextmanager
+def span(name, **attrs):
+    """Duvar saati ve bu thread'in CPU süresini ölç - çağıran attrs sözlüğüne değer ekleyebilir
+
+    process_time() paralel işlerin ve havuz thread'lerinin CPU'sunu da sayardı; aşamayı çalıştıran
+    thread'in süresi ölçülür (ffmpeg gibi alt süreçler dahil değildir).
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield attrs
+    finally:
+        record(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start, **attrs)
+
+
+def finish_job(trace, status):
+    """İş bitti - JSON log satırı yaz, Prometheus dosyasını yenile"""
+    REGISTRY.count_job(status)
+    line = json.dumps({"event": "job_metrics", "status": status, **trace.summary()}, ensure_ascii=False)
+    logger.info(line)
+
+    metrics_dir = os.path.join(get_cache_dir(), "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    with open(os.path.join(metrics_dir, "jobs.jsonl"), "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    write_prometheus_file(os.path.join(metrics_dir, "metrics.prom"))
+
+
+def write_prometheus_file(path):
+    """node_exporter textfile toplayıcısı için atomik yazım"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(REGISTRY.prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def set_readiness_check(check):
+    """/ready uç noktasının soracağı fonksiyonu ayarla"""
+    global _readiness_check
+    _readiness_check = check
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/ready":
+            ready = _readiness_check is None or _readiness_check()
+            self._send(200 if ready else 503, b"ready\n" if ready else b"warming up\n", "text/plain")
+        elif path == "/metrics":
+            self._send(200, REGISTRY.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self.send_error(404)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port):
+    """/metrics ve /ready uç noktalarını arka planda sun - süreç başına bir kez"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+@contextmanager
+def maybe_profile(job_id, enabled=None):
+    """YEB_PROFILE_JOBS=1 ise işi cProfile ile profille - .prof dosyası snakeviz/py-spy ile incelenebilir"""
+    if enabled is None:
+        enabled = os.getenv("YEB_PROFILE_JOBS") == "1"
+    if not enabled:
+        yield None
+        return
+
+    profile_dir = os.path.join(get_cache_dir(), "profiles")
+    os.makedirs(profile_dir, exist_ok=True)
+    # py-spy ile canlı izlemek için süreç/thread kimliğini logla
+    logger.info("profiling job=%s pid=%s thread=%s", job_id, os.getpid(), threading.get_ident())
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f"{job_id}.prof"))
@@ -0,0 +1,516 @@
+import queue
+import collections
+import threading
+import concurrent.futures
+import multiprocessing
+import time
+import metrics
+from audio_io import SAMPLE_RATE, pcm_duration
+from scheduler import plan_transcription
+from batch_decoder import DEFAULT_BATCH_SIZE, transcribe_chunks_batched
+from quantization import load_model
+
+# Desteklenen worker tipleri
+WORKER_MODES = ("thread", "process")
+# chunk: parça başına model.transcribe | batched: 30 sn pencereler tek ileri geçişte
+TRANSCRIBE_ENGINES = ("chunk", "batched")
+
+# Aynı model nesnesini paylaşan yollar için model başına kilit
+_model_locks = {}
+_model_locks_guard = threading.Lock()
+
+# Akışlı parça kaynağının sonu
+_FEED_END = object()
+
+# Başarısız parça, hata metni olarak kabul edilmeden önce bu kadar tekrar denenir
+CHUNK_RETRIES = 2
+
+# Process worker'larında yüklenen model (process başına bir kez)
+_process_model = None
+
+# Process genelinde paylaşılan sıcak modeller (ısınma ve ilk worker)
+_shared_models = {}
+_shared_models_guard = threading.Lock()
+
+# Process genelinde paylaşılan havuzlar - (model, worker tipi, motor) -> WhisperModelPool
+_shared_pools = {}
+_shared_pools_guard = threading.Lock()
+
+
+def _get_model_lock(model):
+    """Model nesnesine ait kilidi döndür"""
+    with _model_locks_guard:
+        lock = _model_locks.get(id(model))
+        if lock is None:
+            lock = threading.Lock()
+            _model_locks[id(model)] = lock
+        return lock
+
+
+def load_whisper_model(model_name):
+    """Whisper modelini process genelinde bir kez yükle - eşzamanlı çağrılar aynı yüklemeyi bekler
+
+    "-int8" sonekli adlar (ör. "large-int8") int8 nicemlenmiş CPU modeli olarak ayrı cache'lenir.
+    """
+    with _shared_models_guard:
+        entry = _shared_models.setdefault(model_name, {"lock": threading.Lock(), "model": None})
+    with entry["lock"]:
+        if entry["model"] is None:
+            entry["model"] = load_model(model_name)
+        return entry["model"]
+
+
+def unload_whisper_model(model_name):
+    """Paylaşılan sıcak modeli cache'ten çıkar - kullanan son iş bitince bellek boşalır"""
+    with _shared_models_guard:
+        _shared_models.pop(model_name, None)
+
+
+def transcribe_with_model(model, audio, language):
+    """Modeli kilitleyerek transkripsiyon yap - Whisper modeli thread-safe değil"""
+    with _get_model_lock(model):
+        return model.transcribe(
+            audio,
+            language=language,
+            fp16=False,
+            verbose=False,
+            beam_size=1,
+            best_of=1,
+        )
+
+
+def absolute_segments(result, offset=0.0):
+    """Whisper bölümlerini parça başlangıcına göre mutlak zamana çevir - [(başlangıç, bitiş, metin)]"""
+    return [
+        (offset + segment['start'], offset + segment['end'], segment['text'].strip())
+        for segment in result.get('segments') or []
+        if segment['text'].strip()
+    ]
+
+
+def transcribe_chunk(model, chunk_info, language):
+    """Tek bir ses parçasını sıcak modelle metne çevir - (başlangıç, metin, bölümler)"""
+    audio, start_time = chunk_info
+    try:
+        result = transcribe_with_model(model, audio, language)
+        return (start_time, result['text'], absolute_segments(result, start_time))
+    except Exception as e:
+        return (start_time, f"[Hata: {str(e)}]", [])
+
+
+def _timed_transcribe_chunk(model, chunk_info, language):
+    """Parçayı işle ve worker içinde ölçülen süreleri döndür - ((başlangıç, metin, bölümler), ölçümler)"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    result = transcribe_chunk(model, chunk_info, language)
+    wall_s = time.perf_counter() - wall_start
+    stats = {"wall_s": wall_s, "cpu_s": time.thread_time() - cpu_start}
+
+    audio = chunk_info[0]
+    if hasattr(audio, "__len__") and not isinstance(audio, str):
+        stats["audio_s"] = len(audio) / SAMPLE_RATE
+        stats["rtf"] = wall_s / stats["audio_s"] if stats["audio_s"] else None
+    return result, stats
+
+
+def _chunk_seconds(chunk_info):
+    audio = chunk_info[0]
+    return 0.0 if isinstance(audio, str) else len(audio) / SAMPLE_RATE
+
+
+def transcribe_batch(model, chunk_infos, language, batch_size=DEFAULT_BATCH_SIZE):
+    """Parçaları modeli kilitleyerek toplu çöz - hata olursa tüm parçalar hata metni alır"""
+    try:
+        with _get_model_lock(model):
+            return transcribe_chunks_batched(model, chunk_infos, language, batch_size)
+    except Exception as e:
+        return [(start_time, f"[Hata: {str(e)}]", []) for _, start_time in chunk_infos]
+
+
+def _timed_transcribe_batch(model, chunk_infos, language, batch_size):
+    """Toplu çözme ve ölçümler - süreler parçalara ses süresi oranında paylaştırılır"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    results = transcribe_batch(model, chunk_infos, language, batch_size)
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.thread_time() - cpu_start
+
+    seconds = [_chunk_seconds(chunk_info) for chunk_info in chunk_infos]
+    total = sum(seconds)
+    stats = []
+    for audio_s in seconds:
+        share = audio_s / total if total else 1 / len(chunk_infos)
+        stat = {"wall_s": wall_s * share, "cpu_s": cpu_s * share, "batch": len(chunk_infos)}
+        if audio_s:
+            stat["audio_s"] = audio_s
+            stat["rtf"] = wall_s / total
+        stats.append(stat)
+    return results, stats
+
+
+def _record_chunk(stats, trace):
+    """Worker ölçümlerini işin izine ve process metriklerine yaz"""
+    stats = dict(stats)
+    metrics.record("transcribe_chunk", stats.pop("wall_s"), stats.pop("cpu_s"), trace=trace, **stats)
+
+
+def _set_torch_threads(count):
+    """Bu thread'in torch intra-op thread bütçesini ayarla"""
+    if count:
+        import torch
+        torch.set_num_threads(count)
+
+
+def _init_process_worker(model_name, torch_threads=None):
+    """Process worker başlangıcı - model bir kez yüklenir"""
+    global _process_model
+    _set_torch_threads(torch_threads)
+    _process_model = load_model(model_name)
+
+
+def _process_transcribe_chunk(chunk_info, language, engine="chunk", batch_size=DEFAULT_BATCH_SIZE):
+    """Process worker içinde parçayı işle - batched'de parçanın pencereleri birlikte çözülür"""
+    if engine == "batched":
+        results, stats = _timed_transcribe_batch(_process_model, [chunk_info], language, batch_size)
+        return results[0], stats[0]
+    return _timed_transcribe_chunk(_process_model, chunk_info, language)
+
+
+class WhisperModelPool:
+    """Sabit sayıda worker - her worker modeli bir kez yükler ve sıcak tutar"""
+
+    def __init__(self, model_name, workers=1, mode="thread", loader=None, torch_threads=None,
+                 engine="chunk", batch_size=DEFAULT_BATCH_SIZE):
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Geçersiz worker tipi: {mode}")
+        if engine not in TRANSCRIBE_ENGINES:
+            raise ValueError(f"Geçersiz transkripsiyon motoru: {engine}")
+
+        self.model_name = model_name
+        self.workers = max(1, int(workers))
+        self.mode = mode
+        # Worker başına torch thread sayısı - workers × torch_threads çekirdeği aşmamalı
+        self.torch_threads = torch_threads
+        self.engine = engine
+        self.batch_size = max(1, int(batch_size))
+        # Thread worker'ları batched modda kuyruktan birden çok parça alır
+        self.batch_chunks = self.batch_size if engine == "batched" and mode == "thread" else 1
+        # İlk worker paylaşılan cache'ten (load_whisper_model) beslenir
+        self._loader = loader or load_whisper_model
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._executor = None
+        self._closed = False
+
+        if mode == "thread":
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._thread_worker,
+                    args=(index,),
+                    name=f"whisper-{model_name}-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        else:
+            # fork + torch thread'leri kilitlenebilir, spawn kullan
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(model_name, torch_threads),
+            )
+
+    def _load_model(self, index):
+        """Worker modeli yükle - ilk worker cache'lenmiş modeli kullanır"""
+        if index == 0:
+            return self._loader(self.model_name)
+        return load_model(self.model_name)
+
+    def _next_items(self):
+        """Kuyruktan sıradaki iş(ler)i al - batched modda bekleyen parçalar birlikte alınır"""
+        item = self._tasks.get()
+        if item is None:
+            return None
+        items = [item]
+        while len(items) < self.batch_chunks:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Kapatma işaretini diğer worker'lar için geri koy
+                self._tasks.put(None)
+                break
+            items.append(item)
+        return items
+
+    def _run_items(self, model, items):
+        """Aynı dildeki işleri çalıştır ve sonuçları Future'lara yaz"""
+        language = items[0][2]
+        chunk_infos = [chunk_info for _, chunk_info, _, _ in items]
+        if self.engine == "batched":
+            results, stats = _timed_transcribe_batch(model, chunk_infos, language, self.batch_size)
+        else:
+            result, stat = _timed_transcribe_chunk(model, chunk_infos[0], language)
+            results, stats = [result], [stat]
+
+        for (future, _, _, trace), result, stat in zip(items, results, stats):
+            _record_chunk(stat, trace)
+            future.set_result(result)
+
+    def _thread_worker(self, index):
+        """Kuyruktan parça alıp işleyen thread - model ilk işte yüklenir"""
+        model = None
+        _set_torch_threads(self.torch_threads)
+        while True:
+            items = self._next_items()
+            if items is None:
+                break
+            items = [item for item in items if item[0].set_running_or_notify_cancel()]
+            if not items:
+                continue
+
+            # Farklı oturumlardan gelen işler farklı dilde olabilir
+            groups = {}
+            for item in items:
+                groups.setdefault(item[2], []).append(item)
+
+            try:
+                if model is None:
+                    with metrics.span("model_load", model=self.model_name):
+                        model = self._load_model(index)
+                for group in groups.values():
+                    self._run_items(model, group)
+            except BaseException as e:
+                for future, _, _, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def submit(self, chunk_info, language):
+        """Parçayı kuyruğa ekle - (başlangıç, metin, bölümler) döndüren Future"""
+        if self._closed:
+            raise RuntimeError("Model havuzu kapatıldı")
+
+        # Ölçümler gönderen thread'in işine yazılır
+        trace = metrics.current_trace()
+
+        if self._executor is not None:
+            future = concurrent.futures.Future()
+            inner = self._executor.submit(
+                _process_transcribe_chunk, chunk_info, language, self.engine, self.batch_size
+            )
+
+            def unwrap(done):
+                if done.cancelled() or not future.set_running_or_notify_cancel():
+                    future.cancel()
+                elif done.exception() is not None:
+                    future.set_exception(done.exception())
+                else:
+                    result, stats = done.result()
+                    _record_chunk(stats, trace)
+                    future.set_result(result)
+
+            # Dış future iptal edilirse process işini de iptal et
+            future.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+            inner.add_done_callback(unwrap)
+            return future
+
+        future = concurrent.futures.Future()
+        self._tasks.put((future, chunk_info, language, trace))
+        return future
+
+    def shutdown(self, wait=True):
+        """Worker'ları durdur"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+def create_model_pool(model_name, mode="thread", loader=None, engine="chunk"):
+    """Çekirdek, bellek ve model boyutuna göre boyutlanmış havuz"""
+    plan = plan_transcription(model_name)
+    return WhisperModelPool(model_name, workers=plan.workers, mode=mode, loader=loader,
+                            torch_threads=plan.torch_threads, engine=engine)
+
+
+def get_shared_pool(model_name, mode="thread", engine="chunk"):
+    """(model, worker tipi, motor) başına process genelinde tek havuz - worker modelleri oturumlar arası sıcak kalır"""
+    key = (model_name, mode, engine)
+    with _shared_pools_guard:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = create_model_pool(model_name, mode=mode, loader=load_whisper_model,
+                                                          engine=engine)
+        return pool
+
+
+def evict_shared_pool(key, unload_model=True):
+    """Boştaki havuzu kapat ve paylaşılan modeli bırak - kabul kontrolünün evict_fn'i
+
+    key: (model, worker tipi, motor); havuzu olmayan tek model yolunda sadece paylaşılan model bırakılır.
+    unload_model=False iken ya da aynı modelin başka thread havuzu kaldıysa paylaşılan model
+    (load_whisper_model) bellekte tutulur - ilk worker'ı onu kullanan havuzlar yeniden yüklemesin.
+    """
+    model_name = key[0]
+    with _shared_pools_guard:
+        pool = _shared_pools.pop(key, None)
+        in_use = any(other[0] == model_name and other[1] == "thread" for other in _shared_pools)
+    if pool is not None:
+        pool.shutdown(wait=False)
+    if unload_model and not in_use:
+        unload_whisper_model(model_name)
+
+
+class _ChunkFeed:
+    """Parça kaynağı - liste başlangıç sırasıyla hemen, üreteç (akış) arka plan thread'inde okunur"""
+
+    def __init__(self, chunks, prefetch=2):
+        self._closed = False
+        self._error = None
+        if isinstance(chunks, (list, tuple)):
+            self._queue = None
+            self._items = collections.deque(sorted(chunks, key=lambda chunk: chunk[1]))
+        else:
+            # Sınırlı kuyruk: tüketici yavaşsa akış da yavaşlar
+            self._queue = queue.Queue(maxsize=prefetch)
+            threading.Thread(target=self._produce, args=(iter(chunks),), name="chunk-feed", daemon=True).start()
+
+    def _put(self, item):
+        while not self._closed:
+            try:
+                self._queue.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterator):
+        try:
+            for chunk in iterator:
+                if not self._put(chunk):
+                    break
+        except BaseException as e:
+            self._error = e
+        finally:
+            # Üreteç kendi thread'inde kapatılır (ör. ffmpeg süreci sonlanır)
+            if hasattr(iterator, "close"):
+                iterator.close()
+            self._put(_FEED_END)
+
+    def take(self, block):
+        """Sıradaki parça - block=False iken hazır parça yoksa None, kaynak bittiyse _FEED_END"""
+        if self._queue is None:
+            return self._items.popleft() if self._items else _FEED_END
+        try:
+            chunk = self._queue.get(block=block)
+        except queue.Empty:
+            return None
+        if chunk is _FEED_END and self._error is not None:
+            raise self._error
+        return chunk
+
+    def close(self):
+        self._closed = True
+
+
+def _is_failed_result(result):
+    """Parça sonucu worker veya havuz hata metni mi"""
+    return result[1].startswith(("[Hata:", "[İşleme hatası:"))
+
+
+def iter_ordered_transcriptions(pool, chunks, language, on_progress=None, scheduler=None, total=None,
+                                checkpoint=None, retries=CHUNK_RETRIES):
+    """Parçaları havuza gönder, sıralı önek hazır oldukça (başlangıç, metin, bölümler) üret
+
+    Sırası gelmeyen sonuçlar yeniden sıralama tamponunda bekletilir;
+    böylece ilk metin tüm video yerine ilk parça bitince görünür.
+    chunks bir liste ya da başlangıç sırasıyla parça üreten bir üreteç olabilir (akışlı indirme).
+    on_progress(tamamlanan, toplam) her parça bittiğinde çağrılır; üreteçte toplam tahminidir.
+    scheduler verilirse aynı anda en fazla scheduler.limit parça havuzda bekler.
+    checkpoint verilirse kayıtlı parçalar yeniden işlenmez, biten parçalar hemen kaydedilir.
+    Başarısız parçalar en fazla retries kez yeniden gönderilir.
+    """
+    if isinstance(chunks, (list, tuple)):
+        total = len(chunks)
+    feed = _ChunkFeed(chunks)
+
+    pending = {}
+    buffer = {}
+    attempts = {}
+    submitted = 0
+    next_pos = 0
+    completed = 0
+    exhausted = False
+    try:
+        while True:
+            # Batched havuzda her worker birden çok parçayı tek seferde çözer
+            limit = scheduler.limit * pool.batch_chunks if scheduler else float("inf")
+            while not exhausted and len(pending) < limit:
+                # Havuz boşsa yeni parçayı bekle, doluysa sadece hazır olanı al
+                chunk = feed.take(block=not pending)
+                if chunk is None:
+                    break
+                if chunk is _FEED_END:
+                    exhausted = True
+                    break
+                saved = checkpoint.get(chunk) if checkpoint is not None else None
+                if saved is not None:
+                    # Önceki denemede tamamlanmış parça
+                    buffer[submitted] = saved
+                    completed += 1
+                    if on_progress:
+                        on_progress(completed, max(total or 0, submitted + 1))
+                else:
+                    pending[pool.submit(chunk, language)] = (submitted, chunk)
+                submitted += 1
+
+            if pending:
+                # Akış sürerken yeni parçalar için kısa aralıklarla uyan
+                timeout = None if exhausted or len(pending) >= limit else 0.2
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    position, chunk = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = (chunk[1], f"[İşleme hatası: {str(e)}]", [])
+
+                    failed = _is_failed_result(result)
+                    if failed and attempts.get(position, 0) < retries:
+                        attempts[position] = attempts.get(position, 0) + 1
+                        metrics.REGISTRY.count("yeb_chunk_retries_total")
+                        pending[pool.submit(chunk, language)] = (position, chunk)
+                        continue
+
+                    buffer[position] = result
+                    if checkpoint is not None and not failed:
+                        checkpoint.save(chunk, result)
+                    completed += 1
+                    if on_progress:
+                        on_progress(completed, max(total or 0, submitted))
+                    if scheduler:
+                        audio = chunk[0]
+                        scheduler.observe(None if isinstance(audio, str) else pcm_duration(audio))
+
+            # Kesintisiz hazır öneki yayınla
+            while next_pos in buffer:
+                yield buffer.pop(next_pos)
+                next_pos += 1
+
+            if not pending and exhausted:
+                break
+    finally:
+        # Tüketici erken bırakırsa bekleyen işleri iptal et
+        feed.close()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,341 @@
+import io
+import os
+import re
+import math
+import logging
+import urllib.error
+import urllib.request
+import metrics
+from audio_io import (
+    decode_audio_pcm_mmap, iter_decoded_pcm_chunks, pcm_duration,
+    split_pcm_into_chunks, split_pcm_on_silence,
+)
+from captions import fetch_caption_transcript
+from model_pool import iter_ordered_transcriptions
+from scheduler import AdaptiveConcurrency, plan_transcription
+from video_metadata import get_metadata_service
+
+logger = logging.getLogger(__name__)
+
+# Aralıklı indirmede istek başına bayt - yt-dlp'nin YouTube için kullandığı http_chunk_size
+# (tek parça, aralıksız GET YouTube'da hız kısıtlamasına takılır)
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+def _log_notify(level, message):
+    """Varsayılan bildirim - arayüz dışında logging'e yazar"""
+    logger.log(logging.WARNING if level == "warning" else logging.INFO, message)
+
+
+def fetch_video_info(url):
+    """Video başlığı ve meta bilgileri al - kalıcı meta veri önbelleği üzerinden"""
+    try:
+        return get_metadata_service().resolve(url)
+    except Exception:
+        return {}
+
+def try_caption_transcript(url, language, notify=None, allow_auto=True, segments=None):
+    """Uygun altyazı varsa transkript olarak döndür - yoksa None (Whisper kullanılır)
+
+    segments listesi verilirse altyazının cue zamanlı bölümleri eklenir (arama dizini için).
+    """
+    notify = notify or _log_notify
+    try:
+        text, source = fetch_caption_transcript(url, language, allow_auto, segments)
+    except Exception as e:
+        notify("warning", f"Altyazı alınamadı, Whisper kullanılacak: {e}")
+        return None
+
+    if text is None:
+        if source == "sparse":
+            notify("info", "📜 Otomatik altyazı yetersiz, Whisper kullanılacak")
+        return None
+    metrics.label("transcript_source", source)
+    kind = "manuel" if source == "captions_manual" else "otomatik"
+    notify("info", f"📜 {kind.capitalize()} altyazı kullanıldı, Whisper atlandı")
+    return text
+
+
+# İndirme ayarlarını tanımlayan anahtar - ayarlar değişirse önbellek ayrışır
+AUDIO_FORMAT = "mp3-128"
+
+
+def download_audio(url, temp_dir):
+    """Video sesini indir - süre ve indirilen byte ölçülür"""
+    with metrics.span("download") as span:
+        audio_path = _download_audio(url, temp_dir)
+        if os.path.exists(audio_path):
+            span["bytes"] = os.path.getsize(audio_path)
+        return audio_path
+
+
+def _download_audio(url, temp_dir):
+    """Video sesini indir - Optimize edildi"""
+    import yt_dlp
+    output_path = os.path.join(temp_dir, "audio.%(ext)s")
+    ydl_opts = {
+        'format': 'bestaudio[filesize<50M]/bestaudio/best[filesize<50M]',  # Dosya boyutu sınırı
+        'outtmpl': output_path,
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True,
+        'extractaudio': True,
+        'audioformat': 'mp3',
+        'audioquality': '5',  # Daha düşük kalite, daha hızlı
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '128',  # Düşük kalite
+        }],
+        # Hız optimizasyonları
+        'extractor_retries': 1,
+        'fragment_retries': 1,
+        'retries': 1,
+        'http_headers': {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+    }
+    
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+            if 'requested_downloads' in info:
+                return info['requested_downloads'][0]['filepath']
+            else:
+                return os.path.join(temp_dir, "audio.mp3")
+    except Exception as e:
+        # Fallback: en düşük kalite
+        logger.warning("Ses indirilemedi, en düşük kaliteyle tekrar deneniyor: %s", e)
+        ydl_opts['format'] = 'worst'
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+            if 'requested_downloads' in info:
+                return info['requested_downloads'][0]['filepath']
+            else:
+                return os.path.join(temp_dir, "audio.mp3")
+
+
+def split_audio_into_chunks(audio_path, chunk_length_ms=60000, strategy="fixed", notify=None):
+    """Sesi bir kez PCM'e çöz ve bellek içinde parçala - varsayılan 1 dakika
+
+    chunk_length_ms, ses süresinden (sn) uzunluk hesaplayan bir fonksiyon da olabilir.
+    """
+    notify = notify or _log_notify
+    try:
+        with metrics.span("split", strategy=strategy) as span:
+            return _split_pcm(audio_path, chunk_length_ms, strategy, notify, span)
+    except Exception as e:
+        notify("warning", f"Ses dosyası bölünemiyor, tek parça işlenecek: {e}")
+        return [(audio_path, 0)]
+
+
+def _split_pcm(audio_path, chunk_length_ms, strategy, notify, span):
+    """PCM çözme ve stratejiye göre parçalama - uzun videolar için PCM diskte, memmap ile okunur"""
+    audio = decode_audio_pcm_mmap(audio_path)
+    span["audio_s"] = pcm_duration(audio)
+    if callable(chunk_length_ms):
+        chunk_length_ms = chunk_length_ms(span["audio_s"])
+
+    # Parçalar aynı tampon üzerinde kopyasız görünümlerdir
+    if strategy == "silence":
+        chunks = split_pcm_on_silence(audio, chunk_length_ms / 1000)
+        kept = sum(pcm_duration(chunk) for chunk, _ in chunks)
+        skipped = pcm_duration(audio) - kept
+        if skipped >= 1:
+            notify("info", f"🔇 {skipped:.0f} sn konuşmasız bölüm atlandı")
+        return chunks
+
+    return split_pcm_into_chunks(audio, chunk_length_ms / 1000)
+
+
+def iter_transcribe_audio(audio_path, pool, language, chunk_length_minutes=None, chunk_strategy="fixed",
+                          notify=None, on_progress=None, checkpoint=None, adaptive=True):
+    """Sesi parçala ve havuzda metne çevir - (başlangıç, metin, bölümler) zaman sırasıyla üretilir
+
+    chunk_length_minutes verilmezse parça uzunluğu ses süresi ve havuz boyutuna göre seçilir.
+    checkpoint verilirse önceki denemede biten parçalar yeniden işlenmez.
+    adaptive=False iken eşzamanlılık plana ve ölçülen hıza göre ayarlanmaz, havuzun tüm
+    worker'ları kullanılır (benchmark'ta worker sayısını sabitlemek için).
+    """
+    notify = notify or _log_notify
+    override_s = chunk_length_minutes * 60 if chunk_length_minutes else None
+    plans = []
+
+    def plan_chunk_length(audio_s):
+        plans.append(plan_transcription(pool.model_name, audio_s, override_s, max_workers=pool.workers))
+        return plans[-1].chunk_length_s * 1000
+
+    chunks = split_audio_into_chunks(audio_path, plan_chunk_length, chunk_strategy, notify)
+    if not chunks:
+        notify("warning", "⚠️ Ses dosyasında konuşma bulunamadı.")
+        return
+
+    if not adaptive:
+        workers = pool.workers
+    else:
+        workers = plans[-1].workers if plans else 1
+    if plans and override_s is None:
+        notify("info", f"⚙️ {len(chunks)} parça ({plans[-1].chunk_length_s} sn), {workers} worker")
+    if checkpoint is not None and len(checkpoint):
+        notify("info", f"♻️ Önceki denemeden {len(checkpoint)} parça kaldığı yerden devam ediyor")
+    scheduler = AdaptiveConcurrency(pool.workers, initial=workers) if adaptive else None
+    yield from iter_ordered_transcriptions(pool, chunks, language, on_progress, scheduler, checkpoint=checkpoint)
+
+
+def resolve_audio_stream(url):
+    """Videonun doğrudan ses akışı adresi - (akış URL'si, HTTP başlıkları, süre, aralık boyutu)"""
+    import yt_dlp
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'noplaylist': True,
+        # webm/opus pipe üzerinden çözülebilir; m4a'da moov sonda olabilir
+        'format': 'bestaudio[ext=webm]/bestaudio/best',
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    chunk_size = (info.get('downloader_options') or {}).get('http_chunk_size')
+    return info['url'], info.get('http_headers') or {}, info.get('duration'), chunk_size
+
+
+class RangedHTTPReader(io.RawIOBase):
+    """HTTP kaynağını ardışık Range istekleriyle oku - yt-dlp'nin http_chunk_size ile indirmesi gibi
+
+    Sunucu aralığı yok sayıp 200 dönerse gövdenin tamamı tek yanıttan okunur.
+    Bağlantı aralık bitmeden kapanırsa okuma kalınan bayttan yeni istekle sürer.
+    """
+
+    def __init__(self, url, headers=None, chunk_size=None, timeout=30):
+        self.url = url
+        self.headers = dict(headers or {})
+        self.chunk_size = max(1, int(chunk_size or HTTP_CHUNK_SIZE))
+        self.timeout = timeout
+        self.position = 0
+        self.requests = 0
+        self._total = None
+        self._response = None
+        self._ranged = True
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def _open_range(self):
+        end = self.position + self.chunk_size - 1
+        if self._total is not None:
+            end = min(end, self._total - 1)
+        request = urllib.request.Request(
+            self.url, headers={**self.headers, "Range": f"bytes={self.position}-{end}"}
+        )
+        self.requests += 1
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416:
+                # İstenen aralık dosyanın sonundan sonra - okunacak bayt kalmadı
+                self._eof = True
+                return None
+            raise
+        if response.status == 206:
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if match and match.group(3) != "*":
+                self._total = int(match.group(3))
+        elif self.position == 0:
+            self._ranged = False
+        else:
+            response.close()
+            raise RuntimeError(f"Sunucu aralıklı okumayı desteklemiyor: HTTP {response.status}")
+        return response
+
+    def readinto(self, buffer):
+        while not self._eof:
+            if self._total is not None and self.position >= self._total:
+                self._eof = True
+                break
+            fresh = self._response is None
+            if fresh:
+                self._response = self._open_range()
+                if self._response is None:
+                    break
+            count = self._response.readinto(buffer)
+            if count:
+                self.position += count
+                return count
+            self._response.close()
+            self._response = None
+            if fresh or not self._ranged:
+                # Boş yanıt ya da aralıksız gövdenin sonu
+                self._eof = True
+        return 0
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+        super().close()
+
+
+def open_audio_source(source, headers=None, chunk_size=None):
+    """Yerel dosyayı veya HTTP(S) adresini okunabilir bayt akışı olarak aç - HTTP aralıklı okunur"""
+    if os.path.exists(source):
+        return open(source, 'rb')
+    return RangedHTTPReader(source, headers, chunk_size)
+
+
+def iter_transcribe_stream(source, pool, language, chunk_length_minutes=None, notify=None,
+                           on_progress=None, headers=None, duration_s=None, checkpoint=None, chunk_size=None):
+    """İndirme sürerken sabit uzunluklu parçaları havuza gönder - (başlangıç, metin, bölümler) zaman sırasıyla
+
+    source yerel dosya yolu veya HTTP(S) adresidir; YouTube için resolve_audio_stream kullanılır.
+    chunk_size: HTTP aralık isteği başına bayt (verilmezse HTTP_CHUNK_SIZE).
+    """
+    notify = notify or _log_notify
+    override_s = chunk_length_minutes * 60 if chunk_length_minutes else None
+    plan = plan_transcription(pool.model_name, duration_s, override_s, max_workers=pool.workers)
+    total = math.ceil(duration_s / plan.chunk_length_s) if duration_s else None
+    if override_s is None:
+        notify("info", f"📡 Akışlı işleme: {plan.chunk_length_s} sn parçalar, {plan.workers} worker")
+
+    if checkpoint is not None and len(checkpoint):
+        notify("info", f"♻️ Önceki denemeden {len(checkpoint)} parça kaldığı yerden devam ediyor")
+    scheduler = AdaptiveConcurrency(pool.workers, initial=plan.workers)
+    stats = {}
+    with metrics.span("stream_ingest") as span, open_audio_source(source, headers, chunk_size) as stream:
+        chunks = iter_decoded_pcm_chunks(stream, plan.chunk_length_s, stats=stats)
+        try:
+            yield from iter_ordered_transcriptions(
+                pool, chunks, language, on_progress, scheduler, total, checkpoint=checkpoint
+            )
+        finally:
+            span["bytes"] = stats.get("bytes", 0)
+
+
+def collect_transcript(results, segments=None):
+    """Sıralı parça sonuçlarını tek metne birleştir - segments listesi verilirse mutlak zamanlı bölümler eklenir"""
+    texts = []
+    for _, text, chunk_segments in results:
+        if text.strip():
+            texts.append(text.strip())
+        if segments is not None:
+            segments.extend(chunk_segments)
+    return " ".join(texts)
+
+
+def transcribe_audio(audio_path, pool, language, chunk_length_minutes=None, chunk_strategy="fixed",
+                     notify=None, on_progress=None, segments=None, checkpoint=None, adaptive=True):
+    """Sesi parçala, havuzda paralel metne çevir ve zaman sırasıyla birleştir"""
+    return collect_transcript(iter_transcribe_audio(
+        audio_path, pool, language, chunk_length_minutes, chunk_strategy, notify, on_progress, checkpoint,
+        adaptive,
+    ), segments)
+
+
+def transcribe_stream(url, pool, language, chunk_length_minutes=None, notify=None, on_progress=None,
+                      segments=None, checkpoint=None):
+    """YouTube sesini indirirken metne çevir ve zaman sırasıyla birleştir"""
+    stream_url, headers, duration, chunk_size = resolve_audio_stream(url)
+    return collect_transcript(iter_transcribe_stream(
+        stream_url, pool, language, chunk_length_minutes, notify, on_progress, headers, duration, checkpoint,
+        chunk_size,
+    ), segments)
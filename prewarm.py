@@ -0,0 +1,82 @@
+import os
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger("yeb.prewarm")
+
+_prewarmer = None
+_prewarmer_lock = threading.Lock()
+
+
+class Prewarmer:
+    """Ağır modülleri ve modelleri arka planda sırayla yükle - ilk kullanıcı beklemesin"""
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)  # [(isim, fonksiyon)]
+        self.status = {name: {"state": "pending"} for name, _ in self.tasks}
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Isınmayı arka plan thread'inde başlat (tekrar çağrılırsa etkisiz)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        for name, task in self.tasks:
+            self._set(name, state="running")
+            started = time.monotonic()
+            try:
+                task()
+                self._set(name, state="done", seconds=time.monotonic() - started)
+                logger.info("prewarm %s: %.1f sn", name, time.monotonic() - started)
+            except Exception as e:
+                # Hata ısınmayı durdurmaz - ilgili yol ilk kullanımda tekrar dener
+                self._set(name, state="failed", error=str(e))
+                logger.warning("prewarm %s başarısız: %s", name, e)
+        self.ready.set()
+
+    def _set(self, name, **fields):
+        with self._lock:
+            self.status[name] = fields
+
+    def is_ready(self):
+        """Tüm ısınma adımları bitti mi"""
+        return self.ready.is_set()
+
+    def snapshot(self):
+        """Adım durumlarının kopyası"""
+        with self._lock:
+            return {name: dict(fields) for name, fields in self.status.items()}
+
+
+def prewarm_tasks_from_env(model_loader):
+    """YEB_PREWARM_* ortam değişkenlerinden ısınma adımlarını oluştur"""
+    tasks = [("yt_dlp", lambda: importlib.import_module("yt_dlp"))]
+    if os.getenv("YEB_PREWARM_GEMINI", "1") == "1":
+        # Kütüphane içe aktarılır ve istemci kurulur - ilk özet aynı istemciyi kullanır
+        from gemini_client import get_shared_gemini_client
+        tasks.append(("gemini", get_shared_gemini_client))
+
+    models = [name.strip() for name in os.getenv("YEB_PREWARM_MODELS", "base").split(",") if name.strip()]
+    for model_name in models:
+        tasks.append((f"whisper:{model_name}", lambda model_name=model_name: model_loader(model_name)))
+    return tasks
+
+
+def start_prewarm(tasks=None):
+    """Process genelinde tek ısınmayı başlat - aynı Prewarmer döner"""
+    global _prewarmer
+    with _prewarmer_lock:
+        if _prewarmer is None:
+            if tasks is None:
+                from model_pool import load_whisper_model
+                tasks = prewarm_tasks_from_env(load_whisper_model)
+            _prewarmer = Prewarmer(tasks).start()
+        return _prewarmer
@@ -0,0 +1,110 @@
+import time
+
+# Model adına eklenen sonek: "base-int8" -> base modelin int8 dinamik nicemlenmiş hali
+INT8_SUFFIX = "-int8"
+# Seçilebilir çıkarım hassasiyetleri
+QUANTIZATIONS = ("fp32", "int8")
+
+
+def split_model_name(model_name):
+    """Model adını (temel ad, hassasiyet) olarak ayır - "small-int8" -> ("small", "int8")"""
+    if model_name.endswith(INT8_SUFFIX):
+        return model_name[:-len(INT8_SUFFIX)], "int8"
+    return model_name, "fp32"
+
+
+def quantized_model_name(model_name, quantization):
+    """Temel ad ve hassasiyetten model adını oluştur"""
+    base_name, _ = split_model_name(model_name)
+    return base_name + INT8_SUFFIX if quantization == "int8" else base_name
+
+
+def quantize_int8(model):
+    """Whisper modelinin Linear katmanlarına int8 dinamik nicemleme uygula (sadece CPU)"""
+    import torch
+    import whisper
+
+    # whisper.model.Linear sadece dtype dönüşümü ekler; quantize_dynamic tam tip eşleşmesi ister
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    # inplace: fp32 kopyası tutulmaz, yükleme tepe belleği fp32 + int8 olmaz
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_model(model_name):
+    """Whisper modelini yükle - int8 sonekliyse CPU'da yüklenip nicemlenir"""
+    import whisper
+
+    base_name, quantization = split_model_name(model_name)
+    if quantization == "int8":
+        return quantize_int8(whisper.load_model(base_name, device="cpu"))
+    return whisper.load_model(base_name)
+
+
+def word_error_rate(reference, hypothesis):
+    """Kelime hata oranı - (yer değiştirme + silme + ekleme) / referans kelime sayısı"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def compare_quantization(model_name, audio_paths, language, transcribe=None):
+    """fp32 ve int8 modeli aynı seslerde karşılaştır - dosya başına hızlanma ve WER kayması
+
+    transcribe(model, yol, dil) -> metin; verilmezse model_pool.transcribe_with_model kullanılır.
+    Ölçümden önce her model ilk seste bir kez ısıtılır; sıra dosyadan dosyaya değişir ki
+    önbellek/frekans ısınması hep aynı modelin lehine olmasın.
+    """
+    if transcribe is None:
+        from model_pool import transcribe_with_model
+
+        def transcribe(model, path, lang):
+            return transcribe_with_model(model, path, lang)["text"]
+
+    base_name, _ = split_model_name(model_name)
+    results = []
+    models = {}
+    for quantization in QUANTIZATIONS:
+        started = time.perf_counter()
+        models[quantization] = load_model(quantized_model_name(base_name, quantization))
+        results.append({"model": base_name, "quantization": quantization, "stage": "load",
+                        "wall_s": time.perf_counter() - started})
+
+    if audio_paths:
+        for model in models.values():
+            transcribe(model, audio_paths[0], language)
+
+    for index, path in enumerate(audio_paths):
+        texts = {}
+        seconds = {}
+        order = QUANTIZATIONS if index % 2 == 0 else QUANTIZATIONS[::-1]
+        for quantization in order:
+            model = models[quantization]
+            started = time.perf_counter()
+            texts[quantization] = transcribe(model, path, language)
+            seconds[quantization] = time.perf_counter() - started
+        results.append({
+            "model": base_name,
+            "audio": path,
+            "fp32_s": seconds["fp32"],
+            "int8_s": seconds["int8"],
+            "speedup": seconds["fp32"] / seconds["int8"] if seconds["int8"] else None,
+            # fp32 çıktısı referans alınır - int8'in getirdiği sapma
+            "wer_drift": word_error_rate(texts["fp32"], texts["int8"]),
+            "first": order[0],
+        })
+    return results
@@ -0,0 +1,176 @@
+import os
+import math
+import time
+from collections import namedtuple
+
+# Whisper modellerinin worker başına yaklaşık çalışma belleği (MB)
+WHISPER_MEMORY_MB = {
+    "tiny": 1000,
+    "base": 1000,
+    "small": 2000,
+    "medium": 5000,
+    "large": 10000,
+}
+# int8 nicemlenmiş modelde Linear ağırlıkları 4 kat küçülür; aktivasyonlar fp32 kalır
+INT8_MEMORY_FACTOR = 0.5
+
+# Whisper sesi 30 sn pencerelerle işler - parça uzunlukları bunun katı seçilir
+MIN_CHUNK_S = 30
+MAX_CHUNK_S = 300
+# Yük dengesi için worker başına hedef parça sayısı
+CHUNKS_PER_WORKER = 3
+MAX_WORKERS = 4
+# Boş belleğin modellere ayrılabilecek oranı
+MEMORY_HEADROOM = 0.8
+# Bu kadar boş bellek kalırsa eşzamanlılık düşürülür
+LOW_MEMORY_MB = 500
+
+TranscriptionPlan = namedtuple("TranscriptionPlan", ["workers", "chunk_length_s", "torch_threads"])
+
+
+def available_cores():
+    """Sürecin kullanabileceği çekirdek sayısı (CPU affinity dahil)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _cgroup_free_mb():
+    """Konteyner (cgroup v2) bellek sınırına kalan alan - sınır yoksa None"""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit == "max":
+            return None
+        with open("/sys/fs/cgroup/memory.current") as f:
+            current = int(f.read().strip())
+        return (int(limit) - current) / 1024 / 1024
+    except (OSError, ValueError):
+        return None
+
+
+def available_memory_mb():
+    """Kullanılabilir bellek (MB) - okunamazsa None"""
+    free = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    free = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        try:
+            free = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+        except (ValueError, OSError, AttributeError):
+            pass
+
+    cgroup_free = _cgroup_free_mb()
+    if cgroup_free is not None:
+        free = cgroup_free if free is None else min(free, cgroup_free)
+    return free
+
+
+def model_memory_mb(model_name):
+    """Modelin worker başına bellek ihtiyacı - bilinmeyen model için en büyüğü varsayılır"""
+    base_name = model_name.split(".")[0].split("-")[0]
+    memory_mb = WHISPER_MEMORY_MB.get(base_name, WHISPER_MEMORY_MB["large"])
+    return int(memory_mb * INT8_MEMORY_FACTOR) if model_name.endswith("-int8") else memory_mb
+
+
+def choose_chunk_length(audio_s, workers):
+    """Her worker'a birkaç parça düşecek şekilde 30 sn katı parça uzunluğu seç"""
+    if not audio_s:
+        return 60
+    target = audio_s / (workers * CHUNKS_PER_WORKER)
+    length = math.ceil(target / MIN_CHUNK_S) * MIN_CHUNK_S
+    return max(MIN_CHUNK_S, min(MAX_CHUNK_S, length))
+
+
+def plan_transcription(model_name, audio_s=None, chunk_length_s=None, max_workers=None,
+                       cores=None, memory_mb=None):
+    """Çekirdek, boş bellek, model boyutu ve ses süresine göre worker/parça/torch thread planı
+
+    chunk_length_s verilirse (kullanıcı seçimi) parça uzunluğu değişmez.
+    max_workers verilirse (hazır havuz) bellek zaten havuz kurulurken hesaba katılmıştır.
+    """
+    cores = cores or available_cores()
+    footprint = model_memory_mb(model_name)
+
+    # Büyük modeller worker başına daha çok çekirdekle verimli çalışır
+    min_threads = 1 if footprint <= 1000 else 2 if footprint <= 2000 else 4
+    workers = max(1, min(MAX_WORKERS, cores // min_threads))
+
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    else:
+        if memory_mb is None:
+            memory_mb = available_memory_mb()
+        if memory_mb is not None:
+            workers = min(workers, max(1, int(memory_mb * MEMORY_HEADROOM // footprint)))
+
+    if chunk_length_s is None:
+        chunk_length_s = choose_chunk_length(audio_s, workers)
+    if audio_s:
+        # Parçadan fazla worker boşta bekler
+        workers = min(workers, max(1, math.ceil(audio_s / chunk_length_s)))
+
+    return TranscriptionPlan(workers, chunk_length_s, max(1, cores // workers))
+
+
+class AdaptiveConcurrency:
+    """Gözlenen ses işleme hızına göre eşzamanlı parça sayısını ayarlayan tepe tırmanma
+
+    Her pencerede (limit kadar tamamlanan parça) işlenen ses saniyesi / duvar saati ölçülür.
+    Komşu limitlerden biri belirgin şekilde daha hızlıysa ona geçilir; aşağı komşu hiç
+    denenmediyse bir kez denenir. Boş bellek azalırsa limit düşürülür.
+    """
+
+    def __init__(self, max_workers, initial=None, tolerance=0.05, memory_probe=available_memory_mb):
+        self.max_workers = max(1, max_workers)
+        self.limit = max(1, min(self.max_workers, initial or self.max_workers))
+        self.tolerance = tolerance
+        self.memory_probe = memory_probe
+        self.throughput = {}  # limit -> ses sn / duvar sn
+        self.changes = []
+        self._start_window()
+
+    def _start_window(self):
+        self._window_started = time.monotonic()
+        self._window_audio = 0.0
+        self._window_count = 0
+
+    def observe(self, audio_s):
+        """Bir parça tamamlandı - pencere dolunca limiti güncelle"""
+        if audio_s:
+            self._window_audio += audio_s
+        self._window_count += 1
+        if self._window_count < max(2, self.limit):
+            return self.limit
+
+        elapsed = time.monotonic() - self._window_started
+        if elapsed > 0 and self._window_audio > 0:
+            self._adjust(self._window_audio / elapsed)
+        self._start_window()
+        return self.limit
+
+    def _adjust(self, throughput):
+        self.throughput[self.limit] = throughput
+        lower = self.throughput.get(self.limit - 1)
+        higher = self.throughput.get(self.limit + 1)
+        memory_mb = self.memory_probe() if self.memory_probe else None
+
+        new_limit = self.limit
+        if self.limit > 1 and memory_mb is not None and memory_mb < LOW_MEMORY_MB:
+            new_limit = self.limit - 1
+        elif lower is not None and lower > throughput * (1 + self.tolerance):
+            # Daha az worker daha hızlıydı - çekirdekler aşırı paylaşılıyor
+            new_limit = self.limit - 1
+        elif higher is not None and higher > throughput * (1 + self.tolerance):
+            new_limit = self.limit + 1
+        elif lower is None and self.limit > 1:
+            new_limit = self.limit - 1
+
+        if new_limit != self.limit:
+            self.changes.append((self.limit, new_limit, throughput))
+            self.limit = new_limit
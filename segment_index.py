@@ -0,0 +1,202 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from cache_store import get_cache_dir
+
+logger = logging.getLogger("yeb.segment_index")
+
+# unicode61 "I"yı "i"ye küçültür ve "ı"yı hiçbir harfe indirgemez - Türkçe I/İ/ı/i tek harfe katlanır
+_TURKISH_I = str.maketrans({"I": "i", "İ": "i", "ı": "i"})
+
+
+def fold_search_text(text):
+    """Dizine yazılan metni ve sorguyu aynı biçime getir - kalan büyük harf ve aksanlar FTS5'te katlanır"""
+    return text.translate(_TURKISH_I)
+
+
+def phrase_query(text):
+    """Serbest metni FTS5 ifade sorgusuna çevir - kelimeler bu sırayla ve yan yana aranır"""
+    return '"' + text.strip().replace('"', '""') + '"'
+
+
+def youtube_timestamp_url(video_id, start):
+    """Videoyu verilen saniyeden açan bağlantı"""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s"
+
+
+def format_timestamp(seconds):
+    """Saniyeyi S:DD:SS / D:SS biçimine çevir"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+class SegmentIndex:
+    """Zaman damgalı transkript bölümleri için tam metin arama dizini (SQLite FTS5)
+
+    Bölümler satır tablosunda tutulur, FTS5 tablosu sadece metin dizinidir
+    (external content); video başına yeniden yazma video_id indeksiyle yapılır.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Bağlantı aç, işlemi commit et ve kapat"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    language TEXT,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    video_id TEXT NOT NULL,
+                    start REAL NOT NULL,
+                    end REAL NOT NULL,
+                    text TEXT NOT NULL,
+                    search_text TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_video ON segments(video_id, start)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(segments)")}
+            if "search_text" not in columns:
+                self._migrate_search_text(conn)
+            # Dizin katlanmış metin üzerinden kurulur: Türkçe karakterler aksansız da eşleşir
+            # (ş/s, ö/o, ç/c, ğ/g, ü/u) ve I/İ/ı/i birbirinin yerine geçer
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                    search_text, content='segments', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                    INSERT INTO segments_fts(rowid, search_text) VALUES (new.id, new.search_text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                    INSERT INTO segments_fts(segments_fts, rowid, search_text)
+                    VALUES ('delete', old.id, old.search_text);
+                END;
+            """)
+
+    @staticmethod
+    def _migrate_search_text(conn):
+        """Eski dizin: katlanmış metin sütununu ekle ve FTS tablosunu onun üzerinden yeniden kur"""
+        conn.executescript("""
+            DROP TRIGGER IF EXISTS segments_ai;
+            DROP TRIGGER IF EXISTS segments_ad;
+            DROP TABLE IF EXISTS segments_fts;
+            ALTER TABLE segments ADD COLUMN search_text TEXT NOT NULL DEFAULT '';
+        """)
+        rows = conn.execute("SELECT id, text FROM segments").fetchall()
+        conn.executemany(
+            "UPDATE segments SET search_text = ? WHERE id = ?",
+            [(fold_search_text(text), row_id) for row_id, text in rows],
+        )
+        conn.execute("""
+            CREATE VIRTUAL TABLE segments_fts USING fts5(
+                search_text, content='segments', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.execute("INSERT INTO segments_fts(segments_fts) VALUES ('rebuild')")
+
+    def add_video(self, video_id, segments, title=None, language=None):
+        """Videonun bölümlerini tek işlemde yaz - önceki kayıtların yerini alır
+
+        segments: [(başlangıç_sn, bitiş_sn, metin)] mutlak zamanlarla.
+        """
+        rows = [
+            (video_id, round(start, 2), round(end, 2), text.strip(), fold_search_text(text.strip()))
+            for start, end, text in segments
+            if text and text.strip()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            conn.executemany(
+                "INSERT INTO segments(video_id, start, end, text, search_text) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO videos(video_id, title, language, indexed_at) VALUES (?, ?, ?, ?)",
+                (video_id, title, language, time.time()),
+            )
+        return len(rows)
+
+    def has_video(self, video_id):
+        """Video dizinde mi"""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,)).fetchone() is not None
+
+    def search(self, query, limit=20, video_id=None, phrase=True):
+        """Bölümlerde ara - en alakalı sonuçlar önce
+
+        phrase=False iken sorgu FTS5 sözdizimiyle (AND/OR/NEAR, önek*) olduğu gibi kullanılır.
+        """
+        query = fold_search_text(query)
+        match = phrase_query(query) if phrase else query
+        sql = """
+            SELECT s.video_id, v.title, s.start, s.end, s.text
+            FROM segments_fts
+            JOIN segments s ON s.id = segments_fts.rowid
+            LEFT JOIN videos v ON v.video_id = s.video_id
+            WHERE segments_fts MATCH ?
+        """
+        args = [match]
+        if video_id:
+            sql += " AND s.video_id = ?"
+            args.append(video_id)
+        sql += " ORDER BY bm25(segments_fts) LIMIT ?"
+        args.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [
+            {
+                "video_id": vid,
+                "title": title or "",
+                "start": start,
+                "end": end,
+                "text": text,
+                "url": youtube_timestamp_url(vid, start),
+            }
+            for vid, title, start, end, text in rows
+        ]
+
+    def stats(self):
+        """Dizindeki video ve bölüm sayısı"""
+        with self._connect() as conn:
+            videos = conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+            segments = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {"videos": videos, "segments": segments}
+
+
+def open_segment_index():
+    """Varsayılan konumdaki bölüm dizinini aç - YEB_SEGMENT_INDEX=0 ile kapatılır (None döner)"""
+    if os.getenv("YEB_SEGMENT_INDEX", "1") != "1":
+        return None
+    try:
+        return SegmentIndex(os.path.join(get_cache_dir(), "segments.sqlite3"))
+    except sqlite3.OperationalError as e:
+        # SQLite FTS5 olmadan derlenmişse dizin devre dışı kalır
+        logger.warning("Bölüm dizini açılamadı: %s", e)
+        return None
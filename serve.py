@@ -0,0 +1,25 @@
+import os
+import sys
+import logging
+from prewarm import start_prewarm
+from metrics import set_readiness_check, start_metrics_server
+
+
+def main():
+    """Modelleri sunucu başlarken ısıt, ardından Streamlit'i aynı süreçte çalıştır"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    prewarmer = start_prewarm()
+    set_readiness_check(prewarmer.is_ready)
+
+    port = os.getenv("YEB_METRICS_PORT")
+    if port:
+        start_metrics_server(int(port))
+
+    from streamlit.web import cli as stcli
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+                *sys.argv[1:]]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import re
+import concurrent.futures
+from datetime import datetime
+from transcript_compress import compress_transcript, estimate_tokens
+
+# Tek çağrıda özetlenecek en büyük transkript (tahmini token)
+SINGLE_PASS_TOKEN_BUDGET = 12000
+# Map aşamasında bölüm başına token bütçesi
+SECTION_TOKEN_BUDGET = 6000
+# Eşzamanlı Gemini çağrısı sınırı
+MAP_CONCURRENCY = 4
+# Prompt şablonları değiştiğinde artırılır - özet önbelleği anahtarına girer
+SUMMARY_PROMPT_VERSION = 1
+
+SUMMARY_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 4000,
+}
+
+SECTION_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 1024,
+}
+
+
+class EmptyResponseError(Exception):
+    """Gemini boş yanıt döndürdü"""
+
+
+def split_transcript_sections(transcript, max_tokens=SECTION_TOKEN_BUDGET):
+    """Transkripti cümle sınırlarından token bütçeli bölümlere ayır"""
+    max_chars = max_tokens * 4
+    sentences = re.split(r"(?<=[.!?…])\s+", transcript.strip())
+
+    sections = []
+    current = []
+    current_len = 0
+    for sentence in sentences:
+        if not sentence:
+            continue
+        # Tek başına bütçeyi aşan cümleyi kelimelerden böl
+        pieces = [sentence]
+        if len(sentence) > max_chars:
+            words = sentence.split()
+            pieces, piece = [], []
+            for word in words:
+                if piece and len(" ".join(piece)) + len(word) + 1 > max_chars:
+                    pieces.append(" ".join(piece))
+                    piece = []
+                piece.append(word)
+            if piece:
+                pieces.append(" ".join(piece))
+
+        for piece in pieces:
+            if current and current_len + len(piece) + 1 > max_chars:
+                sections.append(" ".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 1
+
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+
+def create_section_prompt(section, index, total, video_title=""):
+    """Map aşaması için bölüm notu prompt'u oluştur"""
+    return f"""
+Aşağıdaki metin "{video_title if video_title else "Belirtilmemiş"}" başlıklı YouTube videosunun {index}/{total}. bölümüdür.
+
+Bu bölüm için yoğun notlar çıkarın:
+- Ele alınan konular
+- Önemli veriler, iddialar, argümanlar ve sonuçlar
+- Varsa birebir önemli alıntılar (tırnak içinde)
+
+Sadece madde işaretli notlar yazın, giriş veya sonuç cümlesi eklemeyin.
+Metinde geçmeyen bilgi eklemeyin.
+
+BÖLÜM METNİ:
+{section}
+"""
+
+
+def create_summary_prompt(transcript, video_title="", from_sections=False):
+    """Profesyonel özet için prompt oluştur - from_sections=True ise girdi bölüm notlarıdır"""
+    current_date = datetime.now().strftime("%d.%m.%Y")
+    
+    if from_sections:
+        intro = "Aşağıda uzun bir YouTube videosunun sırayla çıkarılmış bölüm notları var. Bu notlardan tüm videonun profesyonel özetini hazırlayınız."
+        source_label = "BÖLÜM NOTLARI"
+    else:
+        intro = "Aşağıdaki YouTube video transkriptini profesyonel bir şekilde özetleyiniz."
+        source_label = "TRANSKRİPT"
+    
+    prompt = f"""
+{intro}
+
+VIDEO BİLGİLERİ:
+- Başlık: {video_title if video_title else "Belirtilmemiş"}
+- Özet Tarihi: {current_date}
+
+{source_label}:
+{transcript}
+
+ÖZET REHBERİ:
+Lütfen aşağıdaki formatta detaylı bir özet hazırlayın:
+
+## 📋 GENEL ÖZET
+Video içeriğinin ana konusunu ve amacını 2-3 cümlede özetleyin.
+
+## 🎯 ANA KONULAR
+- Videoda ele alınan temel konuları madde halinde listeleyin
+- Her konu için kısa açıklama ekleyin
+
+## 🔍 ANAHTAR NOKTALAR
+Videodaki en önemli bilgi, iddia veya argümanları vurgulayın:
+- Önemli veriler, istatistikler
+- Dikkat çekici iddialar
+- Uzman görüşleri
+- Sonuçlar ve öneriler
+
+## 🗞️ GÜNDEM İLE İLİŞKİSİ
+Eğer video içeriği güncel olaylar, siyaset, ekonomi, teknoloji, sosyal konular gibi gündemle ilgili konulara değiniyorsa:
+- Hangi güncel konularla bağlantılı olduğunu belirtin
+- Türkiye ve dünya gündemine etkisini değerlendirin
+
+## 💡 ÖNE ÇIKAN ALINTILAR
+Videodaki en etkileyici veya önemli alıntıları (varsa) ekleyin.
+
+## 📊 HEDEF KİTLE VE UYGULANMA
+- Bu bilgi kimler için faydalı?
+- Pratik uygulamaları neler?
+
+ÖNEMLI NOTLAR:
+- Objektif ve tarafsız kalın
+- Türkçe dilbilgisi kurallarına uyun
+- Profesyonel ve anlaşılır bir dil kullanın
+- Transkriptte geçmeyen bilgi eklemeyin
+"""
+    return prompt
+
+
+def _generate(model, prompt, generation_config):
+    """Tek Gemini çağrısı - boş yanıtta hata fırlatır"""
+    response = model.generate_content(prompt, generation_config=generation_config)
+    if not response.text:
+        raise EmptyResponseError("Boş yanıt")
+    return response.text
+
+
+def summarize_sections(model, sections, video_title="", concurrency=MAP_CONCURRENCY):
+    """Bölümleri eşzamanlılık sınırı altında paralel özetle - sırayı korur"""
+    total = len(sections)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [
+            executor.submit(
+                _generate,
+                model,
+                create_section_prompt(section, i + 1, total, video_title),
+                SECTION_GENERATION_CONFIG,
+            )
+            for i, section in enumerate(sections)
+        ]
+        return [future.result() for future in futures]
+
+
+def prepare_summary_prompt(model, transcript, video_title="",
+                           section_tokens=SECTION_TOKEN_BUDGET,
+                           single_pass_tokens=SINGLE_PASS_TOKEN_BUDGET,
+                           concurrency=MAP_CONCURRENCY, token_budget=None):
+    """Transkripti sıkıştır, gerekirse map aşamasını çalıştır ve son özet prompt'unu döndür"""
+    notes, _ = compress_transcript(transcript, token_budget)
+    from_sections = False
+
+    # Notlar tek çağrıya sığana kadar hiyerarşik olarak küçült
+    while estimate_tokens(notes) > single_pass_tokens:
+        previous_tokens = estimate_tokens(notes)
+        sections = split_transcript_sections(notes, section_tokens)
+        section_notes = summarize_sections(model, sections, video_title, concurrency)
+        notes = "\n\n".join(
+            f"### Bölüm {i + 1}\n{text.strip()}" for i, text in enumerate(section_notes)
+        )
+        from_sections = True
+        # Notlar kısalmıyorsa yeni tur da kısaltmaz - olduğu gibi reduce'a gönder
+        if len(sections) == 1 or estimate_tokens(notes) >= previous_tokens:
+            break
+
+    return create_summary_prompt(notes, video_title, from_sections=from_sections)
+
+
+def map_reduce_summary(model, transcript, video_title="", **budgets):
+    """Uzun transkripti bölüm notlarına indirip tek reduce çağrısıyla özetle"""
+    prompt = prepare_summary_prompt(model, transcript, video_title, **budgets)
+    return _generate(model, prompt, SUMMARY_GENERATION_CONFIG)
+
+
+def analyze_transcript_with_gemini(model, transcript, video_title=""):
+    """Gemini ile transkript analizi ve özetleme - uzun transkriptler map-reduce ile"""
+    try:
+        return map_reduce_summary(model, transcript, video_title)
+    except EmptyResponseError:
+        return "Özet oluşturulamadı."
+    except Exception as e:
+        return f"Gemini API hatası: {str(e)}"
+
+
+def stream_transcript_summary(model, transcript, video_title=""):
+    """Özeti metin parçaları halinde üret - model akışı desteklemiyorsa tek parça"""
+    try:
+        prompt = prepare_summary_prompt(model, transcript, video_title)
+        if not hasattr(model, "stream"):
+            yield _generate(model, prompt, SUMMARY_GENERATION_CONFIG)
+            return
+
+        emitted = False
+        for text in model.stream(prompt, SUMMARY_GENERATION_CONFIG):
+            emitted = True
+            yield text
+        if not emitted:
+            yield "Özet oluşturulamadı."
+    except EmptyResponseError:
+        yield "Özet oluşturulamadı."
+    except Exception as e:
+        yield f"\n\nGemini API hatası: {str(e)}"
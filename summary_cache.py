@@ -0,0 +1,56 @@
+import os
+import hashlib
+from cache_store import SQLiteCache, get_cache_dir, make_cache_key
+from transcript_compress import get_token_budget
+from summarizer import (
+    SECTION_GENERATION_CONFIG, SECTION_TOKEN_BUDGET, SINGLE_PASS_TOKEN_BUDGET, SUMMARY_GENERATION_CONFIG,
+    SUMMARY_PROMPT_VERSION,
+)
+
+
+class SummaryCache(SQLiteCache):
+    """Transkript özeti, video başlığı ve özet ayarlarıyla anahtarlanan Gemini özet deposu
+
+    Prompt'taki özet tarihi anahtara girmez; eski özetler yaş sınırıyla tahliye edilir.
+    """
+
+    @staticmethod
+    def _key(transcript, video_title, params):
+        digest = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+        return make_cache_key("summary", digest, video_title or "", params)
+
+    def get_summary(self, transcript, video_title, params):
+        """Önbellekteki özeti döndür - yoksa None"""
+        entry = self.get(self._key(transcript, video_title, params))
+        return entry["summary"] if entry else None
+
+    def put_summary(self, transcript, video_title, params, summary):
+        """Özeti kaydet"""
+        self.set(self._key(transcript, video_title, params), {"video_title": video_title, "summary": summary})
+
+
+def open_summary_cache():
+    """Ortam değişkenlerindeki sınırlarla özet önbelleğini aç"""
+    return SummaryCache(
+        os.path.join(get_cache_dir(), "summaries.sqlite3"),
+        max_bytes=int(float(os.getenv("YEB_SUMMARY_CACHE_MB", "50")) * 1024 * 1024),
+        max_age_s=int(float(os.getenv("YEB_SUMMARY_CACHE_DAYS", "30")) * 24 * 3600),
+    )
+
+
+def summary_params(model_name):
+    """Önbellek anahtarına giren özet ayarları - model, prompt sürümü, üretim ayarları ve bütçeler"""
+    return {
+        'model': model_name,
+        'prompt_version': SUMMARY_PROMPT_VERSION,
+        'generation_config': SUMMARY_GENERATION_CONFIG,
+        'section_generation_config': SECTION_GENERATION_CONFIG,
+        'single_pass_tokens': SINGLE_PASS_TOKEN_BUDGET,
+        'section_tokens': SECTION_TOKEN_BUDGET,
+        'transcript_token_budget': get_token_budget(),
+    }
+
+
+def is_cacheable_summary(text):
+    """Boş yanıt ve API hatası içeren özetler önbelleğe yazılmaz"""
+    return bool(text and text.strip()) and text.strip() != "Özet oluşturulamadı." and "Gemini API hatası:" not in text
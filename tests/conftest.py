@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Depo kökündeki modüller doğrudan içe aktarılabilsin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import os
+from audio_cache import AudioCache
+
+
+def fake_download(name, size=10):
+    def download(target_dir):
+        path = os.path.join(target_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"a" * size)
+        return path
+    return download
+
+
+def test_acquire_returns_recorded_file_even_with_scratch_files(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    path = cache.acquire("vid", "mp3", fake_download("audio.mp3"))
+    entry_dir = os.path.dirname(path)
+
+    # Çözme sırasında ya da çökme sonrası kayıt dizininde kalan PCM dosyaları
+    for name in (".yeb-pcm-abc.f32", "yeb-pcm-old.f32"):
+        with open(os.path.join(entry_dir, name), "wb") as f:
+            f.write(b"p" * 1000)
+
+    assert cache.acquire("vid", "mp3", fake_download("other.mp3")) == path
+    assert cache.stats() == {"entries": 1, "bytes": 10, "inflight": 0}
+
+
+def test_entry_without_marker_is_downloaded_again(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    entry_dir = tmp_path / AudioCache._key("vid", "mp3")
+    entry_dir.mkdir()
+    (entry_dir / "yeb-pcm-stale.f32").write_bytes(b"p" * 1000)
+
+    path = cache.acquire("vid", "mp3", fake_download("audio.mp3"))
+    assert os.path.basename(path) == "audio.mp3"
+
+
+def test_evict_ignores_scratch_files(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=25)
+    first = cache.acquire("a", "mp3", fake_download("audio.mp3"))
+    cache.release("a", "mp3")
+    with open(os.path.join(os.path.dirname(first), ".yeb-pcm-x.f32"), "wb") as f:
+        f.write(b"p" * 1000)
+
+    cache.acquire("b", "mp3", fake_download("audio.mp3"))
+    assert os.path.exists(first)
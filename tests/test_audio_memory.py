@@ -0,0 +1,81 @@
+import os
+import sys
+import wave
+import shutil
+import subprocess
+import numpy as np
+import pytest
+from audio_io import SAMPLE_RATE
+
+# 30 dk ses: tamamı float32 olarak belleğe alınsa ~110 MB tutar
+DURATION_S = 30 * 60
+CHUNK_S = 60
+MAX_ANON_GROWTH_MB = 48
+
+pytestmark = [
+    pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg yok"),
+    pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="RssAnon yalnızca Linux'ta okunur"),
+]
+
+# Ölçüm ayrı süreçte yapılır - pytest'in kendi bellek kullanımı tepeyi etkilemesin
+MEASURE = r"""
+import sys, threading
+import numpy as np
+from audio_io import decode_audio_pcm_mmap, split_pcm_into_chunks, pcm_duration
+
+def anon_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+
+baseline = anon_mb()
+peak = [baseline]
+stop = threading.Event()
+
+def sample():
+    while not stop.wait(0.02):
+        peak[0] = max(peak[0], anon_mb())
+
+sampler = threading.Thread(target=sample, daemon=True)
+sampler.start()
+audio = decode_audio_pcm_mmap(sys.argv[1])
+loudest = 0.0
+for chunk, _ in split_pcm_into_chunks(audio, float(sys.argv[2])):
+    loudest = max(loudest, float(np.abs(chunk).max()))
+    peak[0] = max(peak[0], anon_mb())
+stop.set()
+sampler.join()
+print(pcm_duration(audio), loudest, peak[0] - baseline)
+"""
+
+
+def write_long_wav(path, duration_s, block_s=60):
+    """Bloklar halinde sinüs WAV yaz - üretim sırasında tüm ses bellekte tutulmaz"""
+    t = np.arange(block_s * SAMPLE_RATE) / SAMPLE_RATE
+    block = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for _ in range(duration_s // block_s):
+            f.writeframes(block)
+
+
+def test_long_audio_decode_and_chunking_stays_under_memory_ceiling(tmp_path):
+    wav_path = str(tmp_path / "long.wav")
+    write_long_wav(wav_path, DURATION_S)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, wav_path, str(CHUNK_S)],
+        capture_output=True, text=True, cwd=root, check=True,
+        env={**os.environ, "PYTHONPATH": root},
+    )
+    duration_s, loudest, growth_mb = map(float, result.stdout.split())
+
+    assert duration_s == pytest.approx(DURATION_S, abs=1)
+    assert loudest == pytest.approx(0.3, abs=0.01)
+    assert growth_mb < MAX_ANON_GROWTH_MB
+    # PCM dosyası eşlendikten sonra silinir, kaynak dizininde kalmaz
+    assert os.listdir(tmp_path) == ["long.wav"]
@@ -0,0 +1,81 @@
+import os
+import pytest
+from captions import (
+    is_good_enough, parse_caption, parse_caption_segments, parse_srv, parse_vtt, select_caption_track,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "captions")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_auto_vtt_rolling_lines_are_deduplicated():
+    content = read_fixture("auto_rolling.tr.vtt")
+    assert parse_vtt(content, rolling=True) == [
+        "merhaba arkadaşlar bugün",
+        "yapay zeka konuşacağız",
+        "[Müzik]",
+    ]
+    assert parse_caption(content, "vtt", rolling=True) == "merhaba arkadaşlar bugün yapay zeka konuşacağız"
+
+
+def test_auto_vtt_segments_keep_first_cue_time():
+    segments = parse_caption_segments(read_fixture("auto_rolling.tr.vtt"), "vtt", rolling=True)
+    assert segments == [
+        (0.32, 2.869, "merhaba arkadaşlar bugün"),
+        (2.879, 5.51, "yapay zeka konuşacağız"),
+    ]
+
+
+def test_manual_vtt_keeps_repeated_lines():
+    content = read_fixture("manual_repeats.tr.vtt")
+    assert parse_vtt(content) == ["Hazır mısınız?", "Evet.", "Evet.", "Başlayalım &amp; görelim."]
+    assert parse_caption(content, "vtt") == "Hazır mısınız? Evet. Evet. Başlayalım & görelim."
+
+
+def test_manual_vtt_segments_parse_hour_timestamps():
+    segments = parse_caption_segments(read_fixture("manual_repeats.tr.vtt"), "vtt")
+    assert segments[1:] == [(2.0, 3.0, "Evet."), (3.0, 4.0, "Evet."), (3604.5, 3606.25, "Başlayalım & görelim.")]
+
+
+def test_manual_srv3_keeps_repeated_lines():
+    content = read_fixture("manual_repeats.tr.srv3")
+    assert parse_srv(content) == ["Hazır mısınız?", "Evet.", "Evet.", "Başlayalım görelim."]
+    assert parse_caption_segments(content, "srv3")[-1] == (4.5, 6.25, "Başlayalım görelim.")
+
+
+def test_auto_srv1_rolling_lines_and_escaping():
+    content = read_fixture("auto.en.srv1")
+    assert parse_caption(content, "srv1", rolling=True) == "hello & welcome to the show"
+    assert parse_caption(content, "srv1") == "hello & welcome hello & welcome to the show"
+    assert parse_caption_segments(content, "srv1", rolling=True) == [
+        (0.5, 2.75, "hello & welcome"),
+        (4.25, 6.25, "to the show"),
+    ]
+
+
+@pytest.mark.parametrize("language, allow_auto, expected", [
+    ("tr", True, ("manual", "vtt")),
+    ("en", True, ("auto", "vtt")),
+    ("en", False, None),
+    ("de", True, None),
+])
+def test_select_caption_track(language, allow_auto, expected):
+    info = {
+        "subtitles": {"tr": [{"ext": "srv3", "url": "https://x/tr.srv3"}, {"ext": "vtt", "url": "https://x/tr.vtt"}]},
+        "automatic_captions": {
+            "en-orig": [{"ext": "vtt", "url": "https://x/en.vtt"}],
+            "de": [{"ext": "vtt", "url": "https://x/en.vtt&tlang=de"}],
+        },
+    }
+    track = select_caption_track(info, language, allow_auto)
+    assert (track and (track[0], track[1]["ext"])) == expected
+
+
+def test_sparse_auto_captions_are_rejected():
+    assert is_good_enough("kelime " * 50, "manual", 600)
+    assert not is_good_enough("kelime " * 50, "auto", 600)
+    assert is_good_enough("kelime " * 500, "auto", 600)
@@ -0,0 +1,216 @@
+import queue
+import sqlite3
+import threading
+import pytest
+import model_pool
+from governor import SINGLE_MODEL, QueueFullError, ResourceGovernor, pool_key
+from jobs import JOB_DONE, JOB_FAILED, JobEngine, JobStore
+
+TIMEOUT_S = 5
+
+
+class FakeEngine(JobEngine):
+    """Transkripsiyon yerine kapı bekleyen iş motoru - her iş URL'sine ait kapı açılınca biter"""
+
+    def __init__(self, *args, **kwargs):
+        self.started = queue.Queue()
+        self.gates = {}
+        self.closed = False
+        self._gates_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def gate(self, url):
+        with self._gates_lock:
+            return self.gates.setdefault(url, threading.Event())
+
+    def _execute(self, job_id, params):
+        self.started.put(params["url"])
+        assert self.closed or self.gate(params["url"]).wait(TIMEOUT_S)
+
+
+def params(url, model_name="base", parallel=True):
+    return {"url": url, "model_name": model_name, "parallel": parallel, "worker_mode": "thread"}
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.setenv("YEB_CACHE_DIR", str(tmp_path / "cache"))
+    engines = []
+
+    def make(**governor_kwargs):
+        governor_kwargs.setdefault("memory_mb", 10_000)
+        governor_kwargs.setdefault("cost_fn", lambda key: 100)
+        governor = ResourceGovernor(**governor_kwargs)
+        engine = FakeEngine(JobStore(str(tmp_path / "jobs.sqlite3")), None, None, None, None, governor=governor)
+        engines.append(engine)
+        return engine
+
+    yield make
+    # Kalan işler YEB_CACHE_DIR geri alınmadan bitsin - metrikler depo dizinine yazılmasın
+    for engine in engines:
+        engine.closed = True
+        for gate in list(engine.gates.values()):
+            gate.set()
+    for engine in engines:
+        for _ in range(TIMEOUT_S * 100):
+            snapshot = engine.governor.snapshot()
+            if not snapshot["running"] and not snapshot["queued"]:
+                break
+            threading.Event().wait(0.01)
+
+
+def started(engine, count):
+    return sorted(engine.started.get(timeout=TIMEOUT_S) for _ in range(count))
+
+
+def wait_status(engine, job_id, status):
+    for _ in range(TIMEOUT_S * 100):
+        if engine.get(job_id)["status"] == status:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"{job_id} {status} olmadı: {engine.get(job_id)['status']}")
+
+
+def test_jobs_beyond_slots_wait_in_fifo_order(make_engine):
+    engine = make_engine(slots=2)
+    ids = [engine.submit(params(url)) for url in ("a", "b", "c")]
+
+    assert started(engine, 2) == ["a", "b"]
+    assert engine.started.empty()
+    assert engine.get(ids[2])["message"].startswith("⏳ Sırada 1.")
+
+    engine.gate("a").set()
+    assert started(engine, 1) == ["c"]
+    wait_status(engine, ids[0], JOB_DONE)
+
+
+def test_duplicate_submit_shares_the_active_job(make_engine):
+    engine = make_engine(slots=1)
+    assert engine.submit(params("a")) == engine.submit(params("a"))
+    assert engine.governor.snapshot()["running"] + engine.governor.snapshot()["queued"] == 1
+
+
+def test_burst_fills_free_slots_before_queue_limit(make_engine):
+    engine = make_engine(slots=2, max_queue=2)
+    # İki iş boş yuvalara girer, ikisi sırada bekler - sırayı dolduran sadece son ikisidir
+    ids = [engine.submit(params(url)) for url in ("a", "b", "c", "d")]
+    assert len(set(ids)) == 4
+
+    with pytest.raises(QueueFullError):
+        engine.submit(params("e"))
+    assert sorted(engine.store.unfinished()) == sorted(ids)
+    assert started(engine, 2) == ["a", "b"]
+
+
+def test_queue_limit_counts_only_jobs_that_cannot_start():
+    governor = ResourceGovernor(memory_mb=10_000, slots=2, max_queue=2, cost_fn=lambda key: 100)
+    # Worker'lar wait() çağırmadan önce gelen ani yük: ilk ikisi boş yuvalara girecek
+    for job_id in ("a", "b", "c", "d"):
+        governor.enqueue(job_id, "base")
+    with pytest.raises(QueueFullError):
+        governor.enqueue("e", "base")
+
+    governor.wait("a")
+    with pytest.raises(QueueFullError):
+        governor.enqueue("e", "base")
+    governor.release("a")
+    governor.enqueue("e", "base")
+    assert governor.snapshot()["queued"] == 4
+
+
+def test_rejected_job_is_marked_failed(make_engine):
+    engine = make_engine(slots=1, max_queue=1)
+    engine.submit(params("a"))
+    engine.submit(params("b"))
+    with pytest.raises(QueueFullError):
+        engine.submit(params("c"))
+
+    with sqlite3.connect(engine.store.path) as conn:
+        statuses = dict(conn.execute("SELECT json_extract(params, '$.url'), status FROM jobs"))
+    assert statuses["c"] == JOB_FAILED
+    # Reddedilen iş aktif sayılmaz - aynı video yeniden gönderilebilir
+    assert engine.store.find_active(params("c")) is None
+
+
+def test_idle_pool_is_evicted_for_new_model(make_engine):
+    evicted = []
+    engine = make_engine(slots=2, memory_mb=1000, cost_fn=lambda key: 600,
+                         evict_fn=lambda key, unload_model: evicted.append((key, unload_model)))
+    first = engine.submit(params("a", "tiny"))
+    assert started(engine, 1) == ["a"]
+    second = engine.submit(params("b", "base"))
+    # İlk havuz çalışırken ikinci havuz sığmaz, tahliye de edilmez
+    assert engine.started.empty() and evicted == []
+
+    engine.gate("a").set()
+    assert started(engine, 1) == ["b"]
+    assert evicted == [(pool_key("tiny"), True)]
+    engine.gate("b").set()
+    wait_status(engine, first, JOB_DONE)
+    wait_status(engine, second, JOB_DONE)
+    assert engine.governor.snapshot()["resident_pools"] == 1
+
+
+def admit(governor, job_id, key):
+    governor.enqueue(job_id, key[0], key=key)
+    governor.wait(job_id, poll_s=0.01)
+    governor.release(job_id)
+
+
+def test_eviction_keeps_model_shared_with_resident_pool():
+    evicted = []
+    governor = ResourceGovernor(memory_mb=1000, slots=1, cost_fn=lambda key: 400,
+                                evict_fn=lambda key, unload_model: evicted.append((key, unload_model)))
+    single = pool_key("base", SINGLE_MODEL)
+    admit(governor, "1", single)
+    admit(governor, "2", pool_key("base"))
+    admit(governor, "3", pool_key("small"))
+    # En eski tek model yolu kapatılır ama "base" thread havuzu paylaşılan modeli kullanmaya devam eder
+    assert evicted == [(single, False)]
+
+    admit(governor, "4", pool_key("tiny"))
+    assert evicted == [(single, False), (pool_key("base"), True)]
+
+
+def test_eviction_keeps_model_needed_by_incoming_pool():
+    evicted = []
+    governor = ResourceGovernor(memory_mb=500, slots=1, cost_fn=lambda key: 400,
+                                evict_fn=lambda key, unload_model: evicted.append((key, unload_model)))
+    admit(governor, "1", pool_key("base"))
+    admit(governor, "2", pool_key("base", engine="batched"))
+    assert evicted == [(pool_key("base"), False)]
+
+
+def test_oversized_job_runs_alone(make_engine):
+    engine = make_engine(slots=2, memory_mb=100, cost_fn=lambda key: 600)
+    job_id = engine.submit(params("a"))
+    assert started(engine, 1) == ["a"]
+    engine.gate("a").set()
+    wait_status(engine, job_id, JOB_DONE)
+
+
+class FakePool:
+    def __init__(self):
+        self.closed = False
+
+    def shutdown(self, wait=True):
+        self.closed = True
+
+
+def test_evict_shared_pool_keeps_model_used_by_other_thread_pool(monkeypatch):
+    monkeypatch.setattr(model_pool, "_shared_models", {})
+    monkeypatch.setattr(model_pool, "load_model", lambda name: object())
+    chunk, batched = FakePool(), FakePool()
+    monkeypatch.setattr(model_pool, "_shared_pools", {pool_key("base"): chunk,
+                                                      pool_key("base", engine="batched"): batched})
+    model = model_pool.load_whisper_model("base")
+
+    model_pool.evict_shared_pool(pool_key("base"))
+    assert chunk.closed
+    assert model_pool.load_whisper_model("base") is model
+
+    model_pool.evict_shared_pool(pool_key("base", engine="batched"), unload_model=False)
+    assert model_pool.load_whisper_model("base") is model
+
+    model_pool.evict_shared_pool(pool_key("base", SINGLE_MODEL))
+    assert model_pool.load_whisper_model("base") is not model
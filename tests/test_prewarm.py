@@ -0,0 +1,40 @@
+import gemini_client
+from prewarm import Prewarmer, prewarm_tasks_from_env
+
+
+def test_gemini_prewarm_builds_the_client_the_app_uses(monkeypatch):
+    created = []
+    monkeypatch.setattr(gemini_client, "_shared_client", None)
+    monkeypatch.setattr(gemini_client, "create_gemini_client", lambda: created.append(object()) or created[-1])
+    monkeypatch.setenv("YEB_PREWARM_GEMINI", "1")
+    monkeypatch.setenv("YEB_PREWARM_MODELS", "")
+
+    tasks = [(name, task) for name, task in prewarm_tasks_from_env(lambda name: None) if name == "gemini"]
+    prewarmer = Prewarmer(tasks).start()
+    assert prewarmer.ready.wait(5)
+
+    assert prewarmer.snapshot()["gemini"]["state"] == "done"
+    assert gemini_client.get_shared_gemini_client() is created[0]
+    assert len(created) == 1
+
+
+def test_missing_api_key_is_retried(monkeypatch):
+    clients = iter([None, "client"])
+    monkeypatch.setattr(gemini_client, "_shared_client", None)
+    monkeypatch.setattr(gemini_client, "create_gemini_client", lambda: next(clients))
+
+    assert gemini_client.get_shared_gemini_client() is None
+    assert gemini_client.get_shared_gemini_client() == "client"
+    assert gemini_client.get_shared_gemini_client() == "client"
+
+
+def test_whisper_models_are_prewarmed_in_order(monkeypatch):
+    loaded = []
+    monkeypatch.setenv("YEB_PREWARM_GEMINI", "0")
+    monkeypatch.setenv("YEB_PREWARM_MODELS", "base, large-int8")
+
+    tasks = prewarm_tasks_from_env(loaded.append)
+    assert [name for name, _ in tasks] == ["yt_dlp", "whisper:base", "whisper:large-int8"]
+    for _, task in tasks[1:]:
+        task()
+    assert loaded == ["base", "large-int8"]
@@ -0,0 +1,78 @@
+import sqlite3
+import pytest
+from segment_index import SegmentIndex, fold_search_text
+
+SEGMENTS = [
+    (0.0, 4.0, "Işık hızında kısa bir giriş yapalım."),
+    (4.0, 9.0, "İstanbul'da yapay zekâ konuşacağız."),
+    (9.0, 12.0, "Şimdi örneklere geçelim."),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SegmentIndex(str(tmp_path / "segments.sqlite3"))
+    index.add_video("vid", SEGMENTS, title="Deneme", language="tr")
+    return index
+
+
+def starts(hits):
+    return [hit["start"] for hit in hits]
+
+
+def test_fold_search_text_maps_every_turkish_i_to_i():
+    assert fold_search_text("Işık İzmir ılık iyi") == "işik izmir ilik iyi"
+
+
+@pytest.mark.parametrize("query", ["kısa", "kisa", "KISA", "Kısa"])
+def test_dotless_i_matches_dotted_i(index, query):
+    assert starts(index.search(query)) == [0.0]
+
+
+@pytest.mark.parametrize("query", ["ışık", "işik", "isik", "IŞIK", "Işık hızında"])
+def test_capital_i_at_segment_start_matches(index, query):
+    assert starts(index.search(query)) == [0.0]
+
+
+@pytest.mark.parametrize("query", ["istanbul", "İSTANBUL", "ıstanbul", "zeka", "ornek*"])
+def test_accents_and_capital_dotted_i_fold(index, query):
+    expected = [9.0] if query == "ornek*" else [4.0]
+    assert starts(index.search(query, phrase=query != "ornek*")) == expected
+
+
+def test_hits_return_original_text(index):
+    hit = index.search("isik")[0]
+    assert hit["text"] == "Işık hızında kısa bir giriş yapalım."
+    assert hit["url"].endswith("&t=0s")
+
+
+def test_reindexing_video_replaces_segments(index):
+    index.add_video("vid", [(0.0, 2.0, "Yeni ılık metin")])
+    assert index.search("kisa") == []
+    assert starts(index.search("ilik")) == [0.0]
+    assert index.stats() == {"videos": 1, "segments": 1}
+
+
+def test_old_index_is_migrated_to_folded_text(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE videos (video_id TEXT PRIMARY KEY, title TEXT, language TEXT, indexed_at REAL NOT NULL);
+        CREATE TABLE segments (id INTEGER PRIMARY KEY, video_id TEXT NOT NULL, start REAL NOT NULL,
+                               end REAL NOT NULL, text TEXT NOT NULL);
+        CREATE VIRTUAL TABLE segments_fts USING fts5(text, content='segments', content_rowid='id',
+                                                     tokenize='unicode61 remove_diacritics 2');
+        CREATE TRIGGER segments_ai AFTER INSERT ON segments BEGIN
+            INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+        END;
+        INSERT INTO videos VALUES ('old', 'Eski', 'tr', 0);
+        INSERT INTO segments(video_id, start, end, text) VALUES ('old', 3.0, 5.0, 'Işık kısa');
+    """)
+    conn.commit()
+    conn.close()
+
+    index = SegmentIndex(path)
+    assert starts(index.search("isik kisa")) == [3.0]
+    index.add_video("old", [(1.0, 2.0, "İkinci sürüm")])
+    assert starts(index.search("ikinci")) == [1.0]
+    assert index.search("kisa") == []
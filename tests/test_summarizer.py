@@ -0,0 +1,114 @@
+import re
+import threading
+from summarizer import (
+    SECTION_GENERATION_CONFIG, SUMMARY_GENERATION_CONFIG, map_reduce_summary, split_transcript_sections,
+    stream_transcript_summary,
+)
+
+SECTION_PROMPT = re.compile(r"(\d+)/(\d+)\. bölümüdür")
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """generate_content çağrılarını kaydeden model - bölüm prompt'una bölüm numarasıyla not döndürür"""
+
+    def __init__(self, note_words=3):
+        self.note_words = note_words
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None):
+        with self._lock:
+            self.calls.append((prompt, generation_config))
+        match = SECTION_PROMPT.search(prompt)
+        if match:
+            return Response(f"- not {match.group(1)}/{match.group(2)}" + " ayrıntı" * self.note_words)
+        return Response("ÖZET")
+
+    def map_calls(self):
+        return [(prompt, config) for prompt, config in self.calls if SECTION_PROMPT.search(prompt)]
+
+    def reduce_calls(self):
+        return [(prompt, config) for prompt, config in self.calls if not SECTION_PROMPT.search(prompt)]
+
+
+def long_transcript(sentences=60):
+    return " ".join(f"Konu {index} için ölçüm sonuçlarını tartışıyoruz." for index in range(sentences))
+
+
+def test_short_transcript_uses_single_call():
+    model = FakeModel()
+    transcript = "Kısa bir video. İki cümle var."
+    assert map_reduce_summary(model, transcript, "Başlık", token_budget=0) == "ÖZET"
+
+    assert len(model.calls) == 1
+    prompt, config = model.calls[0]
+    assert config == SUMMARY_GENERATION_CONFIG
+    assert "TRANSKRİPT:\n" + transcript in prompt
+    assert "BÖLÜM NOTLARI" not in prompt
+
+
+def test_long_transcript_maps_each_section_then_reduces_notes_in_order():
+    model = FakeModel()
+    transcript = long_transcript()
+    budgets = {"section_tokens": 60, "single_pass_tokens": 200, "concurrency": 3, "token_budget": 0}
+    assert map_reduce_summary(model, transcript, "Başlık", **budgets) == "ÖZET"
+
+    sections = split_transcript_sections(transcript, 60)
+    total = len(sections)
+    assert total > 3
+    map_calls = sorted(model.map_calls(), key=lambda call: int(SECTION_PROMPT.search(call[0]).group(1)))
+    assert len(map_calls) == total
+    for index, ((prompt, config), section) in enumerate(zip(map_calls, sections), 1):
+        assert config == SECTION_GENERATION_CONFIG
+        assert f"{index}/{total}. bölümüdür" in prompt
+        assert prompt.rstrip().endswith(section)
+
+    # Reduce en son ve tek çağrıdır; girdisi bölüm sırasıyla notlardır
+    assert model.calls[-1] == model.reduce_calls()[0] and len(model.reduce_calls()) == 1
+    prompt, config = model.calls[-1]
+    assert config == SUMMARY_GENERATION_CONFIG
+    assert "BÖLÜM NOTLARI:\n" in prompt
+    notes = re.findall(r"### Bölüm (\d+)\n- not (\d+)/(\d+)", prompt)
+    assert notes == [(str(index), str(index), str(total)) for index in range(1, total + 1)]
+    assert transcript not in prompt
+
+
+def test_long_notes_are_reduced_hierarchically():
+    model = FakeModel(note_words=10)
+    budgets = {"section_tokens": 60, "single_pass_tokens": 200, "concurrency": 2, "token_budget": 0}
+    map_reduce_summary(model, long_transcript(), **budgets)
+
+    first_round = len(split_transcript_sections(long_transcript(), 60))
+    # İlk turun notları bütçeyi aşar, notlar bir tur daha bölümlenir
+    assert len(model.map_calls()) > first_round
+    assert len(model.reduce_calls()) == 1
+    assert model.calls[-1][1] == SUMMARY_GENERATION_CONFIG
+
+
+def test_notes_that_do_not_shrink_stop_after_one_round():
+    model = FakeModel(note_words=60)
+    budgets = {"section_tokens": 60, "single_pass_tokens": 200, "concurrency": 2, "token_budget": 0}
+    map_reduce_summary(model, long_transcript(), **budgets)
+
+    assert len(model.map_calls()) == len(split_transcript_sections(long_transcript(), 60))
+    assert len(model.reduce_calls()) == 1
+
+
+def test_stream_without_stream_support_yields_single_summary():
+    model = FakeModel()
+    assert list(stream_transcript_summary(model, "Kısa bir video.")) == ["ÖZET"]
+    assert len(model.calls) == 1
+
+
+def test_empty_response_yields_fallback_text():
+    class EmptyModel(FakeModel):
+        def generate_content(self, prompt, generation_config=None):
+            super().generate_content(prompt, generation_config)
+            return Response("")
+
+    assert list(stream_transcript_summary(EmptyModel(), "Kısa bir video.")) == ["Özet oluşturulamadı."]
@@ -0,0 +1,133 @@
+import glob
+import os
+import pytest
+from video_metadata import (
+    InfoJsonExtractor, MetadataCache, MetadataService, estimate_cost, is_collection_url, load_info_json, trim_info,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "metadata")
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PLyebtest"
+
+
+class RecordingExtractor(InfoJsonExtractor):
+    """Kayıtlı JSON'lardan çıkarır ve çağrıları kaydeder"""
+
+    def __init__(self, paths):
+        super().__init__(paths)
+        self.calls = []
+
+    def __call__(self, url, flat=False):
+        self.calls.append((url, flat))
+        return super().__call__(url, flat)
+
+
+@pytest.fixture
+def extractor():
+    return RecordingExtractor(glob.glob(os.path.join(FIXTURES, "*.info.json")))
+
+
+@pytest.fixture
+def service(tmp_path, extractor):
+    service = MetadataService(MetadataCache(str(tmp_path / "metadata.sqlite3")), workers=2, extract_fn=extractor)
+    yield service
+    service.close()
+
+
+def test_trim_info_normalizes_full_info_json():
+    assert trim_info(load_info_json(os.path.join(FIXTURES, "vid00000001.info.json"))) == {
+        "id": "vid00000001",
+        "title": "Yapay Zeka Nedir?",
+        "duration": 612,
+        "uploader": "YEB Kanal",
+        "channel_id": "UCyebtest0000000000000001",
+        "upload_date": "20240315",
+        "live": False,
+        "webpage_url": "https://www.youtube.com/watch?v=vid00000001",
+        "captions": ["tr"],
+        # Sadece otomatik çeviri olan "de" izi atılır
+        "auto_captions": ["en"],
+    }
+
+
+def test_trim_info_falls_back_to_channel_and_original_url():
+    meta = trim_info(load_info_json(os.path.join(FIXTURES, "vid00000002.info.json")))
+    assert meta["uploader"] == "YEB Kanal"
+    assert meta["webpage_url"] == "https://youtu.be/vid00000002"
+    assert (meta["captions"], meta["auto_captions"]) == ([], ["tr"])
+
+
+def test_resolve_caches_video_but_not_live_stream(service, extractor):
+    url = "https://youtu.be/vid00000001"
+    assert service.resolve(url)["duration"] == 612
+    assert service.cache.get_video("vid00000001")["captions"] == ["tr"]
+
+    live = service.resolve("https://www.youtube.com/watch?v=live0000001")
+    assert live["live"] and live["duration"] == 0
+    assert service.cache.get_video("live0000001") is None
+
+
+def test_resolve_remembers_errors_briefly(service, extractor):
+    url = "https://www.youtube.com/watch?v=missing0001"
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            service.resolve(url)
+    assert extractor.calls == [(url, False)]
+
+
+def test_expand_playlist_keeps_flat_metadata(service):
+    entries = service.expand(PLAYLIST_URL)
+    assert [url for url, _ in entries] == [
+        "https://www.youtube.com/watch?v=vid00000001",
+        "https://www.youtube.com/watch?v=vid00000002",
+        "https://www.youtube.com/watch?v=vid00000003",
+    ]
+    assert [(meta["title"], meta["duration"]) for _, meta in entries] == [
+        ("Yapay Zeka Nedir?", 612), ("Soru Cevap", 0), ("Kapanış", 95),
+    ]
+    # İkinci açılım kalıcı önbellekten gelir
+    assert service.expand(PLAYLIST_URL) == entries
+
+
+def test_preview_uses_flat_entries_and_resolves_only_missing_durations(service, extractor):
+    results = service.preview([PLAYLIST_URL])
+
+    # Düz girdisinde süre olmayan tek video tek tek çözülür
+    assert extractor.calls == [(PLAYLIST_URL, True), ("https://www.youtube.com/watch?v=vid00000002", False)]
+    assert [(result["meta"]["id"], result["meta"]["duration"]) for result in results] == [
+        ("vid00000001", 612), ("vid00000002", 1805), ("vid00000003", 95),
+    ]
+
+    cost = estimate_cost(results, "base", language="tr")
+    assert cost["videos"] == 3 and cost["failed"] == 0
+    assert cost["total_duration_s"] == 612 + 1805 + 95
+    # Sadece tam çözülen videonun altyazı bilgisi var; düz girdiler Whisper'a girecek sayılır
+    assert cost["captioned"] == 1
+    assert cost["whisper_duration_s"] == 612 + 95
+
+
+def test_preview_prefers_cached_full_metadata(service, extractor):
+    service.resolve("https://www.youtube.com/watch?v=vid00000001")
+    extractor.calls.clear()
+
+    results = service.preview([PLAYLIST_URL])
+    assert ("https://www.youtube.com/watch?v=vid00000001", False) not in extractor.calls
+    assert results[0]["meta"]["captions"] == ["tr"]
+    assert estimate_cost(results, "base", language="tr")["captioned"] == 2
+
+
+def test_preview_reports_unresolvable_single_video(service):
+    results = service.preview(["https://www.youtube.com/watch?v=missing0001", "https://youtu.be/vid00000001"])
+    assert results[0]["meta"] is None and "missing0001" in results[0]["error"]
+    assert results[1]["meta"]["id"] == "vid00000001"
+
+
+@pytest.mark.parametrize("url, expected", [
+    (PLAYLIST_URL, True),
+    ("https://www.youtube.com/@yeb", True),
+    ("https://www.youtube.com/channel/UCyebtest0000000000000001/videos", True),
+    ("https://www.youtube.com/watch?v=vid00000001&list=PLyebtest", False),
+    ("https://youtu.be/vid00000001", False),
+    ("https://www.youtube.com/playlist", False),
+])
+def test_is_collection_url(url, expected):
+    assert is_collection_url(url) is expected
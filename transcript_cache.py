@@ -0,0 +1,45 @@
+import os
+from cache_store import SQLiteCache, get_cache_dir, make_cache_key
+
+
+class TranscriptCache(SQLiteCache):
+    """Video kimliği + transkripsiyon parametreleriyle anahtarlanan transkript deposu"""
+
+    def get_transcript(self, video_id, params):
+        """Önbellekteki transkripti döndür - yoksa None"""
+        entry = self.get(make_cache_key("transcript", video_id, params))
+        return entry["text"] if entry else None
+
+    def put_transcript(self, video_id, params, text):
+        """Transkripti kaydet"""
+        self.set(make_cache_key("transcript", video_id, params), {"video_id": video_id, "text": text})
+
+
+def open_transcript_cache():
+    """Ortam değişkenlerindeki sınırlarla transkript önbelleğini aç"""
+    return TranscriptCache(
+        os.path.join(get_cache_dir(), "transcripts.sqlite3"),
+        max_bytes=int(float(os.getenv("YEB_TRANSCRIPT_CACHE_MB", "200")) * 1024 * 1024),
+        max_age_s=int(float(os.getenv("YEB_TRANSCRIPT_CACHE_DAYS", "30")) * 24 * 3600),
+    )
+
+
+def transcript_params(model_name, language, parallel=True, chunk_length=None, chunk_strategy=None,
+                      engine="chunk"):
+    """Önbellek anahtarına giren transkripsiyon parametreleri"""
+    params = {
+        'model': model_name,
+        'language': language,
+        'parallel': parallel,
+        'chunk_length': chunk_length if parallel else None,
+        'chunk_strategy': chunk_strategy if parallel else None,
+    }
+    # Varsayılan motor anahtara eklenmez - mevcut önbellek kayıtları geçerli kalır
+    if parallel and engine != "chunk":
+        params['engine'] = engine
+    return params
+
+
+def is_cacheable_transcript(text):
+    """Hatalı parça içeren transkriptler önbelleğe yazılmaz"""
+    return "[Hata:" not in text and "[İşleme hatası:" not in text
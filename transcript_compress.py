@@ -0,0 +1,114 @@
+import os
+import re
+import time
+import collections
+import metrics
+
+# Bu tahmini token sayısını aşan transkript çıkarımsal olarak kısaltılır (0 = sınırsız)
+DEFAULT_TOKEN_BUDGET = 50000
+# Art arda bundan fazla tekrar eden çok kelimeli grup döngü sayılır ve tek kopyaya indirilir
+MAX_REPEATS = 2
+# Tekrar döngüsü aranan en uzun kelime grubu
+MAX_LOOP_WORDS = 12
+
+# transcribe_chunk / iter_ordered_transcriptions hata işaretleri
+_ERROR_MARKER = re.compile(r"\[(?:Hata|İşleme hatası):[^\]]*\]")
+# Anlamsız dolgu sesleri (tr/en) - sadece küçük harf biçimleri; "II. Dünya", "AAA sınıfı" gibi
+# büyük harfli kısaltma ve sayılar dokunulmaz
+_FILLER = re.compile(r"(?<!\w)(?:ı{2,}|e{2,}[hm]*|h?m{2,}|hı+m+|a{2,}h*|u+[hm]+|erm+)(?!\w),?")
+_SPACES = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text):
+    """Kaba token tahmini - ortalama 4 karakter/token"""
+    return (len(text) + 3) // 4
+
+
+def get_token_budget():
+    """YEB_SUMMARY_TOKEN_BUDGET ortam değişkeninden transkript token bütçesi"""
+    return int(os.getenv("YEB_SUMMARY_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+
+
+def collapse_repetitions(text, max_repeats=MAX_REPEATS, max_words=MAX_LOOP_WORDS):
+    """Art arda max_repeats'ten fazla birebir tekrar eden çok kelimeli grupları tek kopyaya indir - (metin, atılan kelime)
+
+    Whisper sessiz bölümlerde aynı cümleyi döngüye sokabilir ("Abone olmayı unutmayın. Abone olmayı ...").
+    Tek kelimenin tekrarı ("çok çok çok") vurgu olabileceği için dokunulmaz.
+    """
+    words = text.split()
+    kept = []
+    removed = 0
+    i = 0
+    while i < len(words):
+        collapsed = False
+        for size in range(2, min(max_words, (len(words) - i) // (max_repeats + 1)) + 1):
+            group = words[i:i + size]
+            if len(set(group)) < 2:
+                continue
+            repeats = 1
+            while words[i + repeats * size:i + (repeats + 1) * size] == group:
+                repeats += 1
+            if repeats > max_repeats:
+                kept.extend(words[i:i + size])
+                removed += (repeats - 1) * size
+                i += repeats * size
+                collapsed = True
+                break
+        if not collapsed:
+            kept.append(words[i])
+            i += 1
+    return " ".join(kept), removed
+
+
+def extractive_reduce(text, token_budget):
+    """Cümleleri kelime sıklığına göre puanla, bütçeye sığanları özgün sırayla tut"""
+    sentences = [s for s in _SENTENCE_END.split(text) if s.strip()]
+    if len(sentences) <= 1:
+        return text[:token_budget * 4]
+
+    tokenized = [[w.lower() for w in _WORD.findall(s)] for s in sentences]
+    # Kısa kelimeler (bağlaç, edat) puanı şişirmesin
+    frequency = collections.Counter(w for words in tokenized for w in words if len(w) > 3)
+
+    def score(index):
+        words = [w for w in tokenized[index] if len(w) > 3]
+        return sum(frequency[w] for w in words) / (len(tokenized[index]) or 1) if words else 0.0
+
+    selected = set()
+    used = 0
+    for index in sorted(range(len(sentences)), key=score, reverse=True):
+        cost = estimate_tokens(sentences[index]) + 1
+        if used + cost > token_budget:
+            continue
+        selected.add(index)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(selected))
+
+
+def compress_transcript(text, token_budget=None):
+    """Gemini'ye gitmeden önce transkripti temizle ve gerekirse bütçeye indir - (metin, istatistik)
+
+    Hata işaretleri, dolgu sesleri ve tekrar döngüleri atılır; sonuç hâlâ
+    token_budget'ı aşıyorsa çıkarımsal kısaltma uygulanır.
+    """
+    token_budget = get_token_budget() if token_budget is None else token_budget
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    stats = {"tokens_in": estimate_tokens(text)}
+
+    cleaned, stats["error_markers"] = _ERROR_MARKER.subn(" ", text)
+    cleaned, stats["fillers"] = _FILLER.subn(" ", cleaned)
+    cleaned, stats["repeated_words"] = collapse_repetitions(_SPACES.sub(" ", cleaned).strip())
+
+    stats["extracted"] = bool(token_budget) and estimate_tokens(cleaned) > token_budget
+    if stats["extracted"]:
+        cleaned = extractive_reduce(cleaned, token_budget)
+
+    stats["tokens_out"] = estimate_tokens(cleaned)
+    stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+    stats["reduction"] = stats["tokens_saved"] / stats["tokens_in"] if stats["tokens_in"] else 0.0
+    metrics.record("transcript_compress", time.perf_counter() - wall_start, time.thread_time() - cpu_start,
+                   **stats)
+    return cleaned, stats
@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import logging
+import threading
+import concurrent.futures
+from urllib.parse import parse_qs, urlparse
+import metrics
+from cache_store import SQLiteCache, get_cache_dir, make_cache_key
+from youtube_utils import extract_video_id
+from scheduler import plan_transcription
+from quantization import split_model_name
+
+logger = logging.getLogger("yeb.video_metadata")
+
+# Eşzamanlı meta veri çözümlemesi için varsayılan worker sayısı
+DEFAULT_WORKERS = 8
+# Playlist/kanal içerikleri videolardan sık değişir - açılımlar daha kısa süre geçerli
+DEFAULT_PLAYLIST_TTL_S = 6 * 3600
+# Tek worker'da yaklaşık işlem süresi / ses süresi (CPU, kaba tahmin)
+WHISPER_CPU_RTF = {
+    "tiny": 0.05,
+    "base": 0.1,
+    "small": 0.3,
+    "medium": 0.8,
+    "large": 1.6,
+}
+# int8 nicemlenmiş modelin fp32'ye göre işlem süresi oranı
+INT8_RTF_FACTOR = 0.6
+# Süreç içi kısa önbellek - kalıcı önbelleğe yazılmayan sonuçlar (canlı yayın, kimliksiz URL)
+# ve hatalar da tutulur; arayüzün saniyelik yenilemesi her seferinde yt-dlp çağırmaz
+RECENT_TTL_S = 300
+RECENT_ERROR_TTL_S = 60
+MAX_RECENT = 1024
+
+# Tekil video çözümünde watch?v=ID&list=... URL'si playlist'e açılmaz
+_YDL_OPTS = {'quiet': True, 'no_warnings': True, 'skip_download': True, 'noplaylist': True}
+_FLAT_YDL_OPTS = dict(_YDL_OPTS, extract_flat='in_playlist', noplaylist=False)
+# Kanal sayfası yolları
+_CHANNEL_PATHS = ("/@", "/channel/", "/c/", "/user/")
+
+
+def _caption_languages(tracks, skip_translated=False):
+    languages = []
+    for key, formats in (tracks or {}).items():
+        if skip_translated and not any(f.get("url") and "tlang=" not in f["url"] for f in formats or []):
+            continue
+        languages.append(key)
+    return sorted(languages)
+
+
+def trim_info(info):
+    """yt-dlp bilgi sözlüğünden saklanacak alanlar - format ve altyazı URL'leri atılır"""
+    return {
+        'id': info.get('id', ''),
+        'title': info.get('title', ''),
+        'duration': int(info.get('duration') or 0),
+        'uploader': info.get('uploader') or info.get('channel') or '',
+        'channel_id': info.get('channel_id', ''),
+        'upload_date': info.get('upload_date', ''),
+        'live': bool(info.get('is_live')),
+        'webpage_url': info.get('webpage_url') or info.get('original_url') or '',
+        'captions': _caption_languages(info.get('subtitles')),
+        # Otomatik çeviri izleri (tlang) transkript için kullanılmaz
+        'auto_captions': _caption_languages(info.get('automatic_captions'), skip_translated=True),
+    }
+
+
+def has_captions(meta, language, allow_auto=True):
+    """Videoda seçilen dilde altyazı var mı - select_caption_track ile aynı dil eşlemesi"""
+    languages = meta.get('captions', []) + (meta.get('auto_captions', []) if allow_auto else [])
+    return any(key == language or key.split("-")[0] == language for key in languages)
+
+
+def _entry_url(entry):
+    """Düz (flat) playlist girdisinden video URL'si"""
+    video_url = entry.get('url') or entry.get('webpage_url')
+    if entry.get('id') and not (video_url or '').startswith('http'):
+        video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+    return video_url
+
+
+def _is_nested_playlist(entry):
+    """Düz girdi bir video değil de playlist/kanal sekmesi mi"""
+    return entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab'
+
+
+def is_single_video_url(url):
+    """Playlist/kanal açılımı gerekmeyen tekil video URL'si mi"""
+    return bool(extract_video_id(url)) and "list=" not in url
+
+
+def is_collection_url(url):
+    """Playlist sayfası (/playlist?list=) veya kanal URL'si mi - watch?v=ID&list=... tekil video sayılır"""
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    if parsed.path.rstrip("/") == "/playlist":
+        return bool(parse_qs(parsed.query).get("list"))
+    return not extract_video_id(url) and parsed.path.startswith(_CHANNEL_PATHS)
+
+
+def load_info_json(path):
+    """yt-dlp --write-info-json / --dump-single-json çıktısını oku"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class InfoJsonExtractor:
+    """Kayıtlı yt-dlp bilgi JSON'larından çıkarıcı - ağsız test ve tekrar üretim için
+
+    Videolar kimliğiyle, playlist/kanallar webpage_url/original_url ile eşlenir.
+    MetadataService(extract_fn=InfoJsonExtractor(yollar)) şeklinde kullanılır.
+    """
+
+    def __init__(self, paths):
+        self._infos = {}
+        for path in paths:
+            info = load_info_json(path)
+            for key in (info.get('id'), info.get('webpage_url'), info.get('original_url')):
+                if key:
+                    self._infos[key] = info
+
+    def __call__(self, url, flat=False):
+        info = self._infos.get(extract_video_id(url) if is_single_video_url(url) else url)
+        if info is None:
+            raise LookupError(f"Bilgi JSON'u yok: {url}")
+        return info
+
+
+class MetadataCache(SQLiteCache):
+    """Video meta verisi ve playlist açılımları için kalıcı önbellek"""
+
+    def get_video(self, video_id):
+        """Önbellekteki video meta verisi - yoksa None"""
+        return self.get(make_cache_key("video_info", video_id))
+
+    def put_video(self, meta):
+        """Video meta verisini kaydet"""
+        self.set(make_cache_key("video_info", meta['id']), meta)
+
+    def get_playlist(self, url, max_age_s):
+        """Önbellekteki playlist açılımı - yoksa veya max_age_s'den eskiyse None"""
+        entry = self.get(make_cache_key("playlist", url))
+        if entry is None or (max_age_s and time.time() - entry['fetched_at'] > max_age_s):
+            return None
+        return entry['entries']
+
+    def put_playlist(self, url, entries):
+        """Playlist açılımını kaydet - [(video URL'si, düz meta veri)]"""
+        self.set(make_cache_key("playlist", url), {'fetched_at': time.time(), 'entries': entries})
+
+
+class MetadataService:
+    """Tekil video, playlist ve kanal URL'leri için toplu meta veri çözümleyici
+
+    Playlist/kanallar düz (flat) çıkarımla açılır; video meta verileri sınırlı bir
+    thread havuzunda eşzamanlı çözülür. Her worker thread kendi YoutubeDL örneğini
+    tekrar kullanır (YoutubeDL thread güvenli değildir). Önce önbelleğe bakılır.
+
+    extract_fn(url, flat) -> yt-dlp bilgi sözlüğü; verilmezse yt-dlp kullanılır.
+    """
+
+    def __init__(self, cache=None, workers=DEFAULT_WORKERS, extract_fn=None,
+                 playlist_ttl_s=DEFAULT_PLAYLIST_TTL_S):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.playlist_ttl_s = playlist_ttl_s
+        self._extract_fn = extract_fn or self._extract_with_ytdlp
+        self._local = threading.local()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._recent = {}  # url -> (son geçerlilik, meta veya hata)
+        self._recent_lock = threading.Lock()
+
+    def _ydl(self, flat):
+        """Thread'in YoutubeDL örneği - ilk kullanımda oluşturulur, sonra tekrar kullanılır"""
+        name = "flat_ydl" if flat else "ydl"
+        ydl = getattr(self._local, name, None)
+        if ydl is None:
+            import yt_dlp
+            ydl = yt_dlp.YoutubeDL(_FLAT_YDL_OPTS if flat else _YDL_OPTS)
+            setattr(self._local, name, ydl)
+        return ydl
+
+    def _extract_with_ytdlp(self, url, flat=False):
+        return self._ydl(flat).extract_info(url, download=False)
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="yeb-metadata"
+                )
+            return self._executor
+
+    def close(self):
+        """Worker thread'lerini kapat"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def expand(self, url, _nested=False):
+        """URL'yi [(video URL'si, düz meta veri)] listesine aç - tekil video kendisi döner
+
+        Düz meta veride başlık ve süre çoğu zaman bulunur, altyazı bilgisi bulunmaz.
+        Kanal ana sayfası sekmelere (Videolar, Shorts, Canlı) açılır; sekmeler bir kez daha açılır.
+        """
+        if is_single_video_url(url):
+            return [(url, None)]
+        if self.cache is not None:
+            cached = self.cache.get_playlist(url, self.playlist_ttl_s)
+            if cached is not None:
+                return [(video_url, meta) for video_url, meta in cached]
+
+        with metrics.span("playlist_expand") as span:
+            info = self._extract_fn(url, flat=True)
+            entries = info.get('entries')
+            if entries is None:
+                # Playlist değil, tekil video sayfası
+                expanded = [(url, None)]
+            else:
+                expanded = []
+                for entry in entries:
+                    entry_url = entry and _entry_url(entry)
+                    if not entry_url:
+                        continue
+                    if not _nested and _is_nested_playlist(entry):
+                        expanded.extend(self.expand(entry_url, _nested=True))
+                    else:
+                        expanded.append((entry_url, trim_info(entry)))
+            span["videos"] = len(expanded)
+
+        if entries is not None and self.cache is not None:
+            self.cache.put_playlist(url, expanded)
+        return expanded
+
+    def _expand_entries(self, urls):
+        """Birden çok URL'yi [(video URL'si, düz meta veri)] listesine aç - açılamayanlar atlanır"""
+        entries = []
+        for url in urls:
+            try:
+                entries.extend(self.expand(url))
+            except Exception as e:
+                logger.warning("URL açılamadı (%s): %s", url, e)
+        return entries
+
+    def expand_many(self, urls):
+        """Birden çok URL'yi tekil video URL'lerine aç - açılamayanlar atlanır"""
+        return [video_url for video_url, _ in self._expand_entries(urls)]
+
+    def resolve(self, url):
+        """Tek videonun meta verisi - önce süreç içi kısa önbellek (hatalar dahil), sonra kalıcı önbellek"""
+        now = time.monotonic()
+        with self._recent_lock:
+            recent = self._recent.get(url)
+        if recent is not None and recent[0] > now:
+            if isinstance(recent[1], Exception):
+                raise recent[1]
+            return recent[1]
+
+        try:
+            meta = self._resolve(url)
+        except Exception as e:
+            self._remember(url, now + RECENT_ERROR_TTL_S, e)
+            raise
+        self._remember(url, now + RECENT_TTL_S, meta)
+        return meta
+
+    def _remember(self, url, expires, value):
+        with self._recent_lock:
+            self._recent.pop(url, None)
+            self._recent[url] = (expires, value)
+            while len(self._recent) > MAX_RECENT:
+                # En eski kayıt önce atılır
+                del self._recent[next(iter(self._recent))]
+
+    def _resolve(self, url):
+        """Kalıcı önbellekte yoksa çıkar ve kaydet"""
+        video_id = extract_video_id(url)
+        if video_id and self.cache is not None:
+            cached = self.cache.get_video(video_id)
+            if cached is not None:
+                return cached
+
+        with metrics.span("video_info"):
+            meta = trim_info(self._extract_fn(url, flat=False))
+        # Canlı yayının süresi ve altyazısı henüz kesin değil
+        if meta['id'] and not meta['live'] and self.cache is not None:
+            self.cache.put_video(meta)
+        return meta
+
+    def resolve_many(self, urls):
+        """Videoların meta verilerini eşzamanlı çöz - girdi sırasıyla {url, meta | error} listesi"""
+        futures = [self._pool().submit(self.resolve, url) for url in urls]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append({'url': url, 'meta': future.result()})
+                metrics.REGISTRY.count("yeb_metadata_resolved_total", status="ok")
+            except Exception as e:
+                results.append({'url': url, 'meta': None, 'error': str(e)})
+                metrics.REGISTRY.count("yeb_metadata_resolved_total", status="error")
+        return results
+
+    def _cached_video(self, url):
+        """Kalıcı önbellekteki tam meta veri - yoksa None"""
+        video_id = extract_video_id(url)
+        if video_id is None or self.cache is None:
+            return None
+        return self.cache.get_video(video_id)
+
+    def preview(self, urls):
+        """URL'leri aç ve videoların meta verisini topla - girdi sırasıyla {url, meta | error} listesi
+
+        Başlık ve süre düz (flat) açılımdan alınır; önbellekte tam meta verisi olan videolar
+        onunla, düz girdisinde süre/başlık olmayanlar (ve tekil video URL'leri) tek tek çözülür.
+        Düz girdide altyazı bilgisi yoktur - bu videolar tahminde Whisper'a girecek sayılır.
+        """
+        entries = self._expand_entries(urls)
+        results = [None] * len(entries)
+        missing = []
+        for index, (video_url, meta) in enumerate(entries):
+            cached = self._cached_video(video_url)
+            if cached is not None:
+                results[index] = {'url': video_url, 'meta': cached}
+            elif meta and meta['duration'] and meta['title'] and not meta['live']:
+                results[index] = {'url': video_url, 'meta': meta}
+            else:
+                missing.append(index)
+
+        resolved = self.resolve_many([entries[index][0] for index in missing])
+        for index, result in zip(missing, resolved):
+            results[index] = result
+        return results
+
+
+def estimate_processing_s(meta, model_name, language=None, allow_captions=True):
+    """Videonun tahmini işlem süresi (sn) - altyazısı olan video Whisper'a girmez"""
+    duration = meta.get('duration') or 0
+    if not duration or (allow_captions and language and has_captions(meta, language)):
+        return 0.0
+    base_name, quantization = split_model_name(model_name)
+    rtf = WHISPER_CPU_RTF.get(base_name, WHISPER_CPU_RTF["base"])
+    if quantization == "int8":
+        rtf *= INT8_RTF_FACTOR
+    return duration * rtf / plan_transcription(model_name, audio_s=duration).workers
+
+
+def estimate_cost(results, model_name, language=None, allow_captions=True):
+    """resolve_many sonuçları için toplam süre ve kaba işlem süresi tahmini"""
+    cost = {'videos': 0, 'failed': 0, 'total_duration_s': 0, 'captioned': 0,
+            'whisper_duration_s': 0, 'estimated_processing_s': 0.0}
+    for result in results:
+        meta = result.get('meta')
+        if not meta:
+            cost['failed'] += 1
+            continue
+        duration = meta.get('duration') or 0
+        cost['videos'] += 1
+        cost['total_duration_s'] += duration
+        if allow_captions and language and has_captions(meta, language):
+            cost['captioned'] += 1
+        else:
+            cost['whisper_duration_s'] += duration
+        cost['estimated_processing_s'] += estimate_processing_s(meta, model_name, language, allow_captions)
+    return cost
+
+
+def open_metadata_cache():
+    """Ortam değişkenlerindeki sınırlarla meta veri önbelleğini aç"""
+    return MetadataCache(
+        os.path.join(get_cache_dir(), "metadata.sqlite3"),
+        max_bytes=int(float(os.getenv("YEB_METADATA_CACHE_MB", "20")) * 1024 * 1024),
+        max_age_s=int(float(os.getenv("YEB_METADATA_CACHE_DAYS", "7")) * 24 * 3600),
+    )
+
+
+_default_service = None
+_default_service_guard = threading.Lock()
+
+
+def get_metadata_service():
+    """Process genelinde ortak meta veri servisi - YoutubeDL örnekleri ve önbellek paylaşılır"""
+    global _default_service
+    with _default_service_guard:
+        if _default_service is None:
+            _default_service = MetadataService(
+                open_metadata_cache(),
+                workers=int(os.getenv("YEB_METADATA_WORKERS", str(DEFAULT_WORKERS))),
+                playlist_ttl_s=float(os.getenv("YEB_PLAYLIST_CACHE_HOURS", "6")) * 3600,
+            )
+        return _default_service
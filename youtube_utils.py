@@ -0,0 +1,33 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+# YouTube video kimlikleri 11 karakterdir
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def extract_video_id(url):
+    """YouTube URL'sinden video kimliğini çıkar - bulunamazsa None"""
+    if not url:
+        return None
+
+    url = url.strip()
+    if _VIDEO_ID_RE.match(url):
+        return url
+
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = (parsed.hostname or "").lower()
+
+    if host.endswith("youtu.be"):
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host.endswith("youtube.com") or host.endswith("youtube-nocookie.com"):
+        query_id = parse_qs(parsed.query).get("v", [None])[0]
+        if query_id:
+            candidate = query_id
+        else:
+            # /shorts/ID, /embed/ID, /live/ID, /v/ID
+            parts = [p for p in parsed.path.split("/") if p]
+            candidate = parts[1] if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v") else None
+    else:
+        return None
+
+    return candidate if candidate and _VIDEO_ID_RE.match(candidate) else None